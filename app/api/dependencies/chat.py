@@ -2,9 +2,16 @@
 
 from functools import lru_cache
 from app.services.chat_service import ChatService
+from app.services.chat_tool_service import ChatToolService
 
 
 @lru_cache()
 def get_chat_service() -> ChatService:
     """Get chat service instance (singleton)"""
-    return ChatService() 
\ No newline at end of file
+    return ChatService()
+
+
+@lru_cache()
+def get_chat_tool_service() -> ChatToolService:
+    """Get profile tool chat service instance (singleton: graph compiled once, checkpointer shared)"""
+    return ChatToolService()
@@ -1,17 +1,34 @@
 """Chat API endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import uuid
+from contextlib import aclosing
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
+from app.core.config import settings
 from app.services.chat_service import ChatService
 from app.services.chat_tool_service import ChatToolService
-from app.api.dependencies.chat import get_chat_service
+from app.services.admission import admission_controller
+from app.services.compaction import conversation_compactor
+from app.services.context_budget import context_budget
+from app.services.conversation_index import conversation_index
+from app.services.model_registry import model_registry
+from app.services.response_cache import response_cache
+from app.services.semantic_cache import semantic_cache
+from app.services.shared_state import shared_state
+from app.services.stream_hub import LiveStream, StreamCapacityError, stream_hub
+from app.api.dependencies.chat import get_chat_service, get_chat_tool_service
 from app.models.chat import (
     ChatRequest,
     ChatResponse,
+    ConversationList,
     StreamChunk,
     ErrorResponse
 )
-import asyncio
+from app.utils.metrics import metrics
+from app.utils.sse import SSEEncoder, SSE_HEADERS, SSE_MEDIA_TYPE
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -56,42 +73,107 @@ async def chat(
         )
 
 
+def _last_event_id(http_request: Request) -> Optional[int]:
+    """Parse the Last-Event-ID header sent by reconnecting SSE clients"""
+    value = http_request.headers.get("last-event-id")
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _capacity_error(error: StreamCapacityError) -> HTTPException:
+    """503 for a start refused by the stream hub, so clients back off and retry"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": "1"}
+    )
+
+
+def _event_stream_response(
+    http_request: Request,
+    live: LiveStream,
+    last_event_id: int = 0,
+    headers: Optional[Dict[str, str]] = None
+) -> StreamingResponse:
+    """Wrap a live stream subscription into a text/event-stream response
+    
+    Frames after ``last_event_id`` are replayed first. When the client
+    disconnects the subscription is detached; the hub cancels the LLM run
+    unless the client resumes within the grace period.
+    """
+    encoder = SSEEncoder()
+    
+    async def generate_stream():
+        loop = asyncio.get_running_loop()
+        last_write = loop.time()
+        subscription = live.subscribe(
+            last_event_id,
+            idle_timeout=settings.stream_disconnect_poll_interval
+        )
+        async with aclosing(subscription):
+            async for event in subscription:
+                if event is None:
+                    if await http_request.is_disconnected():
+                        return
+                    if loop.time() - last_write >= settings.stream_heartbeat_interval:
+                        last_write = loop.time()
+                        yield encoder.heartbeat()
+                    continue
+                
+                event_id, chunk = event
+                last_write = loop.time()
+                yield encoder.encode(chunk, event_id)
+        
+        # Send end signal
+        yield encoder.done()
+    
+    return StreamingResponse(
+        generate_stream(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={**SSE_HEADERS, **(headers or {})}
+    )
+
+
 @router.post("/stream")
 async def stream_chat(
     request: ChatRequest,
+    http_request: Request,
     chat_service: ChatService = Depends(get_chat_service)
 ):
-    """Stream chat response"""
+    """Stream chat response
+    
+    A reconnecting client that sends ``Last-Event-ID`` with the same request
+    receives the missed frames and stays attached to the running generation.
+    """
     try:
-        async def generate_stream():
-            async for chunk in chat_service.stream_chat(
+        conversation_id = request.conversation_id or str(uuid.uuid4())
+        stream_key = f"chat:{conversation_id}"
+        
+        last_event_id = _last_event_id(http_request)
+        live = None
+        if last_event_id is not None:
+            live = stream_hub.resume(stream_key, request.message, last_event_id)
+        
+        if live is None:
+            last_event_id = 0
+            chunks = chat_service.stream_chat(
                 message=request.message,
                 messages=request.messages,
-                conversation_id=request.conversation_id,
+                conversation_id=conversation_id,
                 model=request.model,
                 temperature=request.temperature,
                 max_tokens=request.max_tokens
-            ):
-                # Format as Server-Sent Events
-                chunk_data = chunk.model_dump_json()
-                yield f"data: {chunk_data}\n\n"
-                
-                # Add small delay to prevent overwhelming the client
-                await asyncio.sleep(0.01)
-            
-            # Send end signal
-            yield "data: [DONE]\n\n"
+            )
+            live = stream_hub.start(stream_key, request.message, chunks)
         
-        return StreamingResponse(
-            generate_stream(),
-            media_type="text/plain",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "Content-Type": "text/plain; charset=utf-8"
-            }
-        )
+        return _event_stream_response(http_request, live, last_event_id)
         
+    except StreamCapacityError as e:
+        raise _capacity_error(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -107,42 +189,45 @@ async def stream_chat(
 @router.post("/stream_tools")
 async def stream_chat_with_tools(
     request: ChatRequest,
+    http_request: Request,
+    chat_tool_service: ChatToolService = Depends(get_chat_tool_service)
 ):
     """프로필 기반 도구를 사용한 스트리밍 채팅"""
     try:
-        chat_tool_service = ChatToolService()
+        conversation_id = request.conversation_id or str(uuid.uuid4())
+        stream_key = f"tools:{conversation_id}"
+        
+        last_event_id = _last_event_id(http_request)
+        live = None
+        if last_event_id is not None:
+            live = stream_hub.resume(stream_key, request.message, last_event_id)
         
-        async def generate_stream():
-            async for chunk in chat_tool_service.stream_chat_with_profile_tools(
+        if live is None:
+            last_event_id = 0
+            chunks = chat_tool_service.stream_chat_with_profile_tools(
                 message=request.message,
                 profile_id=request.profile_id,
                 messages=request.messages,
-                conversation_id=request.conversation_id,
-                model=request.model
-            ):
-                # Format as Server-Sent Events
-                chunk_data = chunk.model_dump_json()
-                yield f"data: {chunk_data}\n\n"
-                
-                # Add small delay to prevent overwhelming the client
-                await asyncio.sleep(0.01)
-            
-            # Send end signal
-            yield "data: [DONE]\n\n"
+                conversation_id=conversation_id,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens
+            )
+            live = stream_hub.start(stream_key, request.message, chunks)
         
-        return StreamingResponse(
-            generate_stream(),
-            media_type="text/plain",
+        return _event_stream_response(
+            http_request,
+            live,
+            last_event_id,
             headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "Content-Type": "text/plain; charset=utf-8",
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
                 "Access-Control-Allow-Headers": "*"
             }
         )
         
+    except StreamCapacityError as e:
+        raise _capacity_error(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -155,7 +240,38 @@ async def stream_chat_with_tools(
         )
 
 
+@router.get("/conversations", response_model=ConversationList)
+async def list_conversations(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page")
+):
+    """List conversations, most recently updated first (cursor pagination)"""
+    try:
+        conversations, next_cursor = await conversation_index.list(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return ConversationList(conversations=conversations, next_cursor=next_cursor)
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "chat"} 
\ No newline at end of file
+    return {
+        "status": "healthy",
+        "service": "chat",
+        "streams": stream_hub.stats(),
+        "models": model_registry.stats(),
+        "hedging": model_registry.hedge_stats(),
+        "admission": admission_controller.stats(),
+        "context": context_budget.stats(),
+        "compaction": conversation_compactor.stats(),
+        "conversations": await conversation_index.stats(),
+        "shared_state": shared_state.stats(),
+        "checkpoints": get_chat_service().memory.stats(),
+        "response_cache": response_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "metrics": metrics.snapshot()
+    } 
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+WebSocket chat endpoint
+하나의 WebSocket 연결로 여러 대화 스트림을 동시에 주고받습니다.
+
+Client -> server:
+    {"type": "chat", "stream_id": "s1", "mode": "chat" | "tools", "window": 64, "request": {ChatRequest}}
+    {"type": "credit", "stream_id": "s1", "frames": 32}
+    {"type": "cancel", "stream_id": "s1"}
+
+Server -> client:
+    {"type": "chunk", "stream_id": "s1", "data": {StreamChunk}}
+    {"type": "done", "stream_id": "s1"}
+    {"type": "error", "stream_id": "s1", "detail": "..."}
+
+Flow control is per stream: a stream may send ``window`` frames (at most
+``WS_MAX_STREAM_WINDOW``) and then waits for ``credit`` messages, so a slow
+conversation never blocks the others on the same socket. Unused credit never
+exceeds the stream's window.
+"""
+
+import asyncio
+import json
+import uuid
+from contextlib import aclosing
+from json.encoder import encode_basestring
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.api.dependencies.chat import get_chat_service, get_chat_tool_service
+from app.core.config import settings
+from app.models.chat import ChatRequest, StreamChunk
+from app.services.chat_service import ChatService
+from app.services.chat_tool_service import ChatToolService
+from app.utils.logging import get_logger
+from app.utils.sse import SSEEncoder
+from app.utils.streaming import StreamWriter
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/chat", tags=["chat"])
+
+
+class InvalidMessage(ValueError):
+    """A control message the session rejects (reported to the client, the socket stays open)"""
+
+
+def _positive_int(message: Dict[str, Any], field: str, default: Optional[int] = None) -> int:
+    value = message.get(field)
+    if value is None:
+        value = default
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise InvalidMessage(f"{field} must be a positive integer")
+    return value
+
+
+class StreamCredits:
+    """Frame credits of one stream, capped at its window"""
+    
+    def __init__(self, window: int):
+        self.window = window
+        self.available = window
+        self._granted = asyncio.Event()
+    
+    async def acquire(self):
+        while self.available <= 0:
+            self._granted.clear()
+            await self._granted.wait()
+        self.available -= 1
+    
+    def grant(self, frames: int):
+        self.available = min(self.available + frames, self.window)
+        self._granted.set()
+
+
+class ChatSocketSession:
+    """Multiplex conversation streams over one WebSocket connection"""
+    
+    def __init__(self, websocket: WebSocket, chat_service: ChatService, chat_tool_service: ChatToolService):
+        self.websocket = websocket
+        self.chat_service = chat_service
+        self.chat_tool_service = chat_tool_service
+        self.encoder = SSEEncoder()
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.credits: Dict[str, StreamCredits] = {}
+        self._send_lock = asyncio.Lock()
+    
+    async def send(self, payload: str):
+        """Serialize writes from concurrent streams"""
+        async with self._send_lock:
+            await self.websocket.send_text(payload)
+    
+    async def send_error(self, stream_id: Optional[str], detail: str):
+        await self.send(json.dumps(
+            {"type": "error", "stream_id": stream_id, "detail": detail},
+            ensure_ascii=False
+        ))
+    
+    async def run(self):
+        """Receive control messages until the client disconnects"""
+        try:
+            while True:
+                raw = await self.websocket.receive_text()
+                try:
+                    message = json.loads(raw)
+                except json.JSONDecodeError:
+                    await self.send_error(None, "Invalid JSON message")
+                    continue
+                if not isinstance(message, dict):
+                    await self.send_error(None, "Message must be a JSON object")
+                    continue
+                try:
+                    await self.handle(message)
+                except InvalidMessage as e:
+                    await self.send_error(self._stream_id(message), str(e))
+                except WebSocketDisconnect:
+                    raise
+                except Exception as e:
+                    # 잘못된 메시지 하나가 연결의 다른 스트림까지 끊지 않도록 오류로 응답
+                    logger.warning(f"Failed to handle WebSocket message: {e!r}")
+                    await self.send_error(self._stream_id(message), "Invalid message")
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in list(self.tasks.values()):
+                task.cancel()
+            if self.tasks:
+                await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+    
+    @staticmethod
+    def _stream_id(message: Dict[str, Any]) -> Optional[str]:
+        stream_id = message.get("stream_id")
+        return stream_id if isinstance(stream_id, str) else None
+    
+    async def handle(self, message: Dict[str, Any]):
+        """Dispatch one client message"""
+        message_type = message.get("type")
+        stream_id = message.get("stream_id")
+        if message_type in ("chat", "credit", "cancel") and (not isinstance(stream_id, str) or not stream_id):
+            raise InvalidMessage("stream_id must be a non-empty string")
+        
+        if message_type == "chat":
+            await self.start_stream(message)
+        elif message_type == "credit":
+            frames = _positive_int(message, "frames")
+            credits = self.credits.get(stream_id)
+            if credits is not None:
+                credits.grant(frames)
+        elif message_type == "cancel":
+            task = self.tasks.get(stream_id)
+            if task is not None:
+                task.cancel()
+        else:
+            await self.send_error(self._stream_id(message), f"Unsupported message type: {message_type}")
+    
+    def _open_stream(self, mode: str, request: ChatRequest) -> AsyncIterator[StreamChunk]:
+        """Open a chat stream on the same back ends as the HTTP endpoints"""
+        conversation_id = request.conversation_id or str(uuid.uuid4())
+        if mode == "tools":
+            return self.chat_tool_service.stream_chat_with_profile_tools(
+                message=request.message,
+                profile_id=request.profile_id,
+                messages=request.messages,
+                conversation_id=conversation_id,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens
+            )
+        return self.chat_service.stream_chat(
+            message=request.message,
+            messages=request.messages,
+            conversation_id=conversation_id,
+            model=request.model,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens
+        )
+    
+    async def start_stream(self, message: Dict[str, Any]):
+        stream_id = message["stream_id"]
+        if stream_id in self.tasks:
+            await self.send_error(stream_id, "stream_id is already active")
+            return
+        if len(self.tasks) >= settings.ws_max_streams_per_connection:
+            await self.send_error(stream_id, "Too many concurrent streams on this connection")
+            return
+        
+        mode = message.get("mode", "chat")
+        if mode not in ("chat", "tools"):
+            await self.send_error(stream_id, f"Unsupported mode: {mode}")
+            return
+        try:
+            request = ChatRequest.model_validate(message.get("request") or {})
+        except ValidationError as e:
+            await self.send_error(stream_id, str(e))
+            return
+        
+        window = _positive_int(message, "window", settings.ws_stream_window)
+        if window > settings.ws_max_stream_window:
+            raise InvalidMessage(f"window must be at most {settings.ws_max_stream_window}")
+        self.credits[stream_id] = StreamCredits(window)
+        self.tasks[stream_id] = asyncio.create_task(
+            self.pump_stream(stream_id, self._open_stream(mode, request))
+        )
+    
+    async def pump_stream(self, stream_id: str, chunks: AsyncIterator[StreamChunk]):
+        """Forward one conversation stream, one credit per frame"""
+        credits = self.credits[stream_id]
+        prefix = f'{{"type":"chunk","stream_id":{encode_basestring(stream_id)},"data":'
+        try:
+            async with aclosing(StreamWriter(chunks)) as writer:
+                async for chunk in writer:
+                    await credits.acquire()
+                    await self.send(f"{prefix}{self.encoder.encode_data(chunk)}}}")
+            await self.send(json.dumps({"type": "done", "stream_id": stream_id}))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"WebSocket stream {stream_id} failed: {e}")
+            try:
+                await self.send_error(stream_id, str(e))
+            except Exception:
+                pass
+        finally:
+            self.tasks.pop(stream_id, None)
+            self.credits.pop(stream_id, None)
+
+
+@router.websocket("/ws")
+async def chat_websocket(
+    websocket: WebSocket,
+    chat_service: ChatService = Depends(get_chat_service),
+    chat_tool_service: ChatToolService = Depends(get_chat_tool_service)
+):
+    """여러 대화를 하나의 WebSocket 연결로 스트리밍"""
+    await websocket.accept()
+    await ChatSocketSession(websocket, chat_service, chat_tool_service).run()
@@ -1,7 +1,7 @@
 """Application configuration settings"""
 
 import os
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -22,16 +22,130 @@ class Settings(BaseSettings):
     # Server Settings
     host: str = "0.0.0.0"
     port: int = 8000
+    workers: int = 1  # uvicorn 워커 프로세스 수 (1보다 크면 CHECKPOINT_BACKEND=sqlite + CHECKPOINT_SHARED=true 필요)
     
     # LLM Settings
     openai_api_key: Optional[str] = None
     anthropic_api_key: Optional[str] = None
     default_model: str = "gpt-4o-mini"
+    llm_request_timeout: float = 60.0
+    llm_client_cache_size: int = 32
+    llm_http_max_connections: int = 100
+    llm_http_max_keepalive: int = 20
+    llm_http_keepalive_expiry: float = 60.0
+    
+    # Model Registry Settings (JSON objects keyed by model name, "*" = any model)
+    model_providers: Dict[str, str] = {}
+    model_fallbacks: Dict[str, List[str]] = {}
+    model_first_token_timeouts: Dict[str, float] = {}
+    model_max_concurrency: Dict[str, int] = {}
+    llm_first_token_timeout: float = 20.0
+    llm_ttft_window: int = 200
+    llm_hedge_enabled: bool = False
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_min_samples: int = 20
+    llm_hedge_initial_delay: float = 2.0
+    llm_hedge_min_delay: float = 0.05
+    
+    # Fake LLM Provider (model names starting with "fake"; load tests and offline benchmarks)
+    fake_llm_ttft: float = 0.2
+    fake_llm_ttft_jitter: float = 0.0
+    fake_llm_tokens_per_second: float = 50.0
+    fake_llm_output_tokens: int = 64
+    fake_llm_output_tokens_stddev: float = 0.0
+    fake_llm_error_rate: float = 0.0
+    fake_llm_error_status: int = 503
+    fake_llm_tool_calls: List[str] = []
+    fake_llm_seed: int = 0
+    fake_llm_models: Dict[str, Dict[str, Any]] = {}
     
     # Chat Settings
     max_tokens: int = 1000
     temperature: float = 0.7
     
+    # Context Budget Settings (total tokens per model incl. the completion's max_tokens, "*" = any model)
+    context_budget_enabled: bool = True
+    context_budget_tokens: int = 16000
+    model_context_budgets: Dict[str, int] = {}
+    context_keep_recent_turns: int = 2
+    context_min_truncated_tokens: int = 64
+    context_token_cache_size: int = 4096
+    context_tokenizer: str = "auto"  # auto: OpenAI 모델은 tiktoken, 그 외/실패 시 휴리스틱 | heuristic
+    
+    # Conversation History Settings
+    history_mode: str = "server"  # server: 체크포인트된 스레드가 기준 (보낸 기록은 중복 제거) | client: 보낸 기록으로 스레드 교체
+    
+    # Checkpointer Settings (conversation state kept per thread_id)
+    checkpoint_max_threads: int = 10000
+    checkpoint_max_bytes: int = 512 * 1024 * 1024
+    checkpoint_thread_ttl_seconds: float = 86400.0
+    checkpoint_keep_per_thread: int = 2
+    checkpoint_delta_messages: bool = True  # 메시지 목록을 전체 복사 대신 메시지 풀 참조(델타)로 저장
+    checkpoint_prune_completed_runs: bool = True  # 실행이 끝나면 중간 체크포인트 정리
+    checkpoint_backend: str = "memory"  # memory | sqlite (메모리 캐시 + SQLite write-behind 영속화)
+    checkpoint_sqlite_path: str = "data/checkpoints.sqlite3"
+    checkpoint_flush_interval: float = 0.05
+    checkpoint_flush_max_batch: int = 256
+    checkpoint_compress_min_bytes: int = 1024
+    checkpoint_shared: bool = False  # 여러 워커/노드가 같은 SQLite 파일 공유: 턴 종료 시 커밋, 캐시를 디스크 최신 체크포인트로 검증
+    checkpoint_lease_seconds: float = 120.0  # shared 모드 스레드 임대 만료 (턴/압축 교체가 다른 워커와 겹치지 않도록)
+    checkpoint_lease_poll_interval: float = 0.05
+    
+    # Conversation Compaction Settings (summarize older turns of long threads in the background)
+    compaction_enabled: bool = False
+    compaction_threshold_tokens: int = 4000
+    compaction_keep_recent_turns: int = 4
+    compaction_model: str = "gpt-4o-mini"
+    compaction_summary_max_tokens: int = 512
+    compaction_temperature: float = 0.0
+    
+    # Retry / Circuit Breaker Settings (retries happen only before the first token)
+    llm_max_retries: int = 2
+    llm_retry_base_delay: float = 0.2
+    llm_retry_max_delay: float = 5.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+    
+    # Provider Admission Settings (JSON objects keyed by provider, "*" = any provider, 0 = unlimited)
+    provider_max_in_flight: Dict[str, int] = {}
+    provider_requests_per_minute: Dict[str, int] = {}
+    provider_tokens_per_minute: Dict[str, int] = {}
+    admission_queue_timeout: float = 30.0
+    
+    # Response Cache Settings (exact-match, stateless requests only)
+    response_cache_enabled: bool = False
+    response_cache_max_entries: int = 1024
+    response_cache_max_bytes: int = 16 * 1024 * 1024
+    response_cache_ttl_seconds: float = 3600.0
+    
+    # Semantic Cache Settings (profile assistant, single-turn requests only)
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.9
+    semantic_cache_dimension: int = 1024
+    semantic_cache_max_entries_per_profile: int = 256
+    semantic_cache_max_profiles: int = 1000
+    semantic_cache_ttl_seconds: float = 3600.0
+    semantic_cache_synonyms: Dict[str, List[str]] = {}
+    semantic_cache_embedding_model: Optional[str] = None
+    
+    # Streaming Settings
+    stream_coalesce_window_ms: int = 25
+    stream_max_frame_bytes: int = 4096
+    stream_queue_size: int = 256
+    stream_heartbeat_interval: float = 15.0
+    stream_disconnect_poll_interval: float = 1.0
+    stream_resume_grace_seconds: float = 10.0
+    stream_replay_max_events: int = 1024
+    stream_replay_max_streams: int = 1000
+    stream_max_live_streams: int = 500  # 동시에 생성 중인 스트림 상한 (넘으면 새 스트림은 503)
+    stream_replay_ttl_seconds: float = 300.0
+    stream_preamble_hold_chars: int = 200
+    
+    # WebSocket Settings
+    ws_max_streams_per_connection: int = 32
+    ws_stream_window: int = 64
+    ws_max_stream_window: int = 1024
+    
     # CORS Settings - Handle as string then convert to list
     cors_origins: Optional[str] = None
     
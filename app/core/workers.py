@@ -0,0 +1,95 @@
+"""
+Worker process detection
+메모리 체크포인터, 대화 목록, 압축 잠금처럼 프로세스마다 따로 있는 상태는 워커가 여러 개이면 어긋나므로,
+CHECKPOINT_SHARED 없이 여러 워커로 실행되는 것을 시작 시점에 감지합니다.
+
+- 설정: WORKERS 또는 WEB_CONCURRENCY (uvicorn/gunicorn --workers의 기본값)
+- 실행 중 감지: uvicorn 감독 프로세스가 띄운 워커는 감독 프로세스별 잠금 파일을 잡고, 이미 잡혀 있으면 다른 워커가 살아 있는 것
+"""
+
+import multiprocessing
+import os
+import re
+import tempfile
+from typing import Optional
+
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def configured_workers() -> int:
+    """Worker count the deployment asks for, from ``WORKERS`` or ``WEB_CONCURRENCY``"""
+    try:
+        web_concurrency = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    except ValueError:
+        web_concurrency = 1
+    return max(settings.workers, web_concurrency)
+
+
+class SiblingWorkerGuard:
+    """Detects other live workers started by the same uvicorn supervisor.
+
+    A worker process spawned by a supervisor (``--workers`` or ``--reload``)
+    takes an exclusive ``flock`` on a file named after the supervisor's pid.
+    The lock goes away with the process, so a reloaded worker gets it again,
+    while a second concurrent worker finds it taken.
+    """
+
+    def __init__(self):
+        self._fd: Optional[int] = None
+        self._path: Optional[str] = None
+
+    def acquire(self) -> bool:
+        """Take the lock; returns ``False`` when another worker of the same supervisor holds it"""
+        if fcntl is None or multiprocessing.parent_process() is None or self._fd is not None:
+            return True
+        name = re.sub(r"\W+", "-", settings.app_name).strip("-").lower() or "app"
+        path = os.path.join(tempfile.gettempdir(), f"{name}-workers-{os.getppid()}.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd, self._path = fd, path
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            os.unlink(self._path)
+        except OSError:
+            pass
+        os.close(self._fd)
+        self._fd = self._path = None
+
+
+def check_process_model(reload: bool = False, guard: Optional["SiblingWorkerGuard"] = None):
+    """Refuse to run several workers on process-local state.
+
+    Raises ``RuntimeError`` when ``reload`` is combined with more than one
+    worker, or when more than one worker is configured or detected while
+    ``CHECKPOINT_SHARED`` is off.
+    """
+    workers = configured_workers()
+    if reload and workers > 1:
+        # uvicorn은 reload 모드에서 워커 수를 조용히 무시함
+        raise RuntimeError("DEBUG (reload) cannot be combined with WORKERS/WEB_CONCURRENCY > 1")
+    if settings.checkpoint_shared:
+        return
+    if workers > 1:
+        raise RuntimeError("WORKERS > 1 requires CHECKPOINT_BACKEND=sqlite and CHECKPOINT_SHARED=true")
+    if guard is not None and not guard.acquire():
+        raise RuntimeError(
+            "Another worker of this server is running; several workers require "
+            "CHECKPOINT_BACKEND=sqlite and CHECKPOINT_SHARED=true"
+        )
+
+
+# 전역 워커 감지 인스턴스
+sibling_worker_guard = SiblingWorkerGuard()
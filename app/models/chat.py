@@ -15,6 +15,7 @@ class MessageRole(str, Enum):
 
 class ChatMessage(BaseModel):
     """Individual chat message model"""
+    id: Optional[str] = Field(default=None, description="Message id, used to match messages already stored in the conversation")
     role: MessageRole
     content: str
     timestamp: datetime = Field(default_factory=datetime.now)
@@ -47,12 +48,14 @@ class StreamChunk(BaseModel):
     content: str
     conversation_id: str
     is_final: bool = False
+    chunk_type: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
 
 class ConversationSummary(BaseModel):
     """Conversation summary model"""
     conversation_id: str
+    scope: str = "chat"
     title: Optional[str] = None
     message_count: int
     created_at: datetime
@@ -60,6 +63,12 @@ class ConversationSummary(BaseModel):
     preview: Optional[str] = None
 
 
+class ConversationList(BaseModel):
+    """A page of conversations, most recently updated first"""
+    conversations: List[ConversationSummary]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `cursor` to fetch the next page")
+
+
 class ErrorResponse(BaseModel):
     """Error response model"""
     error: str
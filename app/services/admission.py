@@ -0,0 +1,252 @@
+"""
+Provider admission control
+프로바이더별 동시 요청 수, 분당 요청(RPM)/토큰(TPM) 예산을 적용하고, 초과 요청은 FIFO 큐에서 순서대로 대기시킵니다.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+from app.core.config import settings
+from app.utils.logging import get_logger
+from app.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class AdmissionTimeoutError(TimeoutError):
+    """A request waited longer than the queue timeout for a provider slot"""
+
+
+class TokenBucket:
+    """Budget refilled continuously at ``per_minute`` units per minute, holding at most one minute's worth"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be taken (0 when available now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        """Give back (positive) or charge (negative) units after the actual cost is known"""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+@dataclass
+class _Waiter:
+    tokens: int
+    future: asyncio.Future
+    admitted: bool = False
+
+
+@dataclass
+class AdmissionTicket:
+    """An admitted request; set ``actual_tokens`` once usage is known to settle the TPM budget"""
+    estimated_tokens: int
+    actual_tokens: Optional[int] = None
+
+
+class ProviderAdmission:
+    """Admission gate for one provider.
+
+    Requests are admitted strictly in arrival order: while anyone is queued a
+    newcomer joins the back of the queue, and the head of the queue blocks
+    everyone behind it until it fits the in-flight limit and both budgets.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        max_in_flight: int = 0,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        queue_timeout: Optional[float] = None
+    ):
+        self.provider = provider
+        self.max_in_flight = max_in_flight
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.queue_timeout = settings.admission_queue_timeout if queue_timeout is None else queue_timeout
+        self.in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.admitted = 0
+        self.timed_out = 0
+        self.max_queue_depth = 0
+        self._wait_samples: Deque[float] = deque(maxlen=1024)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _wait_time(self, tokens: int) -> Optional[float]:
+        """0 when admissible now, seconds until the budgets allow it, or None while in-flight is full"""
+        if 0 < self.max_in_flight <= self.in_flight:
+            return None
+        now = time.monotonic()
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def _admit(self, tokens: int):
+        now = time.monotonic()
+        if self.requests is not None:
+            self.requests.take(1, now)
+        if self.tokens is not None:
+            self.tokens.take(tokens, now)
+        self.in_flight += 1
+        self.admitted += 1
+
+    def _dispatch(self):
+        """Admit queued requests from the head while they fit"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            head = self._waiters[0]
+            wait = self._wait_time(head.tokens)
+            if wait is None:
+                return
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            self._waiters.popleft()
+            self._admit(head.tokens)
+            head.admitted = True
+            head.future.set_result(None)
+
+    def _record_wait(self, seconds: float):
+        self._wait_samples.append(seconds)
+        metrics.observe(f"admission.wait.{self.provider}", seconds)
+
+    async def acquire(self, tokens: int):
+        """Wait for admission in FIFO order, raising ``AdmissionTimeoutError`` after the queue timeout"""
+        if not self._waiters and self._wait_time(tokens) == 0:
+            self._admit(tokens)
+            self._record_wait(0.0)
+            return
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        waiter = _Waiter(tokens, loop.create_future())
+        self._waiters.append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout or None)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.admitted:
+                # 타임아웃과 동시에 승인된 경우 슬롯을 돌려줌
+                self.release(AdmissionTicket(tokens))
+            else:
+                self._waiters.remove(waiter)
+                self._dispatch()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.timed_out += 1
+            metrics.increment(f"admission.timeout.{self.provider}")
+            raise AdmissionTimeoutError(
+                f"{self.provider}: no capacity within {self.queue_timeout}s (queue depth {len(self._waiters)})"
+            ) from None
+        finally:
+            self._record_wait(loop.time() - started)
+
+    def release(self, ticket: AdmissionTicket):
+        self.in_flight -= 1
+        if self.tokens is not None and ticket.actual_tokens is not None:
+            self.tokens.adjust(ticket.estimated_tokens - ticket.actual_tokens)
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._wait_samples)
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "timed_out": self.timed_out,
+            "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+            "wait_p95": waits[max(math.ceil(0.95 * len(waits)), 1) - 1] if waits else 0.0,
+            "requests_available": int(self.requests.tokens) if self.requests is not None else None,
+            "tokens_available": int(self.tokens.tokens) if self.tokens is not None else None
+        }
+
+
+class AdmissionController:
+    """Per-provider admission gates configured from Settings ("*" applies to every provider)"""
+
+    def __init__(
+        self,
+        max_in_flight: Optional[Dict[str, int]] = None,
+        requests_per_minute: Optional[Dict[str, int]] = None,
+        tokens_per_minute: Optional[Dict[str, int]] = None,
+        queue_timeout: Optional[float] = None
+    ):
+        self.max_in_flight = dict(settings.provider_max_in_flight if max_in_flight is None else max_in_flight)
+        self.requests_per_minute = dict(
+            settings.provider_requests_per_minute if requests_per_minute is None else requests_per_minute
+        )
+        self.tokens_per_minute = dict(
+            settings.provider_tokens_per_minute if tokens_per_minute is None else tokens_per_minute
+        )
+        self.queue_timeout = queue_timeout
+        self._providers: Dict[str, ProviderAdmission] = {}
+
+    @staticmethod
+    def _lookup(table: Dict[str, int], provider: str) -> int:
+        return table.get(provider, table.get("*", 0))
+
+    def provider(self, provider: str) -> ProviderAdmission:
+        gate = self._providers.get(provider)
+        if gate is None:
+            gate = ProviderAdmission(
+                provider,
+                max_in_flight=self._lookup(self.max_in_flight, provider),
+                requests_per_minute=self._lookup(self.requests_per_minute, provider),
+                tokens_per_minute=self._lookup(self.tokens_per_minute, provider),
+                queue_timeout=self.queue_timeout
+            )
+            self._providers[provider] = gate
+        return gate
+
+    @asynccontextmanager
+    async def admit(self, provider: str, estimated_tokens: int):
+        """Hold an admission slot of ``provider`` for the duration of one LLM call"""
+        gate = self.provider(provider)
+        await gate.acquire(estimated_tokens)
+        ticket = AdmissionTicket(estimated_tokens)
+        try:
+            yield ticket
+        finally:
+            gate.release(ticket)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: gate.stats() for name, gate in self._providers.items()}
+
+
+# 전역 어드미션 컨트롤러 인스턴스
+admission_controller = AdmissionController()
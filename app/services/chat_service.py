@@ -1,17 +1,24 @@
 """Chat service using LangGraph and LangChain"""
 
 import uuid
-from typing import AsyncGenerator, Optional, List
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
+from contextlib import aclosing
+from typing import AsyncGenerator, Optional, List, Set
+from langchain_core.messages import AIMessage
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import RunnableConfig
 from typing_extensions import Annotated, TypedDict
 
 from app.core.config import settings
-from app.models.chat import StreamChunk, ChatMessage, MessageRole
+from app.models.chat import StreamChunk, ChatMessage
+from app.services.checkpointer import create_checkpointer
+from app.services.compaction import COMPACTION_NODE, conversation_compactor, with_system_prompt
+from app.services.conversation_index import conversation_index
+from app.services.history import turn_input
+from app.services.llm_clients import generation_config
+from app.services.model_registry import model_registry, stream_message
+from app.services.response_cache import response_cache
+from app.utils.messages import message_text
 
 
 class ChatState(TypedDict):
@@ -25,53 +32,22 @@ class ChatService:
     """Chat service using LangGraph for conversation management"""
     
     def __init__(self):
-        self.memory = MemorySaver()
+        self.memory = create_checkpointer("chat")
         self.graph = self._create_chat_graph()
         
-    def _get_llm(self, model_name: str = None):
-        """Get LLM instance based on model name"""
-        model = model_name or settings.default_model
-        
-        if model.startswith("gpt"):
-            if not settings.openai_api_key:
-                raise ValueError("OpenAI API key not configured")
-            return ChatOpenAI(
-                model=model,
-                temperature=settings.temperature,
-                max_tokens=settings.max_tokens,
-                openai_api_key=settings.openai_api_key,
-                streaming=True
-            )
-        elif model.startswith("claude"):
-            if not settings.anthropic_api_key:
-                raise ValueError("Anthropic API key not configured")
-            return ChatAnthropic(
-                model=model,
-                temperature=settings.temperature,
-                max_tokens=settings.max_tokens,
-                anthropic_api_key=settings.anthropic_api_key,
-                streaming=True
-            )
-        else:
-            raise ValueError(f"Unsupported model: {model}")
-    
     def _create_chat_graph(self) -> StateGraph:
         """Create LangGraph for chat conversation"""
         
-        async def chat_node(state: ChatState):
+        async def chat_node(state: ChatState, config: RunnableConfig):
             """Main chat node that processes messages"""
-            llm = self._get_llm(state.get("model_name"))
-            
-            # Add system message if not present
-            messages = state["messages"]
-            if not any(isinstance(msg, SystemMessage) for msg in messages):
-                system_msg = SystemMessage(
-                    content="당신은 도움이 되는 AI 어시스턴트입니다. 사용자의 질문에 정확하고 친절하게 답변해주세요."
-                )
-                messages = [system_msg] + messages
+            # Add system message if not present (with the compacted summary of older turns)
+            messages = with_system_prompt(
+                state["messages"],
+                "당신은 도움이 되는 AI 어시스턴트입니다. 사용자의 질문에 정확하고 친절하게 답변해주세요."
+            )
             
-            # Get response from LLM
-            response = await llm.ainvoke(messages)
+            # Get response from the model, falling back along its chain on early failures
+            response = await model_registry.ainvoke(state.get("model_name"), messages, config)
             
             return {
                 "messages": [response],
@@ -79,27 +55,45 @@ class ChatService:
                 "model_name": state["model_name"]
             }
         
+        async def compact_node(state: ChatState, config: RunnableConfig):
+            """Schedule background summarization of older turns once the thread grows long"""
+            conversation_compactor.schedule("chat", self.graph, config, state.get("model_name"))
+            return {}
+        
         # Create graph
         workflow = StateGraph(ChatState)
         workflow.add_node("chat", chat_node)
+        workflow.add_node(COMPACTION_NODE, compact_node)
         workflow.set_entry_point("chat")
-        workflow.add_edge("chat", END)
+        workflow.add_edge("chat", COMPACTION_NODE)
+        workflow.add_edge(COMPACTION_NODE, END)
         
         return workflow.compile(checkpointer=self.memory)
     
-    def _convert_messages_to_langchain(self, messages: List[ChatMessage]) -> List:
-        """Convert ChatMessage list to LangChain message format"""
-        langchain_messages = []
-        
-        for msg in messages:
-            if msg.role == MessageRole.USER:
-                langchain_messages.append(HumanMessage(content=msg.content))
-            elif msg.role == MessageRole.ASSISTANT:
-                langchain_messages.append(AIMessage(content=msg.content))
-            elif msg.role == MessageRole.SYSTEM:
-                langchain_messages.append(SystemMessage(content=msg.content))
-        
-        return langchain_messages
+    async def _response_cache_key(
+        self,
+        config: RunnableConfig,
+        message: str,
+        messages: Optional[List[ChatMessage]],
+        model: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int]
+    ) -> Optional[str]:
+        """Response cache key, or None when the cache is off or the thread already has server-side history"""
+        if not response_cache.enabled:
+            return None
+        state = await self.graph.aget_state(config)
+        if state.values.get("messages"):
+            return None
+        return response_cache.make_key(message, messages, model, temperature, max_tokens)
+    
+    async def _record_cached_turn(self, config: RunnableConfig, input_data: dict, answer: str):
+        """Write a cache-served turn to the thread so follow-up turns see it"""
+        await self.graph.aupdate_state(
+            config,
+            {**input_data, "messages": input_data["messages"] + [AIMessage(content=answer)]},
+            as_node=COMPACTION_NODE
+        )
 
     async def chat(
         self,
@@ -116,32 +110,41 @@ class ChatService:
         if not conversation_id:
             conversation_id = str(uuid.uuid4())
         
-        # Create thread config
-        config = {"configurable": {"thread_id": conversation_id}}
-        
-        # Prepare messages
-        if messages:
-            # Use provided conversation history and add current message
-            input_messages = self._convert_messages_to_langchain(messages)
-            input_messages.append(HumanMessage(content=message))
-        else:
-            # Use single message
-            input_messages = [HumanMessage(content=message)]
-        
-        # Prepare input
-        input_data = {
-            "messages": input_messages,
-            "conversation_id": conversation_id,
-            "model_name": model or settings.default_model
-        }
+        # Create thread config with per-request generation parameters
+        config = generation_config(conversation_id, temperature, max_tokens)
         
         try:
+            # Prepare messages: the new message plus supplied history the thread does not have yet
+            input_messages = await turn_input(self.graph, config, message, messages)
+            
+            # Prepare input
+            input_data = {
+                "messages": input_messages,
+                "conversation_id": conversation_id,
+                "model_name": model or settings.default_model
+            }
+            
+            # Serve identical stateless requests from the response cache
+            cache_key = await self._response_cache_key(config, message, messages, model, temperature, max_tokens)
+            if cache_key is not None:
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    await self._record_cached_turn(config, input_data, cached)
+                    await conversation_index.record_turn("chat", conversation_id, input_messages, cached)
+                    return cached
+            
             # Process through graph
-            result = await self.graph.ainvoke(input_data, config=config)
+            async with conversation_compactor.turn("chat", conversation_id):
+                result = await self.graph.ainvoke(input_data, config=config)
+                await self.memory.acomplete_run(conversation_id)
             
             # Extract response
             last_message = result["messages"][-1]
-            return last_message.content
+            answer = message_text(last_message.content)
+            if cache_key is not None and answer:
+                response_cache.put(cache_key, answer)
+            await conversation_index.record_turn("chat", conversation_id, input_messages, answer)
+            return answer
         except Exception as e:
             # Return a simple response if LLM is not available
             return f"죄송합니다. 현재 AI 서비스에 연결할 수 없습니다. 오류: {str(e)}"
@@ -162,17 +165,11 @@ class ChatService:
             conversation_id = str(uuid.uuid4())
         
         try:
-            # Create thread config
-            config = {"configurable": {"thread_id": conversation_id}}
+            # Create thread config with per-request generation parameters
+            config = generation_config(conversation_id, temperature, max_tokens)
             
-            # Prepare messages
-            if messages:
-                # Use provided conversation history and add current message
-                input_messages = self._convert_messages_to_langchain(messages)
-                input_messages.append(HumanMessage(content=message))
-            else:
-                # Use single message
-                input_messages = [HumanMessage(content=message)]
+            # Prepare messages: the new message plus supplied history the thread does not have yet
+            input_messages = await turn_input(self.graph, config, message, messages)
 
             # Prepare input
             input_data = {
@@ -181,24 +178,46 @@ class ChatService:
                 "model_name": model or settings.default_model
             }
             
-            # Stream through graph
-            accumulated_content = ""
-            async for chunk in self.graph.astream(input_data, config=config):
-                if "chat" in chunk:
-                    messages = chunk["chat"]["messages"]
-                    if messages:
-                        last_message = messages[-1]
-                        if hasattr(last_message, 'content'):
-                            content = last_message.content
-                            if content != accumulated_content:
-                                new_content = content[len(accumulated_content):]
-                                accumulated_content = content
-                                
-                                yield StreamChunk(
-                                    content=new_content,
-                                    conversation_id=conversation_id,
-                                    is_final=False
-                                )
+            # Replay a cached answer for identical stateless requests
+            cache_key = await self._response_cache_key(config, message, messages, model, temperature, max_tokens)
+            cached = response_cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                await self._record_cached_turn(config, input_data, cached)
+                await conversation_index.record_turn("chat", conversation_id, input_messages, cached)
+                yield StreamChunk(content=cached, conversation_id=conversation_id, is_final=False)
+                yield StreamChunk(
+                    content="",
+                    conversation_id=conversation_id,
+                    is_final=True,
+                    metadata={"cache": "hit"}
+                )
+                return
+            
+            # Stream LLM tokens from the chat node as the provider emits them
+            # (hedged calls deliver their tokens on the custom stream)
+            parts: List[str] = []
+            hedged_ids: Set[str] = set()
+            async with conversation_compactor.turn("chat", conversation_id), aclosing(self.graph.astream(
+                input_data, config=config, stream_mode=["messages", "custom"]
+            )) as stream:
+                async for stream_mode, payload in stream:
+                    message_chunk = stream_message(stream_mode, payload, "chat", hedged_ids)
+                    if message_chunk is None:
+                        continue
+                
+                    content = message_text(message_chunk.content)
+                    if content:
+                        parts.append(content)
+                        yield StreamChunk(
+                            content=content,
+                            conversation_id=conversation_id,
+                            is_final=False
+                        )
+                await self.memory.acomplete_run(conversation_id)
+            
+            if cache_key is not None and parts:
+                response_cache.put(cache_key, "".join(parts))
+            await conversation_index.record_turn("chat", conversation_id, input_messages, "".join(parts))
             
             # Send final chunk
             yield StreamChunk(
@@ -4,24 +4,34 @@ Profile tools를 사용하여 사용자 질문에 대답하는 AI 서비스
 """
 
 import uuid
-from typing import AsyncGenerator, Optional, List, Dict, Any
+from contextlib import aclosing
+from typing import AsyncGenerator, Optional, List, Dict, Any, Set, Tuple
 
 
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
+from langchain_core.messages import AIMessage, ToolMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import RunnableConfig
 from typing_extensions import Annotated, TypedDict
 
 from app.core.config import settings
-from app.models.chat import StreamChunk, ChatMessage, MessageRole
+from app.models.chat import StreamChunk, ChatMessage
+from app.services.checkpointer import create_checkpointer
+from app.services.compaction import COMPACTION_NODE, conversation_compactor, with_system_prompt
+from app.services.conversation_index import conversation_index
+from app.services.history import turn_input
+from app.services.llm_clients import generation_config
+from app.services.model_registry import model_registry, stream_message
+from app.services.semantic_cache import semantic_cache
+from app.utils.logging import get_logger
+from app.utils.messages import message_text
 
 from app.services.tools import get_profile_info, get_careers_by_profile, get_projects_by_profile, get_profile_with_full_details
 
+logger = get_logger(__name__)
+
 
 class ChatToolState(TypedDict):
     """채팅 도구 상태"""
@@ -31,11 +41,65 @@ class ChatToolState(TypedDict):
     model_name: str
 
 
+class AgentTextBuffer:
+    """Holds an agent message's streamed text until it is known to be an answer or a tool-call preamble.
+
+    Each piece of text is released exactly once, as ``(chunk_type, text)``:
+    ``ai_preamble`` when the message turns out to call a tool, ``ai_response``
+    when it ends without one. Tool preambles are short, so once the held text
+    passes ``hold_chars`` the message is treated as the answer and the rest
+    streams token by token.
+    """
+
+    def __init__(self, hold_chars: Optional[int] = None):
+        self.hold_chars = settings.stream_preamble_hold_chars if hold_chars is None else hold_chars
+        self.message_id: Optional[str] = None
+        self.chunk_type: Optional[str] = None
+        self.held: List[str] = []
+        self.held_chars = 0
+
+    def _release(self, chunk_type: str) -> List[Tuple[str, str]]:
+        text = "".join(self.held)
+        self.held, self.held_chars = [], 0
+        self.chunk_type = chunk_type
+        return [(chunk_type, text)] if text else []
+
+    def _switch(self, message_id: Optional[str]) -> List[Tuple[str, str]]:
+        if message_id == self.message_id:
+            return []
+        released = self.finish(tool_call=False)
+        self.message_id = message_id
+        return released
+
+    def text(self, message_id: Optional[str], content: str) -> List[Tuple[str, str]]:
+        released = self._switch(message_id)
+        if self.chunk_type is not None:
+            return released + [(self.chunk_type, content)]
+        self.held.append(content)
+        self.held_chars += len(content)
+        if self.held_chars > self.hold_chars:
+            released += self._release("ai_response")
+        return released
+
+    def tool_call(self, message_id: Optional[str]) -> List[Tuple[str, str]]:
+        """A tool-call chunk of the message arrived: held text is a preamble"""
+        released = self._switch(message_id)
+        if self.chunk_type is None:
+            released += self._release("ai_preamble")
+        return released
+
+    def finish(self, tool_call: bool) -> List[Tuple[str, str]]:
+        """The current message ended (with or without tool calls)"""
+        released = self._release("ai_preamble" if tool_call else "ai_response") if self.chunk_type is None else []
+        self.message_id, self.chunk_type = None, None
+        return released
+
+
 class ChatToolService:
     """프로필 도구를 활용한 채팅 서비스"""
     
     def __init__(self):
-        self.memory = MemorySaver()
+        self.memory = create_checkpointer("tools")
         self.tools = [
             get_profile_info, 
             get_careers_by_profile, 
@@ -44,40 +108,11 @@ class ChatToolService:
         ]
         self.graph = self._create_chat_tool_graph()
         
-    def _get_llm(self, model_name: str = None):
-        """Get LLM instance based on model name"""
-        model = model_name or settings.default_model
-        
-        if model.startswith("gpt"):
-            if not settings.openai_api_key:
-                raise ValueError("OpenAI API key not configured")
-            return ChatOpenAI(
-                model=model,
-                temperature=settings.temperature,
-                max_tokens=settings.max_tokens,
-                openai_api_key=settings.openai_api_key,
-                streaming=True
-            )
-        elif model.startswith("claude"):
-            if not settings.anthropic_api_key:
-                raise ValueError("Anthropic API key not configured")
-            return ChatAnthropic(
-                model=model,
-                temperature=settings.temperature,
-                max_tokens=settings.max_tokens,
-                anthropic_api_key=settings.anthropic_api_key,
-                streaming=True
-            )
-        else:
-            raise ValueError(f"Unsupported model: {model}")
-    
     def _create_chat_tool_graph(self) -> StateGraph:
         """프로필 도구를 사용하는 채팅 그래프 생성"""
         
-        async def agent_node(state: ChatToolState):
+        async def agent_node(state: ChatToolState, config: RunnableConfig):
             """에이전트 노드 - LLM이 도구를 사용할지 결정"""
-            llm = self._get_llm(state.get("model_name"))
-            llm_with_tools = llm.bind_tools(self.tools)
             
             # 시스템 프롬프트 설정
             system_prompt = f"""당신은 전문 프로필 관리 AI 어시스턴트입니다.
@@ -99,14 +134,13 @@ class ChatToolService:
 - 항상 정중하고 도움이 되는 톤으로 응답
 - 사용자는 해당 프로필에 궁금한게 있어 질문을 하는거라 친절하게 응답"""
 
-            # 메시지 준비
-            messages = state["messages"]
-            if not any(isinstance(msg, SystemMessage) for msg in messages):
-                system_msg = SystemMessage(content=system_prompt)
-                messages = [system_msg] + messages
+            # 메시지 준비 (압축된 이전 대화 요약은 시스템 프롬프트에 포함)
+            messages = with_system_prompt(state["messages"], system_prompt)
             
-            # LLM 호출
-            response = await llm_with_tools.ainvoke(messages)
+            # LLM 호출 (첫 토큰 전 실패 시 폴백 모델로 전환)
+            response = await model_registry.ainvoke(
+                state.get("model_name"), messages, config, tools=self.tools
+            )
             
             return {
                 "messages": [response],
@@ -123,7 +157,12 @@ class ChatToolService:
             # AI 메시지에 tool_calls가 있으면 tools 노드로
             if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
                 return "tools"
-            return END
+            return COMPACTION_NODE
+        
+        async def compact_node(state: ChatToolState, config: RunnableConfig):
+            """긴 대화의 오래된 턴을 백그라운드에서 요약하도록 예약"""
+            conversation_compactor.schedule("tools", self.graph, config, state.get("model_name"))
+            return {}
         
         # Tool 노드
         tool_node = ToolNode(self.tools)
@@ -132,30 +171,16 @@ class ChatToolService:
         workflow = StateGraph(ChatToolState)
         workflow.add_node("agent", agent_node)
         workflow.add_node("tools", tool_node)
+        workflow.add_node(COMPACTION_NODE, compact_node)
         
         # 엣지 설정
         workflow.set_entry_point("agent")
         workflow.add_conditional_edges("agent", should_continue)
         workflow.add_edge("tools", "agent")
+        workflow.add_edge(COMPACTION_NODE, END)
         
         return workflow.compile(checkpointer=self.memory)
     
-    def _convert_messages_to_langchain(self, messages: List[ChatMessage]) -> List:
-        """Convert ChatMessage list to LangChain message format"""
-        langchain_messages = []
-        
-        for msg in messages:
-            if msg.role == MessageRole.USER:
-                langchain_messages.append(HumanMessage(content=msg.content))
-            elif msg.role == MessageRole.ASSISTANT:
-                langchain_messages.append(AIMessage(content=msg.content))
-            elif msg.role == MessageRole.SYSTEM:
-                langchain_messages.append(SystemMessage(content=msg.content))
-        
-        return langchain_messages
-
-
-    
     async def stream_chat_with_profile_tools(
         self,
         message: str,
@@ -163,6 +188,8 @@ class ChatToolService:
         messages: Optional[List[ChatMessage]] = None,
         conversation_id: Optional[str] = None,
         model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
         **kwargs
     ) -> AsyncGenerator[StreamChunk, None]:
         """프로필 도구를 사용한 스트리밍 채팅"""
@@ -171,15 +198,11 @@ class ChatToolService:
             conversation_id = str(uuid.uuid4())
         
         try:
-            # Create thread config
-            config = {"configurable": {"thread_id": conversation_id}}
+            # Create thread config with per-request generation parameters
+            config = generation_config(conversation_id, temperature, max_tokens)
             
-            # Prepare messages
-            if messages:
-                input_messages = self._convert_messages_to_langchain(messages)
-                input_messages.append(HumanMessage(content=message))
-            else:
-                input_messages = [HumanMessage(content=message)]
+            # Prepare messages: the new message plus supplied history the thread does not have yet
+            input_messages = await turn_input(self.graph, config, message, messages)
 
             # Prepare input
             input_data = {
@@ -189,49 +212,121 @@ class ChatToolService:
                 "model_name": model or settings.default_model
             }
             
+            # 단일 턴 질문은 같은 프로필의 비슷한 이전 질문 답변으로 응답 (시맨틱 캐시)
+            query_vector = None
+            if semantic_cache.enabled and not messages:
+                state = await self.graph.aget_state(config)
+                if not state.values.get("messages"):
+                    cache_key = semantic_cache.key(profile_id, model, temperature, max_tokens)
+                    query_vector = await semantic_cache.aembed(message)
+                    await semantic_cache.refresh(cache_key.profile_id)
+                    cache_generation = semantic_cache.generation(cache_key.profile_id)
+                    match = semantic_cache.lookup(cache_key, query_vector)
+                    if match is not None:
+                        await self.graph.aupdate_state(
+                            config,
+                            {**input_data, "messages": input_messages + [AIMessage(content=match.answer)]},
+                            as_node=COMPACTION_NODE
+                        )
+                        await conversation_index.record_turn("tools", conversation_id, input_messages, match.answer)
+                        yield StreamChunk(
+                            content=match.answer,
+                            conversation_id=conversation_id,
+                            is_final=False,
+                            chunk_type="ai_response"
+                        )
+                        yield StreamChunk(
+                            content="",
+                            conversation_id=conversation_id,
+                            is_final=True,
+                            metadata={"cache": "semantic", "score": round(match.score, 4)}
+                        )
+                        return
+            
             # Stream through graph
-            # async for chunk in self.graph.astream(input_data, config=config, stream_mode="updates"):
-            async for chunk in self.graph.astream(input_data, config=config):
-                for node_name, node_output in chunk.items():
+            # - updates: 도구 호출/도구 실행 결과 이벤트
+            # - messages: 최종 답변 LLM 토큰
+            # - custom: 헤징된 LLM 호출의 토큰
+            # answer_parts는 클라이언트에 ai_response로 보낸 텍스트와 항상 같음
+            answer_parts: List[str] = []
+            text_buffer = AgentTextBuffer()
+            hedged_ids: Set[str] = set()
+
+            def release(pieces: List[Tuple[str, str]]) -> List[StreamChunk]:
+                chunks = []
+                for chunk_type, text in pieces:
+                    if chunk_type == "ai_response":
+                        answer_parts.append(text)
+                    chunks.append(StreamChunk(
+                        content=text,
+                        conversation_id=conversation_id,
+                        is_final=False,
+                        chunk_type=chunk_type
+                    ))
+                return chunks
+
+            async with conversation_compactor.turn("tools", conversation_id), aclosing(self.graph.astream(
+                input_data, config=config, stream_mode=["updates", "messages", "custom"]
+            )) as stream:
+                async for stream_mode, payload in stream:
+                    if stream_mode != "updates":
+                        message_chunk = stream_message(stream_mode, payload, "agent", hedged_ids)
+                        if message_chunk is None:
+                            continue
+                    
+                        # 도구 호출 턴은 updates 이벤트로 전달하고, 도구 호출 전 텍스트는 머리말로,
+                        # 최종 답변만 ai_response 토큰으로 전달
+                        pieces = []
+                        if message_chunk.tool_calls or getattr(message_chunk, "tool_call_chunks", None):
+                            pieces += text_buffer.tool_call(message_chunk.id)
+                        content = message_text(message_chunk.content)
+                        if content:
+                            pieces += text_buffer.text(message_chunk.id, content)
+                        for chunk in release(pieces):
+                            yield chunk
+                        continue
+                
+                    for node_name, node_output in payload.items():
+                        if not node_output:
+                            continue
                     
-                    if node_name == "agent":
-                        # 에이전트 노드에서 나온 메시지 처리
-                        if "messages" in node_output:
-                            for msg in node_output["messages"]:
-                                if isinstance(msg, AIMessage):
-                                    # 도구 호출이 있는 경우
-                                    if hasattr(msg, 'tool_calls') and msg.tool_calls:
+                        if node_name == "agent":
+                            # 에이전트 노드에서 나온 도구 호출 처리
+                            if "messages" in node_output:
+                                for msg in node_output["messages"]:
+                                    if not isinstance(msg, AIMessage):
+                                        continue
+                                    for chunk in release(text_buffer.finish(tool_call=bool(msg.tool_calls))):
+                                        yield chunk
+                                    if msg.tool_calls:
                                         for tool_call in msg.tool_calls:
-                                            print(f"도구 호출 중: {tool_call['name']}")
+                                            logger.debug(f"Calling tool {tool_call['name']}")
                                             yield StreamChunk(
                                                 content=f"도구 호출 중: {tool_call['name']}",
                                                 conversation_id=conversation_id,
                                                 is_final=False,
                                                 chunk_type="tool_calling"
                                             )
-                                    
-                                    # AI 응답 내용이 있는 경우 (최종 응답)
-                                    elif hasattr(msg, 'content') and msg.content and msg.content.strip():
-                                        print(f"AI 응답:\n{msg.content}")
+                    
+                        elif node_name == "tools":
+                            # 도구 노드에서 나온 결과 처리
+                            if "messages" in node_output:
+                                for msg in node_output["messages"]:
+                                    if isinstance(msg, ToolMessage):
+                                        logger.debug(f"Tool {msg.name} returned {len(message_text(msg.content))} chars")
                                         yield StreamChunk(
-                                            content=f"AI 응답:\n{msg.content}",
+                                            content=f"도구 실행 결과:\n완료",
                                             conversation_id=conversation_id,
                                             is_final=False,
-                                            chunk_type="ai_response"
+                                            chunk_type="tool_result"
                                         )
-                    
-                    elif node_name == "tools":
-                        # 도구 노드에서 나온 결과 처리
-                        if "messages" in node_output:
-                            for msg in node_output["messages"]:
-                                if isinstance(msg, ToolMessage):
-                                    print(f"도구 실행 결과:\n{msg.content}")
-                                    yield StreamChunk(
-                                        content=f"도구 실행 결과:\n완료",
-                                        conversation_id=conversation_id,
-                                        is_final=False,
-                                        chunk_type="tool_result"
-                                    )
+                for chunk in release(text_buffer.finish(tool_call=False)):
+                    yield chunk
+                await self.memory.acomplete_run(conversation_id)
+            
+            if query_vector is not None and answer_parts:
+                semantic_cache.store(cache_key, query_vector, "".join(answer_parts), cache_generation)
+            await conversation_index.record_turn("tools", conversation_id, input_messages, "".join(answer_parts))
             
             # Send final chunk
             yield StreamChunk(
@@ -0,0 +1,449 @@
+"""
+Bounded LangGraph checkpointer
+MemorySaver와 같은 방식으로 체크포인트를 메모리에 보관하되, 스레드 수/바이트 한도(LRU), 유휴 스레드 TTL,
+스레드당 최근 N개 체크포인트만 유지하는 정리를 적용하여 프로세스 메모리가 무한히 늘어나지 않도록 합니다.
+메시지 목록 채널은 스텝마다 전체 목록을 복사하지 않고, 스레드별 메시지 풀에 메시지를 한 번만 저장한 뒤
+blob에는 메시지 다이제스트 목록(델타)만 기록합니다. 실행이 끝나면 중간 체크포인트를 정리합니다.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.core.config import settings
+from app.services.conversation_index import conversation_index
+from app.utils.logging import get_logger
+from app.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# 저장 항목 하나의 키/튜플 객체 비용 추정치 (직렬화된 바이트 외)
+_ENTRY_OVERHEAD = 128
+
+# 메시지 목록 blob의 타입: 값은 스레드 메시지 풀의 다이제스트를 이어 붙인 바이트
+MESSAGE_REFS = "msgrefs"
+DIGEST_SIZE = 16
+
+BlobKey = Tuple[str, str, str, Any]
+WritesKey = Tuple[str, str, str]
+
+
+def _typed_size(typed: Tuple[str, bytes]) -> int:
+    return len(typed[1]) + _ENTRY_OVERHEAD
+
+
+def message_digest(typed: Tuple[str, bytes]) -> bytes:
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    digest.update(typed[0].encode())
+    digest.update(b"\0")
+    digest.update(typed[1])
+    return digest.digest()
+
+
+def split_digests(data: bytes) -> List[bytes]:
+    return [data[index:index + DIGEST_SIZE] for index in range(0, len(data), DIGEST_SIZE)]
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """In-memory checkpointer with thread, byte, age and history limits.
+
+    - Only the latest ``keep_checkpoints`` checkpoints of a thread are kept;
+      older ones are pruned together with their pending writes and the
+      channel blobs no remaining checkpoint refers to.
+    - Threads idle for longer than ``ttl_seconds`` are dropped.
+    - When there are more than ``max_threads`` threads or more than
+      ``max_bytes`` of serialized state, least recently used threads are
+      evicted. The thread being written is never evicted by its own write.
+    - With ``delta_messages``, a message-list channel value is stored as the
+      digests of its messages; each message is serialized into the thread's
+      reference-counted message pool once, so a step that appends one message
+      stores one message instead of a copy of the whole list.
+    - ``complete_run`` drops the intermediate checkpoints of a finished run.
+    - ``removal_listeners`` are called with ``(scope, thread_id)`` when a
+      thread's state is gone for good (deleted, expired or evicted), so
+      derived state such as the conversation index can follow.
+
+    Sizes are the serialized payloads plus a fixed per-entry overhead, so
+    ``stats()["bytes"]`` tracks the dominant part of the saver's footprint.
+    """
+
+    def __init__(
+        self,
+        max_threads: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        keep_checkpoints: Optional[int] = None,
+        delta_messages: Optional[bool] = None,
+        prune_completed_runs: Optional[bool] = None,
+        scope: str = "chat",
+        **kwargs: Any
+    ):
+        super().__init__(**kwargs)
+        self.scope = scope
+        self.removal_listeners: List[Callable[[str, str], None]] = []
+        self.max_threads = max_threads or settings.checkpoint_max_threads
+        self.max_bytes = max_bytes or settings.checkpoint_max_bytes
+        self.ttl_seconds = settings.checkpoint_thread_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.keep_checkpoints = max(keep_checkpoints or settings.checkpoint_keep_per_thread, 1)
+        self.delta_messages = settings.checkpoint_delta_messages if delta_messages is None else delta_messages
+        self.prune_completed_runs = (
+            settings.checkpoint_prune_completed_runs if prune_completed_runs is None else prune_completed_runs
+        )
+        self._lock = threading.RLock()
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        self._thread_bytes: Dict[str, int] = defaultdict(int)
+        self._thread_blobs: Dict[str, Set[BlobKey]] = defaultdict(set)
+        self._thread_writes: Dict[str, Set[WritesKey]] = defaultdict(set)
+        self._versions: Dict[str, Dict[Tuple[str, str], ChannelVersions]] = defaultdict(dict)
+        # 스레드별 메시지 풀: 다이제스트 -> [직렬화된 메시지, 참조하는 blob 수]
+        self._message_pool: Dict[str, Dict[bytes, List[Any]]] = defaultdict(dict)
+        self.bytes_stored = 0
+        self.messages_reused = 0
+        self.total_bytes = 0
+        self.evictions = {"lru": 0, "bytes": 0, "ttl": 0}
+        self.pruned_checkpoints = 0
+
+    # 접근 기록 / 계량
+
+    def _touch(self, thread_id: str):
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    def _account(self, thread_id: str, delta: int):
+        self._thread_bytes[thread_id] += delta
+        self.total_bytes += delta
+
+    def _writes_size(self, key: WritesKey) -> int:
+        return sum(_typed_size(write[2]) for write in self.writes.get(key, {}).values())
+
+    # 채널 값 직렬화 (메시지 목록은 메시지 풀 참조로 저장)
+
+    def _dump_value(self, thread_id: str, value: Any) -> Tuple[str, bytes]:
+        if not (
+            self.delta_messages and isinstance(value, list) and value
+            and all(isinstance(item, BaseMessage) for item in value)
+        ):
+            typed = self.serde.dumps_typed(value)
+            self.bytes_stored += len(typed[1])
+            return typed
+        pool = self._message_pool[thread_id]
+        digests = []
+        for message in value:
+            typed = self.serde.dumps_typed(message)
+            digest = message_digest(typed)
+            entry = pool.get(digest)
+            if entry is None:
+                pool[digest] = [typed, 1]
+                self._account(thread_id, _typed_size(typed))
+                self.bytes_stored += len(typed[1])
+                self._message_stored(thread_id, digest, typed)
+            else:
+                entry[1] += 1
+                self.messages_reused += 1
+            digests.append(digest)
+        self.bytes_stored += len(digests) * DIGEST_SIZE
+        return MESSAGE_REFS, b"".join(digests)
+
+    def _add_refs(self, thread_id: str, typed: Tuple[str, bytes]):
+        self._account(thread_id, _typed_size(typed))
+        if typed[0] != MESSAGE_REFS:
+            return
+        pool = self._message_pool[thread_id]
+        for digest in split_digests(typed[1]):
+            if digest in pool:
+                pool[digest][1] += 1
+
+    def _release_blob(self, thread_id: str, typed: Tuple[str, bytes]):
+        self._account(thread_id, -_typed_size(typed))
+        if typed[0] != MESSAGE_REFS:
+            return
+        pool = self._message_pool.get(thread_id, {})
+        for digest in split_digests(typed[1]):
+            entry = pool.get(digest)
+            if entry is None:
+                continue
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del pool[digest]
+                self._account(thread_id, -_typed_size(entry[0]))
+                self._message_released(thread_id, digest)
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        pool = self._message_pool.get(thread_id, {})
+        for channel, version in versions.items():
+            typed = self.blobs.get((thread_id, checkpoint_ns, channel, version))
+            if typed is None or typed[0] == "empty":
+                continue
+            if typed[0] == MESSAGE_REFS:
+                result[channel] = [self.serde.loads_typed(pool[digest][0]) for digest in split_digests(typed[1])]
+            else:
+                result[channel] = self.serde.loads_typed(typed)
+        return result
+
+    # 삭제 (하위 클래스는 아래 훅으로 저장소 변경을 따라갈 수 있음)
+
+    def _message_stored(self, thread_id: str, digest: bytes, typed: Tuple[str, bytes]):
+        pass
+
+    def _message_released(self, thread_id: str, digest: bytes):
+        pass
+
+    def _checkpoint_pruned(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str):
+        pass
+
+    def _blob_pruned(self, key: BlobKey):
+        pass
+
+    def _drop_thread(self, thread_id: str):
+        self.storage.pop(thread_id, None)
+        self._message_pool.pop(thread_id, None)
+        for key in self._thread_writes.pop(thread_id, set()):
+            self.writes.pop(key, None)
+        for key in self._thread_blobs.pop(thread_id, set()):
+            self.blobs.pop(key, None)
+        self._versions.pop(thread_id, None)
+        self.total_bytes -= self._thread_bytes.pop(thread_id, 0)
+        self._last_access.pop(thread_id, None)
+
+    def _removed(self, thread_id: str):
+        for listener in self.removal_listeners:
+            listener(self.scope, thread_id)
+
+    def _unload(self, thread_id: str):
+        """Drop a thread pushed out by the TTL or size limits; in memory that is its only copy"""
+        self._drop_thread(thread_id)
+        self._removed(thread_id)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str, keep: Optional[int] = None):
+        """Keep the latest checkpoints of a thread and drop what only older ones referenced"""
+        keep = keep or self.keep_checkpoints
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= keep:
+            return
+        versions = self._versions[thread_id]
+        for checkpoint_id in sorted(checkpoints)[:-keep]:
+            checkpoint, metadata, _ = checkpoints.pop(checkpoint_id)
+            self._account(thread_id, -(_typed_size(checkpoint) + _typed_size(metadata)))
+            versions.pop((checkpoint_ns, checkpoint_id), None)
+            writes_key = (thread_id, checkpoint_ns, checkpoint_id)
+            if writes_key in self.writes:
+                self._account(thread_id, -self._writes_size(writes_key))
+                del self.writes[writes_key]
+                self._thread_writes[thread_id].discard(writes_key)
+            self.pruned_checkpoints += 1
+            self._checkpoint_pruned(thread_id, checkpoint_ns, checkpoint_id)
+
+        referenced = {
+            (channel, version)
+            for (ns, _), channel_versions in versions.items() if ns == checkpoint_ns
+            for channel, version in channel_versions.items()
+        }
+        blobs = self._thread_blobs[thread_id]
+        for key in [key for key in blobs if key[1] == checkpoint_ns and (key[2], key[3]) not in referenced]:
+            self._release_blob(thread_id, self.blobs.pop(key))
+            blobs.discard(key)
+            self._blob_pruned(key)
+
+    def _expire(self, now: float, keep: Optional[str] = None):
+        if self.ttl_seconds <= 0:
+            return
+        while self._last_access:
+            thread_id, last_access = next(iter(self._last_access.items()))
+            if now - last_access < self.ttl_seconds or thread_id == keep:
+                return
+            self._unload(thread_id)
+            self.evictions["ttl"] += 1
+            metrics.increment("checkpoint.evicted.ttl")
+
+    def _evict(self, keep: str):
+        while len(self._last_access) > self.max_threads or self.total_bytes > self.max_bytes:
+            victim = next((thread_id for thread_id in self._last_access if thread_id != keep), None)
+            if victim is None:
+                return
+            reason = "lru" if len(self._last_access) > self.max_threads else "bytes"
+            self._unload(victim)
+            self.evictions[reason] += 1
+            metrics.increment(f"checkpoint.evicted.{reason}")
+
+    # BaseCheckpointSaver
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._expire(time.monotonic())
+            if thread_id not in self.storage:
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config is not None and config["configurable"]["thread_id"] not in self.storage:
+                return iter(())
+            # 잠금 밖에서 저장소가 바뀌지 않도록 결과를 미리 만듦
+            return iter(list(super().list(config, filter=filter, before=before, limit=limit)))
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._expire(time.monotonic(), keep=thread_id)
+            stored_checkpoint = checkpoint.copy()
+            values = stored_checkpoint.pop("channel_values")
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                typed = self._dump_value(thread_id, values[channel]) if channel in values else ("empty", b"")
+                # 새 값을 먼저 풀에 참조시킨 뒤 이전 값을 해제하여 공유 메시지를 다시 쓰지 않음
+                previous = self.blobs.get(key)
+                self.blobs[key] = typed
+                self._thread_blobs[thread_id].add(key)
+                self._account(thread_id, _typed_size(typed))
+                if previous is not None:
+                    self._release_blob(thread_id, previous)
+
+            checkpoints = self.storage[thread_id][checkpoint_ns]
+            if checkpoint["id"] in checkpoints:
+                previous_checkpoint, previous_metadata, _ = checkpoints[checkpoint["id"]]
+                self._account(thread_id, -(_typed_size(previous_checkpoint) + _typed_size(previous_metadata)))
+            stored = self.serde.dumps_typed(stored_checkpoint)
+            stored_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+            checkpoints[checkpoint["id"]] = (stored, stored_metadata, config["configurable"].get("checkpoint_id"))
+            self._account(thread_id, _typed_size(stored) + _typed_size(stored_metadata))
+            self.bytes_stored += len(stored[1]) + len(stored_metadata[1])
+            self._versions[thread_id][(checkpoint_ns, checkpoint["id"])] = dict(checkpoint["channel_versions"])
+
+            self._touch(thread_id)
+            self._prune(thread_id, checkpoint_ns)
+            self._evict(keep=thread_id)
+            return {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint["id"]
+                }
+            }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._lock:
+            before = self._writes_size(key)
+            super().put_writes(config, writes, task_id, task_path)
+            self._thread_writes[thread_id].add(key)
+            added = self._writes_size(key) - before
+            self._account(thread_id, added)
+            self.bytes_stored += max(added, 0)
+            self._touch(thread_id)
+            self._evict(keep=thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop_thread(thread_id)
+            self._removed(thread_id)
+
+    def complete_run(self, thread_id: str):
+        """Drop the intermediate checkpoints of a finished run, keeping only the latest"""
+        if not self.prune_completed_runs:
+            return
+        with self._lock:
+            for checkpoint_ns in list(self.storage.get(thread_id, {})):
+                self._prune(thread_id, checkpoint_ns, keep=1)
+
+    async def acomplete_run(self, thread_id: str):
+        self.complete_run(thread_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "threads": len(self._last_access),
+                "checkpoints": sum(len(versions) for versions in self._versions.values()),
+                "bytes": self.total_bytes,
+                "max_threads": self.max_threads,
+                "max_bytes": self.max_bytes,
+                "evictions": dict(self.evictions),
+                "pruned_checkpoints": self.pruned_checkpoints,
+                "pooled_messages": sum(len(pool) for pool in self._message_pool.values()),
+                "messages_reused": self.messages_reused,
+                "bytes_stored": self.bytes_stored
+            }
+
+
+# 데이터베이스 파일과 scope별로 공유하는 영속 체크포인터 (서비스 인스턴스가 여러 개여도 쓰기 스레드는 하나)
+_durable_checkpointers: Dict[Tuple[str, str], BaseCheckpointSaver] = {}
+_durable_lock = threading.Lock()
+
+
+def create_checkpointer(scope: str = "chat") -> BaseCheckpointSaver:
+    """Checkpointer for a chat graph, configured from Settings
+
+    ``scope`` names the graph ("chat", "tools") so that graphs sharing a
+    durable backend keep separate conversations under the same thread ids.
+    """
+    backend = settings.checkpoint_backend.lower()
+    if backend == "memory":
+        if settings.checkpoint_shared:
+            raise ValueError("CHECKPOINT_SHARED requires CHECKPOINT_BACKEND=sqlite")
+        saver = BoundedMemorySaver(scope=scope)
+        saver.removal_listeners.append(conversation_index.discard)
+        return saver
+    if backend != "sqlite":
+        raise ValueError(f"Unknown checkpoint backend: {settings.checkpoint_backend}")
+
+    from app.services.sqlite_checkpointer import SQLiteSaver
+
+    key = (os.path.abspath(settings.checkpoint_sqlite_path), scope)
+    with _durable_lock:
+        if key not in _durable_checkpointers:
+            saver = SQLiteSaver(path=settings.checkpoint_sqlite_path, scope=scope, shared=settings.checkpoint_shared)
+            saver.removal_listeners.append(conversation_index.discard)
+            _durable_checkpointers[key] = saver
+            logger.info(
+                f"Persisting '{scope}' checkpoints to {settings.checkpoint_sqlite_path}"
+                + (" (shared across processes)" if settings.checkpoint_shared else "")
+            )
+        return _durable_checkpointers[key]
+
+
+async def close_checkpointers():
+    """Commit pending writes of durable checkpointers and close them (application shutdown)"""
+    with _durable_lock:
+        checkpointers = list(_durable_checkpointers.values())
+        _durable_checkpointers.clear()
+    for checkpointer in checkpointers:
+        await checkpointer.aclose()
@@ -0,0 +1,251 @@
+"""
+Rolling conversation compaction
+스레드의 대화 기록이 토큰 임계값을 넘으면 오래된 턴을 저렴한 모델로 요약하여 체크포인트 상태에서 하나의 요약 메시지로 교체합니다.
+요약은 응답 경로 밖의 백그라운드 작업으로 실행되며, 상태 교체는 같은 스레드의 턴과 겹치지 않도록 스레드 잠금 안에서 수행합니다.
+CHECKPOINT_SHARED=true이면 스레드 잠금에 워커 간 임대(shared_state)가 더해지고, 압축을 끄더라도 모든 턴이 임대를 잡습니다.
+"""
+
+import asyncio
+import contextvars
+import json
+import weakref
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.runnables import RunnableConfig
+
+from app.core.config import settings
+from app.services.context_budget import context_budget, get_tokenizer
+from app.services.llm_clients import generation_config
+from app.services.model_registry import model_registry
+from app.services.shared_state import shared_state
+from app.utils.logging import get_logger
+from app.utils.messages import message_text
+from app.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# 요약 메시지는 이 이름을 가진 SystemMessage로 상태에 저장됩니다
+SUMMARY_NAME = "conversation_summary"
+
+COMPACTION_NODE = "compact"
+
+SUMMARY_PROMPT = """당신은 대화 기록을 압축하는 요약기입니다.
+아래 대화를 이후 대화를 이어가는 데 필요한 내용만 남겨 간결하게 요약하세요.
+- 사용자가 알려준 사실, 이름, 숫자, 날짜, 결정 사항, 선호와 요청을 빠짐없이 보존
+- 도구로 조회한 정보는 핵심 값 위주로 보존
+- 인사말과 반복되는 설명은 생략
+- 기존 요약이 있으면 그 내용을 포함하여 하나의 요약으로 갱신
+요약문만 출력하세요."""
+
+# 요약 입력에서 도구 결과 하나에 허용하는 최대 글자 수
+_TOOL_RESULT_CHARS = 2000
+
+
+def is_summary(message: BaseMessage) -> bool:
+    return isinstance(message, SystemMessage) and message.name == SUMMARY_NAME
+
+
+def with_system_prompt(messages: List[BaseMessage], system_prompt: str) -> List[BaseMessage]:
+    """Messages for the LLM: the default system prompt unless the thread has its own,
+    with the conversation summary folded into the leading system message."""
+    summaries = [message for message in messages if is_summary(message)]
+    prepared = [message for message in messages if not is_summary(message)]
+    if not any(isinstance(message, SystemMessage) for message in prepared):
+        prepared = [SystemMessage(content=system_prompt)] + prepared
+    if summaries:
+        summary = "\n".join(message_text(message.content) for message in summaries)
+        memory = f"\n\n[이전 대화 요약]\n{summary}"
+        if isinstance(prepared[0], SystemMessage):
+            prepared[0] = SystemMessage(content=message_text(prepared[0].content) + memory)
+        else:
+            prepared = [SystemMessage(content=memory.strip())] + prepared
+    return prepared
+
+
+def _transcript(messages: List[BaseMessage]) -> str:
+    lines = []
+    for message in messages:
+        text = message_text(message.content)
+        if is_summary(message):
+            lines.append(f"[기존 요약]\n{text}")
+        elif isinstance(message, HumanMessage):
+            lines.append(f"사용자: {text}")
+        elif isinstance(message, AIMessage):
+            if text:
+                lines.append(f"어시스턴트: {text}")
+            for call in message.tool_calls:
+                lines.append(f"어시스턴트 도구 호출: {call['name']}({json.dumps(call['args'], ensure_ascii=False)})")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"도구 결과: {text[:_TOOL_RESULT_CHARS]}")
+    return "\n".join(lines)
+
+
+class ConversationCompactor:
+    """Summarizes the older turns of long threads in the background.
+
+    The graphs end every turn in a ``compact`` node that calls ``schedule``.
+    When the thread's messages exceed ``COMPACTION_THRESHOLD_TOKENS``, every
+    message before the last ``COMPACTION_KEEP_RECENT_TURNS`` turns (client
+    system messages aside) is summarized with ``COMPACTION_MODEL``. The summary
+    takes the id of the oldest summarized message, so it replaces it in place,
+    and the remaining summarized messages are removed.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = settings.compaction_enabled if enabled is None else enabled
+        self._locks: "weakref.WeakValueDictionary[Tuple[str, str], asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._running: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.compactions = 0
+        self.failures = 0
+        self.skipped = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    @asynccontextmanager
+    async def _lock(self, scope: str, thread_id: str, wait: bool = True):
+        """Process-local thread lock plus, in shared mode, the cross-process lease; yields whether it is held"""
+        key = (scope, thread_id)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        async with lock, shared_state.lease(scope, thread_id, wait=wait) as held:
+            yield held
+
+    def turn(self, scope: str, thread_id: str):
+        """Hold the thread of the ``scope`` graph while a turn runs so a compaction never overwrites it.
+
+        In shared mode the turn always takes the cross-process lease, so two
+        workers never run turns of the same thread at once.
+        """
+        return self._lock(scope, thread_id) if self.enabled or shared_state.enabled else nullcontext()
+
+    def count_tokens(self, messages: List[BaseMessage], model: str) -> int:
+        tokenizer = get_tokenizer(model_registry.provider_for(model), model)
+        return sum(context_budget.count_message(message, tokenizer) for message in messages)
+
+    @staticmethod
+    def older_messages(messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Messages to fold into the summary: everything before the protected recent turns"""
+        keep = settings.compaction_keep_recent_turns
+        human_indexes = [index for index, message in enumerate(messages) if isinstance(message, HumanMessage)]
+        if keep <= 0 or len(human_indexes) <= keep:
+            return []
+        recent_start = human_indexes[-keep]
+        older = [
+            message for message in messages[:recent_start]
+            if not isinstance(message, SystemMessage) or is_summary(message)
+        ]
+        if all(is_summary(message) for message in older):
+            return []
+        return older
+
+    def schedule(self, scope: str, graph: Any, config: RunnableConfig, model: Optional[str] = None):
+        """Start a background compaction of the thread of the ``scope`` graph unless one is already running"""
+        if not self.enabled:
+            return
+        key = (scope, config["configurable"]["thread_id"])
+        if key in self._running:
+            return
+        # 그래프 실행의 콜백/스트림 컨텍스트를 물려받지 않도록 빈 컨텍스트에서 실행
+        task = asyncio.create_task(
+            self._compact(scope, graph, key[1], model or settings.default_model),
+            context=contextvars.Context()
+        )
+        self._running[key] = task
+        task.add_done_callback(lambda _: self._running.pop(key, None))
+
+    async def _summarize(self, scope: str, thread_id: str, older: List[BaseMessage]) -> str:
+        config = generation_config(
+            f"compaction:{scope}:{thread_id}", settings.compaction_temperature, settings.compaction_summary_max_tokens
+        )
+        response = await model_registry.ainvoke(
+            settings.compaction_model,
+            [SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=_transcript(older))],
+            config
+        )
+        return message_text(response.content).strip()
+
+    async def _compact(self, scope: str, graph: Any, thread_id: str, model: str):
+        config: RunnableConfig = {"configurable": {"thread_id": thread_id}}
+        try:
+            state = await graph.aget_state(config)
+            messages = state.values.get("messages", [])
+            before = self.count_tokens(messages, model)
+            older = self.older_messages(messages)
+            if before < settings.compaction_threshold_tokens or not older:
+                return
+
+            summary = await self._summarize(scope, thread_id, older)
+            if not summary:
+                raise ValueError("empty summary")
+
+            async with self._lock(scope, thread_id, wait=False) as held:
+                if not held:
+                    # 다른 워커에서 이 스레드의 턴이 진행 중: 다음 턴이 끝날 때 다시 예약됨
+                    self.skipped += 1
+                    return
+                current = await graph.aget_state(config)
+                current_ids = {message.id for message in current.values.get("messages", [])}
+                if any(message.id not in current_ids for message in older):
+                    # 요약하는 동안 스레드가 바뀜 (다른 압축 또는 기록 교체)
+                    self.skipped += 1
+                    return
+                replacement = SystemMessage(content=summary, name=SUMMARY_NAME, id=older[0].id)
+                await graph.aupdate_state(
+                    config,
+                    {"messages": [replacement] + [RemoveMessage(id=message.id) for message in older[1:]]},
+                    as_node=COMPACTION_NODE
+                )
+                checkpointer = getattr(graph, "checkpointer", None)
+                if hasattr(checkpointer, "acomplete_run"):
+                    # 임대를 놓기 전에 교체를 커밋 (shared 모드)
+                    await checkpointer.acomplete_run(thread_id)
+                compacted = await graph.aget_state(config)
+
+            after = self.count_tokens(compacted.values.get("messages", []), model)
+            self.compactions += 1
+            self.tokens_before += before
+            self.tokens_after += after
+            metrics.increment("compaction.completed")
+            logger.info(f"Compacted {scope} thread {thread_id}: {len(older)} messages, {before} -> {after} tokens")
+        except Exception as e:
+            self.failures += 1
+            metrics.increment("compaction.failed")
+            logger.warning(f"Compaction of {scope} thread {thread_id} failed: {e!r}")
+
+    async def drain(self):
+        """Wait for running compactions to finish"""
+        tasks: Set[asyncio.Task] = set(self._running.values())
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def aclose(self):
+        """Cancel running compactions (application shutdown)"""
+        for task in list(self._running.values()):
+            task.cancel()
+        await self.drain()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": len(self._running),
+            "compactions": self.compactions,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "avg_tokens_before": self.tokens_before / self.compactions if self.compactions else 0.0,
+            "avg_tokens_after": self.tokens_after / self.compactions if self.compactions else 0.0
+        }
+
+
+# 전역 대화 압축기 인스턴스
+conversation_compactor = ConversationCompactor()
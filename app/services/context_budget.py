@@ -0,0 +1,280 @@
+"""
+Token-aware context budgeting
+LLM 호출 전에 대화 기록을 모델별 토큰 예산에 맞춥니다. 시스템 프롬프트와 최근 턴은 항상 유지하고,
+예산을 넘는 오래된 턴은 잘라내거나 제외합니다. 토크나이저는 모델별로 캐시하고 메시지별 토큰 수는 메모이즈합니다.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from app.core.config import settings
+from app.utils.logging import get_logger
+from app.utils.messages import message_text
+from app.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken은 langchain-openai와 함께 설치됨
+    tiktoken = None
+
+# 채팅 형식에서 메시지마다 붙는 역할/구분자 토큰 수
+MESSAGE_OVERHEAD_TOKENS = 4
+
+TRUNCATION_MARK = " …(이하 생략)"
+
+
+class HeuristicTokenizer:
+    """Offline estimate: ~4 ASCII characters per token, one token per other character.
+
+    Overestimates Korean text slightly, which keeps the budget on the safe side
+    for providers without a local tokenizer.
+    """
+
+    name = "heuristic"
+
+    @staticmethod
+    def _cost(char: str) -> float:
+        return 0.25 if ord(char) < 128 else 1.0
+
+    def count(self, text: str) -> int:
+        ascii_chars = sum(1 for char in text if ord(char) < 128)
+        return -(-ascii_chars // 4) + (len(text) - ascii_chars)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        used = 0.0
+        for index, char in enumerate(text):
+            used += self._cost(char)
+            if used > max_tokens:
+                return text[:index]
+        return text
+
+
+class TiktokenTokenizer:
+    """Exact token counts for OpenAI models"""
+
+    def __init__(self, encoding: Any):
+        self.name = encoding.name
+        self.encoding = encoding
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        return self.encoding.decode(tokens[:max_tokens])
+
+
+@lru_cache(maxsize=None)
+def _tiktoken_encoding(name: str) -> Optional[TiktokenTokenizer]:
+    """Load a tiktoken encoding once per process; failures (no BPE file offline) are cached as None"""
+    if tiktoken is None or settings.context_tokenizer == "heuristic":
+        return None
+    try:
+        return TiktokenTokenizer(tiktoken.get_encoding(name))
+    except Exception as e:
+        logger.warning(f"tiktoken encoding {name} unavailable, using heuristic token counts: {e!r}")
+        return None
+
+
+@lru_cache(maxsize=256)
+def get_tokenizer(provider: str, model: str):
+    """Cached tokenizer for a model: tiktoken for OpenAI models, the heuristic otherwise"""
+    if provider == "openai" and tiktoken is not None:
+        try:
+            encoding_name = tiktoken.encoding_name_for_model(model)
+        except KeyError:
+            encoding_name = "o200k_base"
+        tokenizer = _tiktoken_encoding(encoding_name)
+        if tokenizer is not None:
+            return tokenizer
+    return HeuristicTokenizer()
+
+
+@dataclass
+class FittedContext:
+    """Messages trimmed to a budget"""
+    messages: List[BaseMessage]
+    prompt_tokens: int
+    dropped: int = 0
+    truncated: int = 0
+    over_budget: bool = False
+    budget: int = 0
+
+
+class ContextBudget:
+    """Fits a message list into a model's prompt budget.
+
+    The budget of a model is ``MODEL_CONTEXT_BUDGETS[model]`` (or
+    ``CONTEXT_BUDGET_TOKENS``) minus the completion's ``max_tokens``. System
+    messages and the last ``CONTEXT_KEEP_RECENT_TURNS`` turns (a turn starts at
+    a user message) are always kept. Older messages are then added back from
+    newest to oldest while they fit; the first one that does not fit is
+    truncated when enough budget is left, and everything before it is dropped.
+    An assistant tool call and its tool results are kept or dropped together.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        default_budget: Optional[int] = None,
+        keep_recent_turns: Optional[int] = None,
+        cache_size: Optional[int] = None
+    ):
+        self.budgets = dict(settings.model_context_budgets if budgets is None else budgets)
+        self.default_budget = default_budget or settings.context_budget_tokens
+        self.keep_recent_turns = settings.context_keep_recent_turns if keep_recent_turns is None else keep_recent_turns
+        self.cache_size = cache_size or settings.context_token_cache_size
+        self._counts: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.trimmed_calls = 0
+        self.dropped_messages = 0
+        self.truncated_messages = 0
+
+    def budget_for(self, model: str, max_tokens: Optional[int] = None) -> int:
+        total = self.budgets.get(model, self.budgets.get("*", self.default_budget))
+        return max(total - (max_tokens or settings.max_tokens), 0)
+
+    def count_message(self, message: BaseMessage, tokenizer) -> int:
+        """Tokens of one message including per-message overhead and tool calls (memoized by content digest)"""
+        text = message_text(message.content)
+        tool_calls = ""
+        if isinstance(message, AIMessage) and message.tool_calls:
+            tool_calls = json.dumps(
+                [{"name": call["name"], "args": call["args"]} for call in message.tool_calls],
+                ensure_ascii=False
+            )
+        # 큰 도구 결과를 메모 키로 붙잡아 두지 않도록 내용 대신 다이제스트로 키를 만듦
+        digest = hashlib.blake2b(f"{message.type}\0{len(text)}\0".encode("utf-8"), digest_size=16)
+        digest.update(text.encode("utf-8"))
+        digest.update(tool_calls.encode("utf-8"))
+        key = (tokenizer.name, digest.digest())
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+                self.hits += 1
+                return count
+        count = MESSAGE_OVERHEAD_TOKENS + tokenizer.count(text) + (tokenizer.count(tool_calls) if tool_calls else 0)
+        with self._lock:
+            self.misses += 1
+            self._counts[key] = count
+            while len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+        return count
+
+    @staticmethod
+    def _blocks(messages: List[BaseMessage]) -> List[Tuple[int, int]]:
+        """Split into ``(start, end)`` ranges that must be kept or dropped as a unit"""
+        blocks = []
+        index = 0
+        while index < len(messages):
+            end = index + 1
+            if isinstance(messages[index], AIMessage) and messages[index].tool_calls:
+                while end < len(messages) and isinstance(messages[end], ToolMessage):
+                    end += 1
+            blocks.append((index, end))
+            index = end
+        return blocks
+
+    def _recent_start(self, messages: List[BaseMessage]) -> int:
+        """Index of the first message of the protected recent turns"""
+        if self.keep_recent_turns <= 0:
+            return len(messages)
+        seen = 0
+        for index in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[index], HumanMessage):
+                seen += 1
+                if seen == self.keep_recent_turns:
+                    return index
+        return 0
+
+    @staticmethod
+    def _truncatable(message: BaseMessage) -> bool:
+        if isinstance(message, AIMessage) and message.tool_calls:
+            return False
+        return isinstance(message, (HumanMessage, AIMessage)) and isinstance(message.content, str)
+
+    def fit(
+        self,
+        model: str,
+        provider: str,
+        messages: List[BaseMessage],
+        max_tokens: Optional[int] = None
+    ) -> FittedContext:
+        tokenizer = get_tokenizer(provider, model)
+        budget = self.budget_for(model, max_tokens)
+        counts = [self.count_message(message, tokenizer) for message in messages]
+        total = sum(counts)
+        if not settings.context_budget_enabled or total <= budget:
+            return FittedContext(list(messages), total, budget=budget)
+
+        recent_start = self._recent_start(messages)
+        keep = [isinstance(message, SystemMessage) or index >= recent_start for index, message in enumerate(messages)]
+        used = sum(count for count, kept in zip(counts, keep) if kept)
+        replacements: Dict[int, BaseMessage] = {}
+
+        older = [block for block in self._blocks(messages[:recent_start]) if not keep[block[0]]]
+        for start, end in reversed(older):
+            cost = sum(counts[start:end])
+            if used + cost <= budget:
+                for index in range(start, end):
+                    keep[index] = True
+                used += cost
+                continue
+            remaining = budget - used - MESSAGE_OVERHEAD_TOKENS - tokenizer.count(TRUNCATION_MARK)
+            message = messages[start]
+            if end - start == 1 and self._truncatable(message) and remaining >= settings.context_min_truncated_tokens:
+                content = tokenizer.truncate(message.content, remaining) + TRUNCATION_MARK
+                replacements[start] = message.model_copy(update={"content": content})
+                keep[start] = True
+                used += self.count_message(replacements[start], tokenizer)
+            break
+
+        fitted = [replacements.get(index, message) for index, message in enumerate(messages) if keep[index]]
+        dropped = len(messages) - len(fitted)
+        result = FittedContext(
+            fitted,
+            used,
+            dropped=dropped,
+            truncated=len(replacements),
+            over_budget=used > budget,
+            budget=budget
+        )
+        with self._lock:
+            self.trimmed_calls += 1
+            self.dropped_messages += dropped
+            self.truncated_messages += len(replacements)
+        metrics.increment("context.trimmed")
+        if result.over_budget:
+            logger.warning(
+                f"System prompt and recent turns need {used} tokens, over the {budget} token budget of {model}"
+            )
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": settings.context_budget_enabled,
+                "default_budget": self.default_budget,
+                "memoized_messages": len(self._counts),
+                "memo_hit_rate": self.hits / lookups if lookups else 0.0,
+                "trimmed_calls": self.trimmed_calls,
+                "dropped_messages": self.dropped_messages,
+                "truncated_messages": self.truncated_messages
+            }
+
+
+# 전역 컨텍스트 예산 인스턴스
+context_budget = ContextBudget()
@@ -0,0 +1,383 @@
+"""
+Conversation index
+대화 목록 조회용 요약(제목, 메시지 수, 마지막 갱신 시각, 미리보기)을 턴마다 증분으로 갱신합니다.
+체크포인트를 역직렬화하지 않고 (last_updated, scope, conversation_id) 정렬 키로 커서 페이지를 O(log n + page)에 제공합니다.
+대화는 체크포인터와 같이 (scope, conversation_id)로 구분되며 ("chat" 그래프와 "tools" 그래프는 별도의 대화),
+체크포인터가 스레드를 삭제/만료시키면 목록에서도 빠집니다.
+CHECKPOINT_BACKEND=sqlite이면 같은 데이터베이스 파일의 인덱스된 테이블에 저장됩니다.
+"""
+
+import asyncio
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage
+
+from app.core.config import settings
+from app.models.chat import ConversationSummary
+from app.utils.logging import get_logger
+from app.utils.messages import message_text
+from app.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+TITLE_CHARS = 50
+PREVIEW_CHARS = 120
+
+SortKey = Tuple[float, str, str]
+ConversationKey = Tuple[str, str]
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def encode_cursor(key: SortKey) -> str:
+    return f"{key[0]!r}:{key[1]}:{key[2]}"
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    timestamp, separator, rest = cursor.partition(":")
+    scope, scope_separator, conversation_id = rest.partition(":")
+    try:
+        if not separator or not scope_separator:
+            raise ValueError
+        return float(timestamp), scope, conversation_id
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+@dataclass
+class TurnRecord:
+    """What one turn changes in a conversation's summary"""
+    scope: str
+    conversation_id: str
+    added: int
+    reset: bool
+    title: Optional[str]
+    preview: Optional[str]
+    timestamp: float
+
+    @classmethod
+    def from_turn(
+        cls,
+        scope: str,
+        conversation_id: str,
+        input_messages: Sequence[BaseMessage],
+        answer: str
+    ) -> "TurnRecord":
+        reset = bool(input_messages) and isinstance(input_messages[0], RemoveMessage)
+        added = [message for message in input_messages if not isinstance(message, RemoveMessage)]
+        user_texts = [message_text(message.content) for message in added if isinstance(message, HumanMessage)]
+        preview = answer or (user_texts[-1] if user_texts else "")
+        return cls(
+            scope=scope,
+            conversation_id=conversation_id,
+            added=len(added) + (1 if answer else 0),
+            reset=reset,
+            title=_clip(user_texts[0], TITLE_CHARS) if user_texts else None,
+            preview=_clip(preview, PREVIEW_CHARS) if preview else None,
+            timestamp=time.time()
+        )
+
+
+@dataclass
+class _Entry:
+    title: Optional[str]
+    message_count: int
+    created_at: float
+    last_updated: float
+    preview: Optional[str]
+
+    def summary(self, scope: str, conversation_id: str) -> ConversationSummary:
+        return ConversationSummary(
+            conversation_id=conversation_id,
+            scope=scope,
+            title=self.title,
+            message_count=self.message_count,
+            created_at=datetime.fromtimestamp(self.created_at),
+            last_updated=datetime.fromtimestamp(self.last_updated),
+            preview=self.preview
+        )
+
+
+class ConversationIndex:
+    """In-memory conversation index ordered by last update.
+
+    Entries are kept in a dict keyed by ``(scope, conversation_id)`` plus an
+    ascending list of ``(last_updated, scope, conversation_id)`` keys with lazy
+    deletion: an update appends the new key (turns arrive in time order) and
+    leaves the old one stale, and the list is compacted once half of it is
+    stale. A page is a bisect to the cursor followed by a backward walk that
+    skips stale keys. Beyond ``max_entries`` conversations in one scope (the
+    per-graph checkpointer limit) the least recently updated one of that
+    scope, found through a per-scope heap, is dropped.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.checkpoint_max_threads
+        self._entries: Dict[ConversationKey, _Entry] = {}
+        self._keys: List[SortKey] = []
+        self._stale = 0
+        self._oldest: Dict[str, List[SortKey]] = defaultdict(list)
+        self._scope_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.removed = 0
+        self.failures = 0
+
+    def _live(self, key: SortKey) -> bool:
+        entry = self._entries.get(key[1:])
+        return entry is not None and entry.last_updated == key[0]
+
+    def _insert_key(self, key: SortKey):
+        if not self._keys or key >= self._keys[-1]:
+            self._keys.append(key)
+        else:
+            # 시계가 뒤로 간 경우에만
+            insort(self._keys, key)
+        heap = self._oldest[key[1]]
+        heapq.heappush(heap, key)
+        if len(heap) > 2 * self._scope_counts[key[1]] + 64:
+            heap[:] = [live for live in heap if self._live(live)]
+            heapq.heapify(heap)
+
+    def _discard_key(self):
+        """Account for a key that just went stale, compacting the list when half of it is"""
+        self._stale += 1
+        if self._stale * 2 > len(self._keys):
+            self._keys = [key for key in self._keys if self._live(key)]
+            self._stale = 0
+
+    def _evict(self, scope: str):
+        heap = self._oldest[scope]
+        while self._scope_counts[scope] > self.max_entries and heap:
+            key = heapq.heappop(heap)
+            if self._live(key):
+                del self._entries[key[1:]]
+                self._scope_counts[scope] -= 1
+                self._discard_key()
+
+    def _apply(self, record: TurnRecord):
+        with self._lock:
+            entry = self._entries.get((record.scope, record.conversation_id))
+            previous = None
+            if entry is None:
+                entry = _Entry(record.title, 0, record.timestamp, record.timestamp, record.preview)
+                self._entries[(record.scope, record.conversation_id)] = entry
+                self._scope_counts[record.scope] += 1
+            else:
+                previous = entry.last_updated
+                if record.reset:
+                    entry.message_count = 0
+                    entry.title = record.title
+                entry.title = entry.title or record.title
+                entry.last_updated = max(record.timestamp, entry.last_updated)
+                entry.preview = record.preview or entry.preview
+            entry.message_count += record.added
+            if entry.last_updated != previous:
+                if previous is not None:
+                    self._discard_key()
+                self._insert_key((entry.last_updated, record.scope, record.conversation_id))
+            self._evict(record.scope)
+
+    def _remove(self, scope: str, conversation_id: str) -> bool:
+        with self._lock:
+            if self._entries.pop((scope, conversation_id), None) is None:
+                return False
+            self._scope_counts[scope] -= 1
+            self._discard_key()
+            return True
+
+    def _page(self, limit: int, before: Optional[SortKey]) -> List[Tuple[SortKey, ConversationSummary]]:
+        with self._lock:
+            index = len(self._keys) if before is None else bisect_left(self._keys, before)
+            rows: List[Tuple[SortKey, ConversationSummary]] = []
+            while index > 0 and len(rows) < limit:
+                index -= 1
+                key = self._keys[index]
+                if self._live(key):
+                    rows.append((key, self._entries[key[1:]].summary(*key[1:])))
+            return rows
+
+    def _get(self, scope: str, conversation_id: str) -> Optional[ConversationSummary]:
+        with self._lock:
+            entry = self._entries.get((scope, conversation_id))
+            return entry.summary(scope, conversation_id) if entry else None
+
+    async def _run(self, function, *args):
+        return function(*args)
+
+    async def record_turn(
+        self,
+        scope: str,
+        conversation_id: str,
+        input_messages: Sequence[BaseMessage],
+        answer: str
+    ):
+        """Fold a finished turn into the conversation's summary (never fails the turn)"""
+        try:
+            await self._run(self._apply, TurnRecord.from_turn(scope, conversation_id, input_messages, answer))
+            self.turns += 1
+        except Exception as e:
+            self.failures += 1
+            metrics.increment("conversation_index.failed")
+            logger.warning(f"Failed to index conversation {conversation_id}: {e!r}")
+
+    async def list(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ConversationSummary], Optional[str]]:
+        """A page of conversations, most recently updated first, and the cursor of the next page"""
+        before = decode_cursor(cursor) if cursor else None
+        rows = await self._run(self._page, limit + 1, before)
+        next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+        return [summary for _, summary in rows[:limit]], next_cursor
+
+    async def get(self, scope: str, conversation_id: str) -> Optional[ConversationSummary]:
+        return await self._run(self._get, scope, conversation_id)
+
+    def discard(self, scope: str, conversation_id: str):
+        """Drop a conversation whose checkpointer thread was deleted or expired (checkpointer listener)"""
+        try:
+            if self._remove(scope, conversation_id):
+                self.removed += 1
+        except Exception as e:
+            self.failures += 1
+            metrics.increment("conversation_index.failed")
+            logger.warning(f"Failed to remove conversation {scope}:{conversation_id} from the index: {e!r}")
+
+    def _count(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        pass
+
+    async def stats(self) -> Dict[str, object]:
+        return {
+            "backend": self.backend,
+            "conversations": await self._run(self._count),
+            "turns": self.turns,
+            "removed": self.removed,
+            "failures": self.failures
+        }
+
+
+class SQLiteConversationIndex(ConversationIndex):
+    """Conversation index stored in a SQLite table indexed on ``(last_updated, scope, conversation_id)``.
+
+    Each turn is one upsert and each page one range scan on the index; both
+    run in a worker thread, off the event loop.
+    """
+
+    backend = "sqlite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS conversations (
+        scope TEXT NOT NULL,
+        conversation_id TEXT NOT NULL,
+        title TEXT,
+        message_count INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        last_updated REAL NOT NULL,
+        preview TEXT,
+        PRIMARY KEY (scope, conversation_id)
+    );
+    CREATE INDEX IF NOT EXISTS conversations_by_update ON conversations (last_updated, scope, conversation_id);
+    """
+
+    UPSERT = """
+    INSERT INTO conversations (scope, conversation_id, title, message_count, created_at, last_updated, preview)
+    VALUES (:scope, :conversation_id, :title, :added, :timestamp, :timestamp, :preview)
+    ON CONFLICT (scope, conversation_id) DO UPDATE SET
+        title = CASE WHEN :reset THEN excluded.title ELSE COALESCE(title, excluded.title) END,
+        message_count = CASE WHEN :reset THEN 0 ELSE message_count END + :added,
+        last_updated = MAX(last_updated, excluded.last_updated),
+        preview = COALESCE(excluded.preview, preview)
+    """
+
+    COLUMNS = "scope, conversation_id, title, message_count, created_at, last_updated, preview"
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        self.path = path or settings.checkpoint_sqlite_path
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(conversations)")]
+        if columns and "scope" not in columns:
+            # scope 이전 스키마: 어느 그래프의 대화인지 알 수 없으므로 다시 만들고 이후 턴부터 채움
+            logger.warning(f"Rebuilding the conversation index in {self.path} (added scope)")
+            self._conn.executescript("DROP INDEX IF EXISTS conversations_by_update; DROP TABLE conversations;")
+        self._conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _summary(row: tuple) -> ConversationSummary:
+        scope, conversation_id, title, message_count, created_at, last_updated, preview = row
+        return _Entry(title, message_count, created_at, last_updated, preview).summary(scope, conversation_id)
+
+    def _apply(self, record: TurnRecord):
+        with self._lock:
+            self._conn.execute(self.UPSERT, vars(record))
+
+    def _page(self, limit: int, before: Optional[SortKey]) -> List[Tuple[SortKey, ConversationSummary]]:
+        query = f"SELECT {self.COLUMNS} FROM conversations"
+        params: tuple = ()
+        if before is not None:
+            query += " WHERE (last_updated, scope, conversation_id) < (?, ?, ?)"
+            params = before
+        query += " ORDER BY last_updated DESC, scope DESC, conversation_id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit)).fetchall()
+        return [((row[5], row[0], row[1]), self._summary(row)) for row in rows]
+
+    def _get(self, scope: str, conversation_id: str) -> Optional[ConversationSummary]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM conversations WHERE scope = ? AND conversation_id = ?",
+                (scope, conversation_id)
+            ).fetchone()
+        return self._summary(row) if row else None
+
+    def _remove(self, scope: str, conversation_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM conversations WHERE scope = ? AND conversation_id = ?", (scope, conversation_id)
+            ).rowcount > 0
+
+    async def _run(self, function, *args):
+        return await asyncio.to_thread(function, *args)
+
+    def _count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_conversation_index() -> ConversationIndex:
+    """Conversation index on the same backend as the checkpointer"""
+    if settings.checkpoint_backend.lower() == "sqlite":
+        return SQLiteConversationIndex()
+    return ConversationIndex()
+
+
+# 전역 대화 목록 인덱스 인스턴스
+conversation_index = create_conversation_index()
@@ -0,0 +1,199 @@
+"""
+Deterministic fake LLM provider
+"fake"로 시작하는 모델 이름으로 선택하는 가짜 프로바이더입니다. 네트워크와 토큰 비용 없이
+첫 토큰 지연(TTFT), 초당 토큰 수, 출력 길이 분포, 오류 주입, 스크립트된 도구 호출을 재현하여
+부하 테스트와 오프라인 벤치마크가 실제 LangGraph 경로 전체를 거치도록 합니다.
+"""
+
+import asyncio
+import json
+import random
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field, PrivateAttr
+
+from app.core.config import settings
+from app.utils.messages import message_text
+
+# 답변 텍스트를 만드는 어휘 (토큰 하나 = 단어 하나)
+_VOCABULARY = (
+    "프로필", "경력", "프로젝트", "개발자", "회사", "기술", "스택", "업무", "경험", "정보",
+    "요약", "결과", "서비스", "설계", "구현", "운영", "성능", "개선", "담당", "역할",
+)
+
+_UUID = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+_DEFAULT_PROFILE_ID = "00000000-0000-0000-0000-000000000000"
+
+
+class FakeProviderError(Exception):
+    """Injected provider failure carrying an HTTP-like ``status_code`` (retryable for 429/5xx)"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Injected fake provider error ({status_code})")
+        self.status_code = status_code
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that streams synthetic tokens with configurable timing.
+
+    Every call draws from its own ``random.Random`` seeded with ``seed`` and
+    the call number, so a run with the same settings replays the same lengths,
+    errors and jitter. When tools are bound, ``tool_calls`` scripts the ReAct
+    loop: the n-th model call after the user's message calls the n-th tool of
+    the script, and the call after the last tool result answers with text.
+    """
+
+    model_name: str = Field(default="fake", alias="model")
+    ttft: float = 0.2
+    ttft_jitter: float = 0.0
+    tokens_per_second: float = 50.0
+    output_tokens: int = 64
+    output_tokens_stddev: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    tool_calls: List[str] = Field(default_factory=list)
+    seed: int = 0
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+
+    _calls: int = PrivateAttr(default=0)
+
+    model_config = {"populate_by_name": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Optional[str] = None, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _next_rng(self) -> random.Random:
+        self._calls += 1
+        return random.Random(f"{self.seed}:{self.model_name}:{self._calls}")
+
+    def _length(self, rng: random.Random, max_tokens: Optional[int]) -> int:
+        """Output length drawn from a normal distribution, clipped to [1, max_tokens]"""
+        length = self.output_tokens
+        if self.output_tokens_stddev > 0:
+            length = round(rng.gauss(self.output_tokens, self.output_tokens_stddev))
+        limit = max_tokens or self.max_tokens
+        if limit:
+            length = min(length, limit)
+        return max(length, 1)
+
+    def _scripted_tool_call(self, messages: List[BaseMessage], tools: Optional[List[Dict[str, Any]]]):
+        """The scripted tool call for this step of the conversation, or None to answer with text"""
+        if not tools or not self.tool_calls:
+            return None
+        step = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, ToolMessage):
+                step += 1
+        if step >= len(self.tool_calls):
+            return None
+
+        name = self.tool_calls[step]
+        schemas = {tool["function"]["name"]: tool["function"] for tool in tools}
+        if name not in schemas:
+            raise ValueError(f"Scripted tool {name} is not bound (available: {', '.join(schemas)})")
+        match = next(
+            (found for found in (_UUID.search(message_text(m.content)) for m in messages) if found),
+            None
+        )
+        profile_id = match.group(0) if match else _DEFAULT_PROFILE_ID
+        properties = schemas[name].get("parameters", {}).get("properties", {})
+        return {"name": name, "args": {param: profile_id for param in properties}, "id": f"call_fake_{self._calls}_{step}"}
+
+    def _usage(self, messages: List[BaseMessage], output_tokens: int) -> Dict[str, int]:
+        input_tokens = sum(len(message_text(message.content)) for message in messages) // 4
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        """Synchronous calls return the same output without simulated latency"""
+        rng = self._next_rng()
+        if rng.random() < self.error_rate:
+            raise FakeProviderError(self.error_status)
+        tool_call = self._scripted_tool_call(messages, kwargs.get("tools"))
+        if tool_call is not None:
+            message = AIMessage(content="", tool_calls=[tool_call], usage_metadata=self._usage(messages, 1))
+        else:
+            length = self._length(rng, kwargs.get("max_tokens"))
+            content = " ".join(rng.choice(_VOCABULARY) for _ in range(length))
+            message = AIMessage(content=content, usage_metadata=self._usage(messages, length))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        rng = self._next_rng()
+        if rng.random() < self.error_rate:
+            raise FakeProviderError(self.error_status)
+
+        await asyncio.sleep(max(self.ttft + rng.uniform(-self.ttft_jitter, self.ttft_jitter), 0.0))
+
+        tool_call = self._scripted_tool_call(messages, kwargs.get("tools"))
+        if tool_call is not None:
+            chunk = AIMessageChunk(
+                content="",
+                tool_call_chunks=[{
+                    "name": tool_call["name"],
+                    "args": json.dumps(tool_call["args"]),
+                    "id": tool_call["id"],
+                    "index": 0
+                }],
+                usage_metadata=self._usage(messages, 1)
+            )
+            yield ChatGenerationChunk(message=chunk)
+            return
+
+        length = self._length(rng, kwargs.get("max_tokens"))
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for index in range(length):
+            if index:
+                await asyncio.sleep(interval)
+            token = rng.choice(_VOCABULARY) + (" " if index < length - 1 else "")
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages, length)))
+
+
+def fake_model_settings(model: str) -> Dict[str, Any]:
+    """Fake provider parameters for a model: FAKE_LLM_* defaults overridden by FAKE_LLM_MODELS[model]"""
+    params = {
+        "ttft": settings.fake_llm_ttft,
+        "ttft_jitter": settings.fake_llm_ttft_jitter,
+        "tokens_per_second": settings.fake_llm_tokens_per_second,
+        "output_tokens": settings.fake_llm_output_tokens,
+        "output_tokens_stddev": settings.fake_llm_output_tokens_stddev,
+        "error_rate": settings.fake_llm_error_rate,
+        "error_status": settings.fake_llm_error_status,
+        "tool_calls": list(settings.fake_llm_tool_calls),
+        "seed": settings.fake_llm_seed
+    }
+    params.update(settings.fake_llm_models.get(model, {}))
+    return params
@@ -0,0 +1,127 @@
+"""
+Conversation history reconciliation
+클라이언트가 보낸 대화 기록(messages)을 체크포인트에 저장된 스레드와 맞춰 그래프 입력을 만듭니다.
+
+- server (기본): 체크포인트된 스레드가 기준입니다. 보낸 기록은 빈 스레드를 시작할 때만 그대로 쓰고,
+  이미 스레드에 있는 메시지(id 또는 내용 해시가 같은 메시지)는 다시 추가하지 않습니다.
+- client: 보낸 기록이 대화 전체입니다. 기록이 있으면 스레드의 메시지를 그 기록으로 교체합니다.
+"""
+
+import hashlib
+from typing import Any, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from app.core.config import settings
+from app.models.chat import ChatMessage, MessageRole
+from app.utils.messages import message_text
+from app.utils.metrics import metrics
+
+SERVER = "server"
+CLIENT = "client"
+
+
+def to_langchain_messages(messages: List[ChatMessage]) -> List[BaseMessage]:
+    """Convert ChatMessage list to LangChain message format (client ids are kept)"""
+    converted: List[BaseMessage] = []
+    for msg in messages:
+        if msg.role == MessageRole.USER:
+            converted.append(HumanMessage(content=msg.content, id=msg.id))
+        elif msg.role == MessageRole.ASSISTANT:
+            converted.append(AIMessage(content=msg.content, id=msg.id))
+        elif msg.role == MessageRole.SYSTEM:
+            converted.append(SystemMessage(content=msg.content, id=msg.id))
+    return converted
+
+
+def content_hash(message: BaseMessage) -> str:
+    """Role + whitespace-normalized text, so a resent message matches its checkpointed copy"""
+    text = " ".join(message_text(message.content).split())
+    return hashlib.sha1(f"{message.type}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def _is_conversational(message: BaseMessage) -> bool:
+    # 클라이언트 기록에는 도구 호출/결과와 압축 요약이 없으므로 비교 대상에서 제외
+    if isinstance(message, AIMessage):
+        return not message.tool_calls
+    return isinstance(message, HumanMessage) or (isinstance(message, SystemMessage) and not message.name)
+
+
+def new_history(existing: List[BaseMessage], supplied: List[BaseMessage]) -> List[BaseMessage]:
+    """Supplied messages the checkpointed thread does not have yet.
+
+    The supplied history is aligned on the last of its messages found in the
+    thread (the thread's latest message first, then any other), and only what
+    follows that anchor is new. Without an anchor the thread wins and nothing
+    is added, since the server cannot tell where the messages belong.
+    """
+    if not existing:
+        return supplied
+    ids = {message.id for message in existing if message.id}
+    conversational = [message for message in existing if _is_conversational(message)]
+    hashes = {content_hash(message) for message in conversational}
+
+    def matches(message: BaseMessage) -> bool:
+        return bool(message.id and message.id in ids) or content_hash(message) in hashes
+
+    anchor: Optional[int] = None
+    if conversational:
+        latest = conversational[-1]
+        latest_hash = content_hash(latest)
+        anchor = next(
+            (
+                index for index in range(len(supplied) - 1, -1, -1)
+                if (supplied[index].id and supplied[index].id == latest.id)
+                or content_hash(supplied[index]) == latest_hash
+            ),
+            None
+        )
+    if anchor is None:
+        anchor = next((index for index in range(len(supplied) - 1, -1, -1) if matches(supplied[index])), None)
+    if anchor is None:
+        metrics.increment("history.ignored", len(supplied))
+        return []
+    metrics.increment("history.deduplicated", anchor + 1)
+    return supplied[anchor + 1:]
+
+
+def build_input_messages(
+    message: str,
+    messages: Optional[List[ChatMessage]],
+    existing: List[BaseMessage],
+    mode: Optional[str] = None
+) -> List[BaseMessage]:
+    """Messages to feed the graph for a turn: reconciled history plus the new user message"""
+    current = HumanMessage(content=message)
+    supplied = to_langchain_messages(messages or [])
+    # 요청 기록의 마지막이 현재 메시지이면 한 번만 추가
+    if supplied and isinstance(supplied[-1], HumanMessage) and content_hash(supplied[-1]) == content_hash(current):
+        current = HumanMessage(content=message, id=supplied[-1].id)
+        supplied = supplied[:-1]
+    if not supplied:
+        return [current]
+
+    mode = (mode or settings.history_mode).lower()
+    if mode == CLIENT:
+        if not existing:
+            return supplied + [current]
+        return [RemoveMessage(id=REMOVE_ALL_MESSAGES)] + supplied + [current]
+    if mode != SERVER:
+        raise ValueError(f"Unknown history mode: {mode}")
+    return new_history(existing, supplied) + [current]
+
+
+async def turn_input(
+    graph: Any,
+    config: RunnableConfig,
+    message: str,
+    messages: Optional[List[ChatMessage]] = None
+) -> List[BaseMessage]:
+    """Graph input messages for a turn; the thread is only read when the client sent history"""
+    existing: List[BaseMessage] = []
+    if messages:
+        state = await graph.aget_state(config)
+        existing = state.values.get("messages", [])
+    return build_input_messages(message, messages, existing)
@@ -0,0 +1,205 @@
+"""
+Process-wide pool of LLM clients
+채팅 모델 클라이언트를 프로세스 전체에서 재사용하여 HTTP 연결 풀과 TLS 세션을 유지합니다.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import anthropic
+import httpx
+from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_openai import ChatOpenAI
+from pydantic import Field
+
+from app.core.config import settings
+from app.services.fake_llm import FakeChatModel, fake_model_settings
+
+ClientKey = Tuple[str, str, Tuple[Tuple[str, Hashable], ...]]
+ClientFactory = Callable[[str, Dict[str, Any]], BaseChatModel]
+
+# 요청마다 달라질 수 있는 생성 파라미터 (클라이언트 키에 포함하지 않음)
+GENERATION_PARAMS = ("temperature", "max_tokens")
+
+# 프로바이더별 공유 HTTP 클라이언트 클래스 (Anthropic SDK는 자체 httpx 계열 클래스만 받음)
+HTTP_CLIENT_CLASSES: Dict[str, Callable[..., Any]] = {
+    "openai": httpx.AsyncClient,
+    "anthropic": anthropic.DefaultAsyncHttpxClient
+}
+
+
+class PooledChatAnthropic(ChatAnthropic):
+    """ChatAnthropic that sends async requests through a caller-owned ``httpx.AsyncClient``.
+
+    ChatAnthropic has no ``http_async_client`` option like ChatOpenAI; it
+    builds its own transport per instance, so the SDK client is built here
+    around the shared one instead, from the model's public connection fields.
+    ``_async_client`` is the hook ChatAnthropic sends async requests through
+    (langchain-anthropic is pinned to the range that has it).
+    """
+
+    http_async_client: Optional[Any] = Field(default=None, exclude=True)
+
+    @cached_property
+    def _async_client(self) -> anthropic.AsyncClient:
+        if self.http_async_client is None:
+            return super()._async_client
+        params: Dict[str, Any] = {
+            "api_key": self.anthropic_api_key.get_secret_value(),
+            "base_url": self.anthropic_api_url,
+            "max_retries": self.max_retries,
+            "default_headers": self.default_headers or None,
+            "http_client": self.http_async_client
+        }
+        # ChatAnthropic과 같이 0 이하의 타임아웃은 SDK 기본값을 사용
+        timeout = self.default_request_timeout
+        if timeout is None or timeout > 0:
+            params["timeout"] = timeout
+        return anthropic.AsyncClient(**params)
+
+
+class LLMClientPool:
+    """Bounded LRU cache of chat model clients keyed by provider, model and parameters.
+
+    The clients of a provider share one keep-alive ``httpx.AsyncClient``, so a
+    warm connection survives across turns, models and evictions.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None, http_client_kwargs: Optional[Dict[str, Any]] = None):
+        self.max_size = max_size or settings.llm_client_cache_size
+        self.http_client_kwargs = http_client_kwargs or {}
+        self._clients: "OrderedDict[ClientKey, BaseChatModel]" = OrderedDict()
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._factories: Dict[str, ClientFactory] = {
+            "openai": self._create_openai,
+            "anthropic": self._create_anthropic,
+            "fake": self._create_fake
+        }
+    
+    def register_factory(self, provider: str, factory: ClientFactory):
+        """Register a client factory ``factory(model, params)`` for a provider name"""
+        self._factories[provider] = factory
+    
+    @property
+    def providers(self) -> Tuple[str, ...]:
+        return tuple(self._factories)
+    
+    def get(self, provider: str, model: str, **params: Hashable) -> BaseChatModel:
+        """Return the cached client for this configuration, creating it if needed"""
+        key: ClientKey = (provider, model, tuple(sorted(params.items())))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return client
+            
+            self.misses += 1
+            client = self._create(provider, model, params)
+            self._clients[key] = client
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+            return client
+    
+    def _http_async_client(self, provider: str) -> Any:
+        """Shared async transport with keep-alive for a provider"""
+        client = self._http_clients.get(provider)
+        if client is None:
+            client = HTTP_CLIENT_CLASSES[provider](
+                limits=httpx.Limits(
+                    max_connections=settings.llm_http_max_connections,
+                    max_keepalive_connections=settings.llm_http_max_keepalive,
+                    keepalive_expiry=settings.llm_http_keepalive_expiry
+                ),
+                timeout=httpx.Timeout(settings.llm_request_timeout),
+                **self.http_client_kwargs
+            )
+            self._http_clients[provider] = client
+        return client
+    
+    def _create(self, provider: str, model: str, params: Dict[str, Any]) -> BaseChatModel:
+        factory = self._factories.get(provider)
+        if factory is None:
+            raise ValueError(f"Unsupported provider: {provider}")
+        return factory(model, params)
+    
+    def _create_openai(self, model: str, params: Dict[str, Any]) -> BaseChatModel:
+        if not settings.openai_api_key:
+            raise ValueError("OpenAI API key not configured")
+        return ChatOpenAI(
+            model=model,
+            openai_api_key=settings.openai_api_key,
+            http_async_client=self._http_async_client("openai"),
+            streaming=True,
+            max_retries=0,
+            **params
+        )
+    
+    def _create_anthropic(self, model: str, params: Dict[str, Any]) -> BaseChatModel:
+        if not settings.anthropic_api_key:
+            raise ValueError("Anthropic API key not configured")
+        return PooledChatAnthropic(
+            model=model,
+            anthropic_api_key=settings.anthropic_api_key,
+            http_async_client=self._http_async_client("anthropic"),
+            streaming=True,
+            max_retries=0,
+            **params
+        )
+    
+    def _create_fake(self, model: str, params: Dict[str, Any]) -> BaseChatModel:
+        return FakeChatModel(model=model, **{**fake_model_settings(model), **params})
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"clients": len(self._clients), "hits": self.hits, "misses": self.misses}
+    
+    async def aclose(self):
+        """Close shared transports (application shutdown)"""
+        with self._lock:
+            http_clients = list(self._http_clients.values())
+            self._http_clients.clear()
+            self._clients.clear()
+        for client in http_clients:
+            await client.aclose()
+
+
+def generation_config(
+    thread_id: str,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None
+) -> RunnableConfig:
+    """Run config for a graph invocation carrying per-request generation parameters"""
+    return {
+        "configurable": {
+            "thread_id": thread_id,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+    }
+
+
+def bind_generation_params(llm: Runnable, config: Optional[RunnableConfig]) -> Runnable:
+    """Bind the per-request generation parameters from the run config to a pooled client.
+
+    The parameters travel as invocation kwargs, which both providers merge over
+    the constructor defaults, so the shared client is never copied or rebuilt.
+    """
+    configurable = (config or {}).get("configurable", {})
+    params = {
+        name: configurable[name]
+        for name in GENERATION_PARAMS
+        if configurable.get(name) is not None
+    }
+    return llm.bind(**params) if params else llm
+
+
+# 전역 LLM 클라이언트 풀 인스턴스
+llm_client_pool = LLMClientPool()
@@ -0,0 +1,529 @@
+"""
+Model provider registry
+모델 이름을 프로바이더에 매핑하고, 모델별 첫 토큰 타임아웃/동시 실행 제한/폴백 체인을 적용합니다.
+헤징을 켜면 첫 토큰이 관측된 TTFT 백분위수보다 늦을 때 대체 모델로 요청을 하나 더 보냅니다.
+"""
+
+import asyncio
+import math
+from collections import deque
+from contextlib import AsyncExitStack, aclosing, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence, Set
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, message_chunk_to_message
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.config import get_stream_writer
+
+from app.core.config import settings
+from app.services.admission import AdmissionController, AdmissionTimeoutError, admission_controller
+from app.services.context_budget import ContextBudget, context_budget
+from app.services.llm_clients import LLMClientPool, bind_generation_params, llm_client_pool
+from app.services.resilience import CircuitBreakers, CircuitOpenError, DecorrelatedJitter, circuit_breakers, is_provider_fault, is_retryable
+from app.utils.logging import get_logger
+from app.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# 모델 이름 접두사 → 프로바이더 (MODEL_PROVIDERS 설정이 우선)
+DEFAULT_PROVIDER_PREFIXES = {
+    "gpt": "openai",
+    "chatgpt": "openai",
+    "o1": "openai",
+    "o3": "openai",
+    "o4": "openai",
+    "claude": "anthropic",
+    "fake": "fake",
+}
+
+# 헤징된 호출의 토큰은 LangGraph custom 스트림으로 전달됩니다: {"type": HEDGED_CHUNK, "chunk": AIMessageChunk}
+HEDGED_CHUNK = "llm_chunk"
+
+_END = object()
+
+
+class FirstTokenError(Exception):
+    """A model attempt failed before producing any output, so another model may take over"""
+
+    def __init__(self, model: str, cause: BaseException):
+        super().__init__(f"{model}: {cause!r}")
+        self.model = model
+        self.cause = cause
+
+
+@dataclass
+class ModelSpec:
+    """Resolved configuration of one model"""
+    name: str
+    provider: str
+    first_token_timeout: float
+    max_concurrency: int = 0  # 0 = 제한 없음
+    fallbacks: List[str] = field(default_factory=list)
+    in_flight: int = 0
+    ttft_samples: Deque[float] = field(default_factory=lambda: deque(maxlen=settings.llm_ttft_window))
+    _slots: Optional[asyncio.Semaphore] = field(default=None, repr=False)
+
+    @property
+    def saturated(self) -> bool:
+        return 0 < self.max_concurrency <= self.in_flight
+
+    def record_ttft(self, seconds: float):
+        self.ttft_samples.append(seconds)
+        metrics.observe(f"llm.ttft.{self.name}", seconds)
+
+    def ttft_percentile(self, percentile: float) -> Optional[float]:
+        """Nearest-rank percentile of the recent first-token latencies"""
+        if not self.ttft_samples:
+            return None
+        ordered = sorted(self.ttft_samples)
+        rank = max(math.ceil(percentile / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    def hedge_delay(self) -> float:
+        """How long to wait for the first token before sending a hedge request"""
+        if len(self.ttft_samples) < settings.llm_hedge_min_samples:
+            return settings.llm_hedge_initial_delay
+        return max(self.ttft_percentile(settings.llm_hedge_percentile), settings.llm_hedge_min_delay)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the model's concurrency slots for the duration of a call"""
+        if self.max_concurrency > 0 and self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        if self._slots is not None:
+            await self._slots.acquire()
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+
+class ModelRegistry:
+    """Maps model names to providers and runs calls across a model's fallback chain.
+
+    A call is streamed from the provider and the chain moves on to the next
+    model when an attempt fails or misses its first-token deadline before any
+    output was produced. Once tokens have been emitted the attempt is
+    committed, since the caller may already have forwarded them. A model whose
+    concurrency limit is reached is skipped while a fallback remains.
+
+    With hedging enabled, the second model of the chain is started as well when
+    the primary has not produced a first token within its hedge delay. Both
+    attempts run without the graph's callbacks; the first one to produce a
+    token wins, the other is cancelled, and the winner's chunks are forwarded
+    to the graph's custom stream as ``HEDGED_CHUNK`` events.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[LLMClientPool] = None,
+        providers: Optional[Dict[str, str]] = None,
+        fallbacks: Optional[Dict[str, List[str]]] = None,
+        first_token_timeouts: Optional[Dict[str, float]] = None,
+        max_concurrency: Optional[Dict[str, int]] = None,
+        hedging: Optional[bool] = None,
+        admission: Optional[AdmissionController] = None,
+        breakers: Optional[CircuitBreakers] = None,
+        context: Optional[ContextBudget] = None
+    ):
+        self.pool = pool or llm_client_pool
+        self.admission = admission or admission_controller
+        self.breakers = breakers or circuit_breakers
+        self.context = context or context_budget
+        self.providers = dict(settings.model_providers if providers is None else providers)
+        self.fallbacks = dict(settings.model_fallbacks if fallbacks is None else fallbacks)
+        self.first_token_timeouts = dict(
+            settings.model_first_token_timeouts if first_token_timeouts is None else first_token_timeouts
+        )
+        self.max_concurrency = dict(settings.model_max_concurrency if max_concurrency is None else max_concurrency)
+        self.hedging = settings.llm_hedge_enabled if hedging is None else hedging
+        self.prefixes = dict(DEFAULT_PROVIDER_PREFIXES)
+        self._specs: Dict[str, ModelSpec] = {}
+        self.hedge_eligible = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def register_prefix(self, prefix: str, provider: str):
+        """Route every model whose name starts with ``prefix`` to ``provider``"""
+        self.prefixes[prefix] = provider
+        self._specs.clear()
+
+    def provider_for(self, model: str) -> str:
+        provider = self.providers.get(model)
+        if provider is not None:
+            return provider
+        for prefix in sorted(self.prefixes, key=len, reverse=True):
+            if model.startswith(prefix):
+                return self.prefixes[prefix]
+        raise ValueError(f"Unsupported model: {model}")
+
+    @staticmethod
+    def _lookup(table: Dict[str, Any], model: str, default: Any) -> Any:
+        return table.get(model, table.get("*", default))
+
+    def spec(self, model: str) -> ModelSpec:
+        spec = self._specs.get(model)
+        if spec is None:
+            spec = ModelSpec(
+                name=model,
+                provider=self.provider_for(model),
+                first_token_timeout=self._lookup(
+                    self.first_token_timeouts, model, settings.llm_first_token_timeout
+                ),
+                max_concurrency=self._lookup(self.max_concurrency, model, 0),
+                fallbacks=[name for name in self._lookup(self.fallbacks, model, []) if name != model]
+            )
+            self._specs[model] = spec
+        return spec
+
+    def chain(self, model: Optional[str] = None) -> List[ModelSpec]:
+        """The requested model followed by its fallbacks, in order"""
+        primary = self.spec(model or settings.default_model)
+        specs = [primary]
+        for name in primary.fallbacks:
+            try:
+                fallback = self.spec(name)
+            except ValueError:
+                logger.warning(f"Ignoring unsupported fallback model {name} for {primary.name}")
+                continue
+            if all(fallback.name != spec.name for spec in specs):
+                specs.append(fallback)
+        return specs
+
+    def client(self, spec: ModelSpec) -> BaseChatModel:
+        """Pooled client for a model with the default generation parameters"""
+        return self.pool.get(
+            spec.provider,
+            spec.name,
+            temperature=settings.temperature,
+            max_tokens=settings.max_tokens
+        )
+
+    def _runnable(self, spec: ModelSpec, config: Optional[RunnableConfig], tools: Optional[Sequence[Any]]) -> Runnable:
+        llm = self.client(spec)
+        runnable = llm.bind_tools(tools) if tools else llm
+        return bind_generation_params(runnable, config)
+
+    @staticmethod
+    def _max_tokens(config: Optional[RunnableConfig]) -> int:
+        configurable = (config or {}).get("configurable", {})
+        return configurable.get("max_tokens") or settings.max_tokens
+
+    async def _open_stream(
+        self,
+        spec: ModelSpec,
+        runnable: Runnable,
+        messages: List[BaseMessage],
+        config: Optional[RunnableConfig]
+    ) -> tuple:
+        """Start the provider stream and wait for its first chunk, returning ``(first_chunk, stream)``"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        stream = runnable.astream(messages, config=config)
+        try:
+            first = await asyncio.wait_for(anext(stream, None), spec.first_token_timeout)
+            if first is None:
+                raise ValueError("empty response")
+        except BaseException:
+            await stream.aclose()
+            raise
+        spec.record_ttft(loop.time() - started)
+        return first, stream
+
+    async def _stream(
+        self,
+        spec: ModelSpec,
+        messages: List[BaseMessage],
+        config: Optional[RunnableConfig],
+        tools: Optional[Sequence[Any]]
+    ) -> AsyncIterator[AIMessageChunk]:
+        """Stream one attempt, raising ``FirstTokenError`` for failures before the first chunk.
+
+        The history is first fitted to the model's context budget, whose prompt
+        token count plus ``max_tokens`` is the cost charged to the TPM budget.
+        The attempt holds a concurrency slot of the model and an admission slot
+        of its provider until the stream is closed. Retryable errors before the
+        first chunk are retried with decorrelated jitter. An attempt counts at
+        most once against the provider's circuit breaker, and only for provider
+        faults (``is_provider_fault``); an open circuit fails the attempt
+        without calling the provider.
+        """
+        max_tokens = self._max_tokens(config)
+        try:
+            fitted = self.context.fit(spec.name, spec.provider, messages, max_tokens)
+        except Exception as e:
+            # 컨텍스트 창이 더 큰 다른 모델이 이어받을 수 있음
+            raise FirstTokenError(spec.name, e) from e
+        messages = fitted.messages
+
+        breaker = self.breakers.get(spec.provider)
+        if not breaker.allow():
+            raise FirstTokenError(spec.name, CircuitOpenError(f"Circuit for {spec.provider} is open"))
+
+        try:
+            async with AsyncExitStack() as resources:
+                await resources.enter_async_context(spec.slot())
+                try:
+                    ticket = await resources.enter_async_context(
+                        self.admission.admit(spec.provider, fitted.prompt_tokens + max_tokens)
+                    )
+                except AdmissionTimeoutError as e:
+                    raise FirstTokenError(spec.name, e) from e
+                try:
+                    runnable = self._runnable(spec, config, tools)
+                except Exception as e:
+                    # 설정 오류 (API 키 없음 등)는 프로바이더 장애로 보지 않음
+                    raise FirstTokenError(spec.name, e) from e
+
+                backoff = DecorrelatedJitter()
+                retries = 0
+                while True:
+                    try:
+                        first, stream = await self._open_stream(spec, runnable, messages, config)
+                        break
+                    except Exception as e:
+                        if retries < settings.llm_max_retries and is_retryable(e) and breaker.allow():
+                            retries += 1
+                            delay = backoff.next()
+                            metrics.increment(f"llm.retry.{spec.provider}")
+                            logger.info(f"Retrying {spec.name} in {delay:.2f}s after {e!r} ({retries}/{settings.llm_max_retries})")
+                            await asyncio.sleep(delay)
+                            continue
+                        if is_provider_fault(e):
+                            breaker.record_failure()
+                        raise FirstTokenError(spec.name, e) from e
+                breaker.record_success()
+
+                try:
+                    used_tokens = 0
+                    chunk = first
+                    while chunk is not None:
+                        if chunk.usage_metadata:
+                            used_tokens += chunk.usage_metadata.get("total_tokens", 0)
+                        yield chunk
+                        # 소비자 쪽 예외 (yield 지점으로 던져진 것)는 프로바이더 장애로 세지 않음
+                        try:
+                            chunk = await anext(stream, None)
+                        except Exception as e:
+                            if is_provider_fault(e):
+                                breaker.record_failure()
+                            raise
+                    if used_tokens:
+                        ticket.actual_tokens = used_tokens
+                finally:
+                    await stream.aclose()
+        finally:
+            breaker.abandon()
+
+    async def _attempt(
+        self,
+        spec: ModelSpec,
+        messages: List[BaseMessage],
+        config: Optional[RunnableConfig],
+        tools: Optional[Sequence[Any]]
+    ) -> AIMessage:
+        response = None
+        async with aclosing(self._stream(spec, messages, config, tools)) as stream:
+            async for chunk in stream:
+                response = chunk if response is None else response + chunk
+        return message_chunk_to_message(response)
+
+    async def _produce(
+        self,
+        index: int,
+        spec: ModelSpec,
+        messages: List[BaseMessage],
+        config: Optional[RunnableConfig],
+        tools: Optional[Sequence[Any]],
+        queue: asyncio.Queue
+    ):
+        """Run one hedged attempt, reporting ``(index, chunk | exception | _END)`` to the queue"""
+        try:
+            async with aclosing(self._stream(spec, messages, config, tools)) as stream:
+                async for chunk in stream:
+                    queue.put_nowait((index, chunk))
+        except Exception as e:
+            queue.put_nowait((index, e))
+            return
+        queue.put_nowait((index, _END))
+
+    @staticmethod
+    def _chunk_writer() -> Callable[[Any], None]:
+        try:
+            return get_stream_writer()
+        except RuntimeError:
+            # 그래프 밖에서 호출된 경우
+            return lambda _: None
+
+    async def _hedged(
+        self,
+        primary: ModelSpec,
+        alternate: ModelSpec,
+        messages: List[BaseMessage],
+        config: Optional[RunnableConfig],
+        tools: Optional[Sequence[Any]]
+    ) -> AIMessage:
+        """Race the primary against a delayed hedge request and keep the first stream to start"""
+        loop = asyncio.get_running_loop()
+        detached: RunnableConfig = {**(config or {}), "callbacks": []}
+        specs = [primary, alternate]
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._produce(0, primary, messages, detached, tools, queue))]
+        errors: List[FirstTokenError] = []
+        hedged = False
+        hedge_at = loop.time() + primary.hedge_delay()
+        self.hedge_eligible += 1
+
+        try:
+            # 첫 토큰을 낸 시도가 승자
+            while True:
+                timeout = hedge_at - loop.time() if len(tasks) == 1 else None
+                try:
+                    index, item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    hedged = True
+                    self.hedges += 1
+                    metrics.increment("llm.hedge.started")
+                    logger.info(f"No first token from {primary.name} in time, hedging with {alternate.name}")
+                    tasks.append(asyncio.create_task(self._produce(1, alternate, messages, detached, tools, queue)))
+                    continue
+
+                if item is _END:
+                    item = FirstTokenError(specs[index].name, ValueError("empty response"))
+                elif isinstance(item, BaseException) and not isinstance(item, FirstTokenError):
+                    # 첫 토큰 전의 예외는 그 시도의 실패로 보고 다른 시도에 맡김
+                    item = FirstTokenError(specs[index].name, item)
+                if isinstance(item, FirstTokenError):
+                    errors.append(item)
+                    metrics.increment(f"llm.failed.{specs[index].provider}")
+                    logger.warning(f"Model {specs[index].name} failed before the first token: {item.cause!r}")
+                    if len(errors) == len(specs):
+                        raise errors[-1]
+                    if len(tasks) == 1:
+                        # 1차 모델이 헤지 지연 전에 실패하면 바로 대체 모델로 전환
+                        metrics.increment("llm.fallback")
+                        tasks.append(asyncio.create_task(self._produce(1, alternate, messages, detached, tools, queue)))
+                    continue
+
+                winner, response = index, item
+                break
+
+            if winner == 1 and hedged and not errors:
+                self.hedge_wins += 1
+                metrics.increment("llm.hedge.won")
+            for index, task in enumerate(tasks):
+                if index != winner:
+                    task.cancel()
+
+            write = self._chunk_writer()
+            write({"type": HEDGED_CHUNK, "chunk": response})
+            while True:
+                index, item = await queue.get()
+                if index != winner:
+                    continue
+                if item is _END:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                response = response + item
+                write({"type": HEDGED_CHUNK, "chunk": item})
+            return message_chunk_to_message(response)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def ainvoke(
+        self,
+        model: Optional[str],
+        messages: List[BaseMessage],
+        config: Optional[RunnableConfig] = None,
+        tools: Optional[Sequence[Any]] = None
+    ) -> AIMessage:
+        """Run one chat completion, moving down the fallback chain on early failures"""
+        candidates = self.chain(model)
+        last_error: Optional[FirstTokenError] = None
+
+        if self.hedging and len(candidates) > 1:
+            try:
+                return await self._hedged(candidates[0], candidates[1], messages, config, tools)
+            except FirstTokenError as e:
+                last_error = e
+                candidates = candidates[2:]
+
+        for index, spec in enumerate(candidates):
+            is_last = index == len(candidates) - 1
+            if spec.saturated and not is_last:
+                metrics.increment("llm.saturated")
+                logger.info(f"Model {spec.name} at its concurrency limit, trying the next model")
+                continue
+
+            try:
+                response = await self._attempt(spec, messages, config, tools)
+            except FirstTokenError as e:
+                last_error = e
+                metrics.increment(f"llm.failed.{spec.provider}")
+                logger.warning(f"Model {spec.name} failed before the first token: {e.cause!r}")
+                continue
+
+            if index > 0 or last_error is not None:
+                metrics.increment("llm.fallback")
+            return response
+
+        raise last_error.cause if last_error is not None else RuntimeError("No model available")
+
+    def hedge_stats(self) -> Dict[str, Any]:
+        """Hedge rate (hedges per eligible call) and win rate (hedge wins per hedge)"""
+        return {
+            "enabled": self.hedging,
+            "eligible": self.hedge_eligible,
+            "hedged": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": self.hedges / self.hedge_eligible if self.hedge_eligible else 0.0,
+            "win_rate": self.hedge_wins / self.hedges if self.hedges else 0.0
+        }
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "provider": spec.provider,
+                "in_flight": spec.in_flight,
+                "max_concurrency": spec.max_concurrency,
+                "fallbacks": spec.fallbacks,
+                "ttft_p50": spec.ttft_percentile(50),
+                "ttft_p95": spec.ttft_percentile(95)
+            }
+            for name, spec in self._specs.items()
+        }
+
+
+def stream_message(stream_mode: str, payload: Any, node: str, hedged_ids: Set[str]) -> Optional[AIMessage]:
+    """LLM message chunk carried by a graph stream event of ``node``, if any.
+
+    Accepts "messages" events and hedged chunks from the "custom" stream. The
+    copy of a hedged response that LangGraph emits when the node finishes is
+    skipped, since its tokens were already forwarded.
+    """
+    if stream_mode == "custom":
+        if isinstance(payload, dict) and payload.get("type") == HEDGED_CHUNK:
+            chunk = payload["chunk"]
+            hedged_ids.add(chunk.id)
+            return chunk
+        return None
+    if stream_mode != "messages":
+        return None
+
+    message, metadata = payload
+    if metadata.get("langgraph_node") != node or not isinstance(message, AIMessage):
+        return None
+    if message.id is not None and message.id in hedged_ids:
+        return None
+    return message
+
+
+# 전역 모델 레지스트리 인스턴스
+model_registry = ModelRegistry()
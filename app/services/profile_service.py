@@ -11,6 +11,10 @@ from app.models.profile import (
     ProjectCreate, ProjectUpdate, Project,
     ProfileWithDetails, CareerWithProjects
 )
+from app.services.semantic_cache import semantic_cache
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class ProfileService:
@@ -19,6 +23,24 @@ class ProfileService:
     def __init__(self):
         self.client = get_supabase_client()
     
+    # 캐시 무효화 (DB 쓰기가 성공한 뒤에 호출하며, 실패해도 쓰기 결과는 그대로 반환)
+    async def _invalidate_answers(self, profile_id) -> None:
+        """프로필 데이터가 바뀌면 해당 프로필의 캐시된 AI 답변을 무효화합니다 (shared 모드에서는 모든 워커)."""
+        try:
+            await semantic_cache.ainvalidate_profile(str(profile_id))
+        except Exception as e:
+            logger.error(f"Failed to invalidate cached answers of profile {profile_id}: {e}")
+    
+    async def _invalidate_answers_for_career(self, career_id) -> None:
+        """경력사항이 속한 프로필의 캐시된 AI 답변을 무효화합니다."""
+        try:
+            career = await self.get_career_by_id(career_id)
+        except Exception as e:
+            logger.error(f"Failed to invalidate cached answers of career {career_id}: {e}")
+            return
+        if career:
+            await self._invalidate_answers(career.profile_id)
+    
     # 프로필 CRUD
     async def create_profile(self, profile_data: ProfileCreate) -> Profile:
         """새 프로필을 생성합니다."""
@@ -67,19 +89,22 @@ class ProfileService:
                 return await self.get_profile_by_id(profile_id)
             
             result = self.client.table('profiles').update(update_data).eq('id', str(profile_id)).execute()
-            if result.data:
-                return Profile(**result.data[0])
-            return None
+            if not result.data:
+                return None
+            profile = Profile(**result.data[0])
         except Exception as e:
             raise Exception(f"프로필 수정 중 오류가 발생했습니다: {str(e)}")
+        await self._invalidate_answers(profile_id)
+        return profile
     
     async def delete_profile(self, profile_id: UUID) -> bool:
         """프로필을 삭제합니다."""
         try:
             result = self.client.table('profiles').delete().eq('id', str(profile_id)).execute()
-            return len(result.data) > 0
         except Exception as e:
             raise Exception(f"프로필 삭제 중 오류가 발생했습니다: {str(e)}")
+        await self._invalidate_answers(profile_id)
+        return len(result.data) > 0
     
     # 경력사항 CRUD
     async def create_career(self, career_data: CareerCreate) -> Career:
@@ -93,11 +118,13 @@ class ProfileService:
             if 'end_date' in data and data['end_date']:
                 data['end_date'] = str(data['end_date'])
             result = self.client.table('careers').insert(data).execute()
-            if result.data:
-                return Career(**result.data[0])
-            raise Exception("경력사항 생성에 실패했습니다.")
+            if not result.data:
+                raise Exception("경력사항 생성에 실패했습니다.")
+            career = Career(**result.data[0])
         except Exception as e:
             raise Exception(f"경력사항 생성 중 오류가 발생했습니다: {str(e)}")
+        await self._invalidate_answers(data['profile_id'])
+        return career
     
     async def get_career_by_id(self, career_id: UUID) -> Optional[Career]:
         """ID로 경력사항을 조회합니다."""
@@ -131,19 +158,23 @@ class ProfileService:
                 update_data['end_date'] = str(update_data['end_date'])
             
             result = self.client.table('careers').update(update_data).eq('id', str(career_id)).execute()
-            if result.data:
-                return Career(**result.data[0])
-            return None
+            if not result.data:
+                return None
+            career = Career(**result.data[0])
         except Exception as e:
             raise Exception(f"경력사항 수정 중 오류가 발생했습니다: {str(e)}")
+        await self._invalidate_answers(career.profile_id)
+        return career
     
     async def delete_career(self, career_id: UUID) -> bool:
         """경력사항을 삭제합니다."""
         try:
             result = self.client.table('careers').delete().eq('id', str(career_id)).execute()
-            return len(result.data) > 0
         except Exception as e:
             raise Exception(f"경력사항 삭제 중 오류가 발생했습니다: {str(e)}")
+        for row in result.data:
+            await self._invalidate_answers(row['profile_id'])
+        return len(result.data) > 0
     
     # 프로젝트 CRUD
     async def create_project(self, project_data: ProjectCreate) -> Project:
@@ -157,11 +188,13 @@ class ProfileService:
             if 'end_date' in data and data['end_date']:
                 data['end_date'] = str(data['end_date'])
             result = self.client.table('projects').insert(data).execute()
-            if result.data:
-                return Project(**result.data[0])
-            raise Exception("프로젝트 생성에 실패했습니다.")
+            if not result.data:
+                raise Exception("프로젝트 생성에 실패했습니다.")
+            project = Project(**result.data[0])
         except Exception as e:
             raise Exception(f"프로젝트 생성 중 오류가 발생했습니다: {str(e)}")
+        await self._invalidate_answers_for_career(data['career_id'])
+        return project
     
     async def get_project_by_id(self, project_id: UUID) -> Optional[Project]:
         """ID로 프로젝트를 조회합니다."""
@@ -195,19 +228,23 @@ class ProfileService:
                 update_data['end_date'] = str(update_data['end_date'])
             
             result = self.client.table('projects').update(update_data).eq('id', str(project_id)).execute()
-            if result.data:
-                return Project(**result.data[0])
-            return None
+            if not result.data:
+                return None
+            project = Project(**result.data[0])
         except Exception as e:
             raise Exception(f"프로젝트 수정 중 오류가 발생했습니다: {str(e)}")
+        await self._invalidate_answers_for_career(project.career_id)
+        return project
     
     async def delete_project(self, project_id: UUID) -> bool:
         """프로젝트를 삭제합니다."""
         try:
             result = self.client.table('projects').delete().eq('id', str(project_id)).execute()
-            return len(result.data) > 0
         except Exception as e:
             raise Exception(f"프로젝트 삭제 중 오류가 발생했습니다: {str(e)}")
+        for row in result.data:
+            await self._invalidate_answers_for_career(row['career_id'])
+        return len(result.data) > 0
     
     # 전체 프로필 정보 조회
     async def get_profile_with_details(self, profile_id: UUID) -> Optional[ProfileWithDetails]:
@@ -0,0 +1,183 @@
+"""
+Retry and circuit breaker policies for LLM providers
+일시적인 오류는 지터가 있는 백오프로 재시도하고, 장애 중인 프로바이더는 서킷 브레이커로 빠르게 차단합니다.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import anthropic
+import httpx
+import openai
+
+from app.core.config import settings
+from app.utils.logging import get_logger
+from app.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# 재시도할 HTTP 상태 코드 (529: Anthropic overloaded)
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+
+_CONNECTION_ERRORS = (
+    ConnectionError,
+    httpx.TransportError,
+    openai.APIConnectionError,
+    anthropic.APIConnectionError,
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider's circuit is open, so the call was not attempted"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient transport failures and throttling/server status codes are worth retrying.
+
+    The first-token deadline (a plain ``TimeoutError``) is not retried: a slow
+    provider is better left to the fallback chain.
+    """
+    if isinstance(error, _CONNECTION_ERRORS):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return status_code in RETRYABLE_STATUS_CODES
+
+
+def is_provider_fault(error: BaseException) -> bool:
+    """Errors that say the provider is unhealthy and count against its circuit breaker.
+
+    Retryable errors and any 5xx do. Client errors (4xx), the first-token
+    deadline, empty responses and errors raised by the caller do not.
+    """
+    if is_retryable(error):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+    return isinstance(status_code, int) and status_code >= 500
+
+
+class DecorrelatedJitter:
+    """Backoff delays following the "decorrelated jitter" scheme: min(cap, uniform(base, previous * 3))"""
+
+    def __init__(self, base: Optional[float] = None, cap: Optional[float] = None):
+        self.base = settings.llm_retry_base_delay if base is None else base
+        self.cap = settings.llm_retry_max_delay if cap is None else cap
+        self._previous = self.base
+
+    def next(self) -> float:
+        self._previous = min(self.cap, random.uniform(self.base, self._previous * 3))
+        return self._previous
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one provider.
+
+    closed: calls flow, consecutive failures are counted.
+    open: calls fail fast until ``reset_timeout`` has passed.
+    half_open: a single probe call is let through; its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.circuit_failure_threshold
+        self.reset_timeout = settings.circuit_reset_timeout if reset_timeout is None else reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+        metrics.increment(f"circuit.rejected.{self.name}")
+        return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+                self._probing = False
+                metrics.increment(f"circuit.opened.{self.name}")
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failures")
+
+    def abandon(self):
+        """Free the half-open probe of a call that ended without an outcome (cancelled)"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = 0.0
+            if self.state == self.OPEN:
+                retry_in = max(self.reset_timeout - (time.monotonic() - self.opened_at), 0.0)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "retry_in": round(retry_in, 3)
+            }
+
+
+class CircuitBreakers:
+    """One breaker per provider, created on first use"""
+
+    def __init__(self, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(provider)
+            if breaker is None:
+                breaker = CircuitBreaker(provider, self.failure_threshold, self.reset_timeout)
+                self._breakers[provider] = breaker
+            return breaker
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+# 전역 서킷 브레이커 인스턴스
+circuit_breakers = CircuitBreakers()
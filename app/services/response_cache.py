@@ -0,0 +1,123 @@
+"""
+Exact-match response cache
+대화 기록이 없는(상태 없는) 채팅 요청의 답변을 메시지/모델/생성 파라미터 기준으로 캐시합니다.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.chat import ChatMessage, MessageRole
+from app.utils.metrics import metrics
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC with whitespace runs collapsed, so trivially different prompts share a key"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+@dataclass
+class _Entry:
+    answer: str
+    size: int
+    expires_at: float
+
+
+class ResponseCache:
+    """LRU + TTL cache of final answers, bounded by entry count and answer bytes"""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.max_entries = max_entries or settings.response_cache_max_entries
+        self.max_bytes = max_bytes or settings.response_cache_max_bytes
+        self.ttl_seconds = ttl_seconds or settings.response_cache_ttl_seconds
+        self.enabled = settings.response_cache_enabled if enabled is None else enabled
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        message: str,
+        messages: Optional[List[ChatMessage]] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """Key on the normalized message list and the effective model and generation parameters"""
+        turns = [(msg.role.value, normalize_text(msg.content)) for msg in messages or []]
+        turns.append((MessageRole.USER.value, normalize_text(message)))
+        payload = {
+            "messages": turns,
+            "model": model or settings.default_model,
+            "temperature": settings.temperature if temperature is None else temperature,
+            "max_tokens": settings.max_tokens if max_tokens is None else max_tokens
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                metrics.increment("response_cache.miss")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.increment("response_cache.hit")
+            return entry.answer
+
+    def put(self, key: str, answer: str):
+        size = len(answer.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(answer, size, time.monotonic() + self.ttl_seconds)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+
+# 전역 응답 캐시 인스턴스
+response_cache = ResponseCache()
@@ -0,0 +1,339 @@
+"""
+Semantic answer cache for the profile assistant
+프로필별로 질문 임베딩을 보관하고, 코사인 유사도가 임계값 이상인 이전 질문의 답변을 재사용합니다.
+답변은 (프로필, 모델, temperature, max_tokens) 단위로 보관되어 다른 모델/생성 파라미터의 답변을 재사용하지 않습니다.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Protocol
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.shared_state import SharedState, shared_state
+from app.utils.metrics import metrics
+
+# 프로필 질문에 자주 나오는 같은 뜻의 표현 (대표 표현 -> 바꿔 쓰는 표현)
+DEFAULT_SYNONYMS: Dict[str, List[str]] = {
+    "경력": ["커리어", "career", "work history", "직장 이력"],
+    "프로젝트": ["project", "작업물", "포트폴리오", "portfolio"],
+    "프로필": ["profile", "프로파일"],
+    "기술": ["스킬", "skill", "기술 스택", "tech stack"],
+    "자기소개": ["자기 소개", "introduce yourself"],
+    "알려줘": [
+        "보여줘", "말해줘", "알려 줘", "보여 줘", "말해 줘", "알려주세요", "보여주세요", "말해주세요",
+        "알려줄래", "보여줄래", "tell me", "show me"
+    ]
+}
+
+
+class Embedder(Protocol):
+    """Turns texts into L2-normalized vectors of a fixed dimension"""
+
+    dimension: int
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        ...
+
+
+class HashingEmbedder:
+    """Offline embedder using signed feature hashing of words and character n-grams.
+
+    Deterministic across processes (CRC32, not Python's salted ``hash``), so
+    workers agree on vectors. Hashing only sees surface overlap, so known
+    paraphrases ("커리어 보여줘" for "경력 알려줘") are first rewritten to one
+    representative phrase from ``synonyms`` (``DEFAULT_SYNONYMS`` plus
+    ``SEMANTIC_CACHE_SYNONYMS``). Use ``ModelEmbedder`` for open-ended paraphrases.
+    """
+
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        ngram_sizes: tuple = (2, 3),
+        synonyms: Optional[Dict[str, Iterable[str]]] = None
+    ):
+        self.dimension = dimension or settings.semantic_cache_dimension
+        self.ngram_sizes = ngram_sizes
+        if synonyms is None:
+            synonyms = {**DEFAULT_SYNONYMS}
+            for canonical, variants in settings.semantic_cache_synonyms.items():
+                synonyms[canonical] = [*synonyms.get(canonical, []), *variants]
+        self._canonical = {
+            self._normalize(variant): self._normalize(canonical)
+            for canonical, variants in synonyms.items()
+            for variant in variants
+        }
+        # 긴 표현부터 맞춰 "알려주세요"가 "알려 줘"보다 먼저 바뀌도록 함
+        # 단어 경계에서만 치환하여 "project"가 "projectile" 안에서 바뀌지 않게 함.
+        # 뒤에는 조사/어미("커리어를", "알려 줘요")가 붙을 수 있도록 한글만 허용
+        self._synonym_pattern = re.compile(
+            r"(?<!\w)("
+            + "|".join(re.escape(variant) for variant in sorted(self._canonical, key=len, reverse=True))
+            + r")(?![^\W가-힣])"
+        ) if self._canonical else None
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).casefold().split())
+
+    def canonicalize(self, text: str) -> str:
+        normalized = self._normalize(text)
+        if self._synonym_pattern is None:
+            return normalized
+        return self._synonym_pattern.sub(lambda match: self._canonical[match.group(1)], normalized)
+
+    def _features(self, text: str) -> List[str]:
+        words = self.canonicalize(text).split()
+        features = [f"w:{word}" for word in words]
+        for word in words:
+            padded = f" {word} "
+            for size in self.ngram_sizes:
+                features.extend(f"c:{padded[i:i + size]}" for i in range(len(padded) - size + 1))
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(feature.encode("utf-8")) for feature in self._features(text)),
+                dtype=np.uint32
+            )
+            if hashes.size == 0:
+                continue
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], hashes % self.dimension, signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class ModelEmbedder:
+    """Embedding-model backed embedder (``SEMANTIC_CACHE_EMBEDDING_MODEL``) for paraphrases hashing cannot see.
+
+    Wraps a LangChain ``Embeddings``; requests go through ``aembed`` so the
+    provider call never blocks the event loop.
+    """
+
+    def __init__(self, embeddings: Any):
+        self.embeddings = embeddings
+        self.dimension = 0
+
+    @classmethod
+    def from_settings(cls) -> "ModelEmbedder":
+        from langchain_openai import OpenAIEmbeddings
+
+        return cls(OpenAIEmbeddings(model=settings.semantic_cache_embedding_model, api_key=settings.openai_api_key))
+
+    def _normalized(self, rows: List[List[float]]) -> np.ndarray:
+        vectors = np.asarray(rows, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        self.dimension = vectors.shape[1]
+        return vectors
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self._normalized(self.embeddings.embed_documents(texts))
+
+    async def aembed(self, texts: List[str]) -> np.ndarray:
+        return self._normalized(await self.embeddings.aembed_documents(texts))
+
+
+def default_embedder() -> Embedder:
+    if settings.semantic_cache_embedding_model:
+        return ModelEmbedder.from_settings()
+    return HashingEmbedder()
+
+
+class CacheKey(NamedTuple):
+    """Answers are only reused for the same profile, model and generation parameters"""
+    profile_id: str
+    model: str
+    temperature: float
+    max_tokens: int
+
+
+@dataclass
+class _ProfileIndex:
+    """Fixed-capacity ring of vectors for one profile; the oldest entry is overwritten when full"""
+    vectors: np.ndarray
+    answers: List[Optional[str]]
+    created_at: np.ndarray
+    size: int = 0
+    cursor: int = 0
+
+    @classmethod
+    def empty(cls, capacity: int, dimension: int) -> "_ProfileIndex":
+        return cls(
+            vectors=np.zeros((capacity, dimension), dtype=np.float32),
+            answers=[None] * capacity,
+            created_at=np.zeros(capacity, dtype=np.float64)
+        )
+
+    def add(self, vector: np.ndarray, answer: str, now: float):
+        self.vectors[self.cursor] = vector
+        self.answers[self.cursor] = answer
+        self.created_at[self.cursor] = now
+        self.cursor = (self.cursor + 1) % len(self.answers)
+        self.size = min(self.size + 1, len(self.answers))
+
+    def search(self, vector: np.ndarray, min_created_at: float) -> Optional[tuple]:
+        """Best (row, score) among live entries, scored by cosine similarity in one matrix-vector product"""
+        if self.size == 0:
+            return None
+        scores = self.vectors[:self.size] @ vector
+        scores[self.created_at[:self.size] < min_created_at] = -1.0
+        row = int(np.argmax(scores))
+        return row, float(scores[row])
+
+
+@dataclass
+class SemanticMatch:
+    answer: str
+    score: float
+
+
+class SemanticCache:
+    """Profile-scoped answer cache matched by embedding similarity"""
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        threshold: Optional[float] = None,
+        max_entries_per_profile: Optional[int] = None,
+        max_profiles: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        shared: Optional[SharedState] = None
+    ):
+        self.shared = shared or shared_state
+        self.embedder = embedder or default_embedder()
+        self.threshold = settings.semantic_cache_threshold if threshold is None else threshold
+        self.max_entries_per_profile = max_entries_per_profile or settings.semantic_cache_max_entries_per_profile
+        self.max_profiles = max_profiles or settings.semantic_cache_max_profiles
+        self.ttl_seconds = ttl_seconds or settings.semantic_cache_ttl_seconds
+        self.enabled = settings.semantic_cache_enabled if enabled is None else enabled
+        self._indexes: Dict[CacheKey, _ProfileIndex] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(
+        profile_id: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> CacheKey:
+        """Key on the profile and the effective model and generation parameters"""
+        return CacheKey(
+            str(profile_id),
+            model or settings.default_model,
+            settings.temperature if temperature is None else temperature,
+            settings.max_tokens if max_tokens is None else max_tokens
+        )
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embedder.embed([text])[0]
+
+    async def aembed(self, text: str) -> np.ndarray:
+        """Embed without blocking the event loop when the embedder calls a provider"""
+        aembed = getattr(self.embedder, "aembed", None)
+        if aembed is None:
+            return self.embed(text)
+        return (await aembed([text]))[0]
+
+    def lookup(self, key: CacheKey, vector: np.ndarray) -> Optional[SemanticMatch]:
+        started = time.perf_counter()
+        with self._lock:
+            index = self._indexes.get(key)
+            found = index.search(vector, time.time() - self.ttl_seconds) if index is not None else None
+            match = None
+            if found is not None and found[1] >= self.threshold:
+                match = SemanticMatch(index.answers[found[0]], found[1])
+            if match is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.observe("semantic_cache.lookup", time.perf_counter() - started)
+        metrics.increment("semantic_cache.hit" if match is not None else "semantic_cache.miss")
+        return match
+
+    def generation(self, profile_id: str) -> int:
+        """Invalidation counter of a profile; pass it to ``store`` to drop answers computed from stale data"""
+        with self._lock:
+            return self._generations.get(profile_id, 0)
+
+    def store(self, key: CacheKey, vector: np.ndarray, answer: str, generation: Optional[int] = None):
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key.profile_id, 0):
+                return
+            index = self._indexes.pop(key, None)
+            if index is None:
+                index = _ProfileIndex.empty(self.max_entries_per_profile, vector.shape[0])
+            # 최근 사용한 프로필을 뒤로 보내 오래된 프로필부터 제거
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_profiles:
+                self._indexes.pop(next(iter(self._indexes)))
+            index.add(vector, answer, time.time())
+
+    def invalidate_profile(self, profile_id: str, generation: Optional[int] = None):
+        """Drop every cached answer of a profile (its data changed)"""
+        profile_id = str(profile_id)
+        with self._lock:
+            local = self._generations.get(profile_id, 0) + 1
+            self._generations[profile_id] = max(local, generation or 0)
+            self._drop_profile(profile_id)
+        metrics.increment("semantic_cache.invalidated")
+
+    async def ainvalidate_profile(self, profile_id: str):
+        """Invalidate the profile here and, in shared mode, in every other worker"""
+        generation = await self.shared.bump_profile_generation(str(profile_id))
+        self.invalidate_profile(profile_id, generation)
+
+    async def refresh(self, profile_id: str):
+        """Adopt invalidations made by other workers before a lookup (shared mode)"""
+        generation = await self.shared.profile_generation(profile_id)
+        if generation is None:
+            return
+        with self._lock:
+            if generation <= self._generations.get(profile_id, 0):
+                return
+            self._generations[profile_id] = generation
+            self._drop_profile(profile_id)
+        metrics.increment("semantic_cache.invalidated_remotely")
+
+    def _drop_profile(self, profile_id: str):
+        """Remove the profile's answers for every model and generation parameters (lock held)"""
+        for key in [key for key in self._indexes if key.profile_id == profile_id]:
+            del self._indexes[key]
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "profiles": len({key.profile_id for key in self._indexes}),
+                "indexes": len(self._indexes),
+                "entries": sum(index.size for index in self._indexes.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "threshold": self.threshold
+            }
+
+
+# 전역 시맨틱 캐시 인스턴스
+semantic_cache = SemanticCache()
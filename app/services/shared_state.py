@@ -0,0 +1,197 @@
+"""
+Cross-process shared state
+CHECKPOINT_SHARED=true로 여러 워커/노드가 같은 SQLite 파일을 쓸 때, 프로세스마다 따로 두면 어긋나는 상태를 공유합니다.
+
+- 프로필별 시맨틱 캐시 세대: 한 워커가 프로필 수정으로 캐시를 무효화하면 다른 워커도 다음 조회 전에 버림
+- 스레드 임대(lease): (scope, thread_id)별로 한 워커만 턴 또는 대화 압축의 상태 교체를 실행하도록 함.
+  쥐고 있는 동안 하트비트로 갱신되므로 CHECKPOINT_LEASE_SECONDS보다 긴 턴도 임대를 잃지 않음
+
+모든 조회/갱신은 이벤트 루프 밖의 스레드에서 실행됩니다. shared 모드가 아니면 아무 일도 하지 않습니다.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.utils.logging import get_logger
+from app.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile_generations (
+    profile_id TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS thread_leases (
+    scope TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (scope, thread_id)
+) WITHOUT ROWID;
+"""
+
+BUMP_GENERATION = """
+INSERT INTO profile_generations (profile_id, generation) VALUES (?, 1)
+ON CONFLICT (profile_id) DO UPDATE SET generation = generation + 1
+RETURNING generation
+"""
+
+# 만료되었거나 같은 소유자의 임대만 가져옴
+ACQUIRE_LEASE = """
+INSERT INTO thread_leases (scope, thread_id, owner, expires_at) VALUES (:scope, :thread_id, :owner, :expires_at)
+ON CONFLICT (scope, thread_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+WHERE thread_leases.expires_at < :now OR thread_leases.owner = excluded.owner
+"""
+
+
+class SharedState:
+    """State that every worker process sees, stored next to the checkpoints.
+
+    ``enabled`` follows ``CHECKPOINT_SHARED``; when it is off every method is
+    a no-op, so single-process deployments never touch the database.
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: Optional[bool] = None):
+        self.enabled = settings.checkpoint_shared if enabled is None else enabled
+        self.path = path or settings.checkpoint_sqlite_path
+        self.lease_seconds = settings.checkpoint_lease_seconds
+        self.poll_interval = settings.checkpoint_lease_poll_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.lease_waits = 0
+        self.leases_refused = 0
+        self.leases_lost = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    # 프로필 캐시 세대
+
+    def _profile_generation(self, profile_id: str) -> int:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT generation FROM profile_generations WHERE profile_id = ?", (profile_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def _bump_profile_generation(self, profile_id: str) -> int:
+        with self._lock:
+            return self._connection().execute(BUMP_GENERATION, (profile_id,)).fetchone()[0]
+
+    async def profile_generation(self, profile_id: str) -> Optional[int]:
+        """The profile's shared invalidation counter (``None`` when not shared)"""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._profile_generation, profile_id)
+
+    async def bump_profile_generation(self, profile_id: str) -> Optional[int]:
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._bump_profile_generation, profile_id)
+
+    # 스레드 임대
+
+    def _acquire(self, scope: str, thread_id: str, owner: str) -> bool:
+        now = time.time()
+        params = {
+            "scope": scope,
+            "thread_id": thread_id,
+            "owner": owner,
+            "expires_at": now + self.lease_seconds,
+            "now": now
+        }
+        with self._lock:
+            return self._connection().execute(ACQUIRE_LEASE, params).rowcount == 1
+
+    def _renew(self, scope: str, thread_id: str, owner: str) -> bool:
+        with self._lock:
+            return self._connection().execute(
+                "UPDATE thread_leases SET expires_at = ? WHERE scope = ? AND thread_id = ? AND owner = ?",
+                (time.time() + self.lease_seconds, scope, thread_id, owner)
+            ).rowcount == 1
+
+    def _release(self, scope: str, thread_id: str, owner: str):
+        with self._lock:
+            self._connection().execute(
+                "DELETE FROM thread_leases WHERE scope = ? AND thread_id = ? AND owner = ?", (scope, thread_id, owner)
+            )
+
+    async def _heartbeat(self, scope: str, thread_id: str, owner: str):
+        """Renew a held lease every third of its lifetime until it is released"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                renewed = await asyncio.to_thread(self._renew, scope, thread_id, owner)
+            except Exception as e:
+                logger.warning(f"Failed to renew the lease on {scope}:{thread_id}: {e}")
+                continue
+            if not renewed:
+                # 갱신 전에 만료되어 다른 워커가 가져감
+                self.leases_lost += 1
+                metrics.increment("shared_state.lease_lost")
+                logger.warning(f"Lost the lease on {scope}:{thread_id} to another worker")
+                return
+
+    @asynccontextmanager
+    async def lease(self, scope: str, thread_id: str, wait: bool = True):
+        """Hold the thread of a graph across processes; yields whether the lease was taken.
+
+        With ``wait`` the caller polls until the holder releases it or its
+        lease (``CHECKPOINT_LEASE_SECONDS``) expires; otherwise it yields
+        ``False`` right away when another process holds the thread. A held
+        lease is renewed in the background until the block exits.
+        """
+        if not self.enabled:
+            yield True
+            return
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        acquired = await asyncio.to_thread(self._acquire, scope, thread_id, owner)
+        while not acquired and wait:
+            self.lease_waits += 1
+            metrics.increment("shared_state.lease_wait")
+            await asyncio.sleep(self.poll_interval)
+            acquired = await asyncio.to_thread(self._acquire, scope, thread_id, owner)
+        if not acquired:
+            self.leases_refused += 1
+            yield False
+            return
+        heartbeat = asyncio.create_task(self._heartbeat(scope, thread_id, owner))
+        try:
+            yield True
+        finally:
+            heartbeat.cancel()
+            await asyncio.shield(asyncio.to_thread(self._release, scope, thread_id, owner))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "lease_waits": self.lease_waits,
+            "leases_refused": self.leases_refused,
+            "leases_lost": self.leases_lost
+        }
+
+
+# 전역 공유 상태 인스턴스
+shared_state = SharedState()
@@ -0,0 +1,580 @@
+"""
+Durable SQLite checkpointer
+BoundedMemorySaver를 읽기 캐시로 사용하고, 모든 변경을 SQLite(WAL)에 write-behind 방식으로 기록합니다.
+턴 경로에서는 메모리 갱신과 큐 적재만 일어나며, 전용 쓰기 스레드가 모인 작업을 한 트랜잭션으로 커밋합니다.
+메모리에 없는 대화(재시작, 축출 이후)는 이벤트 루프 밖에서 디스크로부터 다시 읽어 옵니다.
+shared 모드에서는 여러 워커/노드가 같은 파일을 쓰므로, 턴이 끝날 때 커밋하고 읽을 때마다
+캐시된 대화의 최신 체크포인트가 디스크와 같은지 확인합니다.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict, defaultdict
+from itertools import groupby
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+
+from app.core.config import settings
+from app.services.checkpointer import BlobKey, BoundedMemorySaver, _typed_size
+from app.utils.logging import get_logger
+from app.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    scope TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (scope, thread_id, checkpoint_ns, checkpoint_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS blobs (
+    scope TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (scope, thread_id, checkpoint_ns, channel, version)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS writes (
+    scope TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (scope, thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS messages (
+    scope TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (scope, thread_id, digest)
+) WITHOUT ROWID;
+"""
+
+# 작업 종류별 SQL (같은 종류가 연속되면 executemany 한 번으로 실행)
+_STATEMENTS: Dict[str, List[str]] = {
+    "checkpoint": [
+        "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    ],
+    "blob": [
+        "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?)"
+    ],
+    "write": [
+        "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    ],
+    "message": [
+        "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?)"
+    ],
+    "drop_checkpoint": [
+        "DELETE FROM checkpoints WHERE scope = ? AND thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+        "DELETE FROM writes WHERE scope = ? AND thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+    ],
+    "drop_blob": [
+        "DELETE FROM blobs WHERE scope = ? AND thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?"
+    ],
+    "drop_message": [
+        "DELETE FROM messages WHERE scope = ? AND thread_id = ? AND digest = ?"
+    ],
+    "drop_thread": [
+        "DELETE FROM checkpoints WHERE scope = ? AND thread_id = ?",
+        "DELETE FROM blobs WHERE scope = ? AND thread_id = ?",
+        "DELETE FROM writes WHERE scope = ? AND thread_id = ?",
+        "DELETE FROM messages WHERE scope = ? AND thread_id = ?"
+    ]
+}
+
+# 압축된 값의 타입 접두사
+_COMPRESSED = "z:"
+
+# 디스크에 없음이 확인된 대화를 기억하는 개수 (새 대화의 첫 턴에서 반복 조회 방지)
+_ABSENT_CACHE_SIZE = 1024
+
+Op = Tuple[str, str, tuple]
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SQLiteSaver(BoundedMemorySaver):
+    """Checkpointer that persists every thread to a SQLite database.
+
+    Reads are served from the bounded in-memory cache. Writes update the
+    cache and queue the serialized rows; a writer thread commits the queue in
+    one transaction once ``flush_max_batch`` operations are pending or
+    ``flush_interval`` seconds after the first one, so a crash loses at most
+    that window. Cache limits (LRU, bytes, TTL) only drop threads from memory;
+    the database keeps them until ``delete_thread``. Pruned checkpoints,
+    blobs and no longer referenced pooled messages are deleted from the
+    database as well.
+
+    ``scope`` separates graphs that share a database file.
+
+    With ``shared`` several processes use the same database: a finished run
+    is committed before the turn returns (``acomplete_run``), and every read
+    compares the cached thread's latest checkpoint id with the database,
+    reloading the thread when another process has moved it on.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        scope: str = "chat",
+        flush_interval: Optional[float] = None,
+        flush_max_batch: Optional[int] = None,
+        compress_min_bytes: Optional[int] = None,
+        shared: Optional[bool] = None,
+        **kwargs: Any
+    ):
+        super().__init__(scope=scope, **kwargs)
+        self.path = path or settings.checkpoint_sqlite_path
+        self.flush_interval = settings.checkpoint_flush_interval if flush_interval is None else flush_interval
+        self.flush_max_batch = max(flush_max_batch or settings.checkpoint_flush_max_batch, 1)
+        self.compress_min_bytes = (
+            settings.checkpoint_compress_min_bytes if compress_min_bytes is None else compress_min_bytes
+        )
+        self.shared = settings.checkpoint_shared if shared is None else shared
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._write_conn = _connect(self.path)
+        self._write_conn.executescript(SCHEMA)
+        self._read_conn = _connect(self.path)
+        self._read_lock = threading.Lock()
+
+        self._queue: List[Op] = []
+        self._cond = threading.Condition()
+        self._pending: Counter = Counter()
+        self._enqueued = 0
+        self._committed = 0
+        self._flush_requested = False
+        self._closed = False
+        self._absent: "OrderedDict[str, None]" = OrderedDict()
+        self.batches = 0
+        self.write_failures = 0
+        self.loads = 0
+        self.invalidations = 0
+        self.bytes_written = 0
+        self.bytes_compressed = 0
+
+        self._writer = threading.Thread(target=self._run_writer, name=f"checkpoint-writer-{scope}", daemon=True)
+        self._writer.start()
+
+    # 직렬화
+
+    def _encode(self, typed: Tuple[str, bytes]) -> Tuple[str, bytes]:
+        type_, data = typed
+        self.bytes_written += len(data)
+        if self.compress_min_bytes > 0 and len(data) >= self.compress_min_bytes:
+            compressed = zlib.compress(data, 1)
+            if len(compressed) < len(data):
+                self.bytes_compressed += len(data) - len(compressed)
+                return _COMPRESSED + type_, compressed
+        return type_, data
+
+    @staticmethod
+    def _decode(type_: str, data: bytes) -> Tuple[str, bytes]:
+        if type_.startswith(_COMPRESSED):
+            return type_[len(_COMPRESSED):], zlib.decompress(data)
+        return type_, bytes(data)
+
+    def _row(self, kind: str, params: tuple) -> tuple:
+        if kind == "checkpoint":
+            thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint, metadata = params
+            return (
+                self.scope, thread_id, checkpoint_ns, checkpoint_id, parent_id,
+                *self._encode(checkpoint), *self._encode(metadata)
+            )
+        if kind == "blob":
+            thread_id, checkpoint_ns, channel, version, value = params
+            return (self.scope, thread_id, checkpoint_ns, channel, str(version), *self._encode(value))
+        if kind == "write":
+            thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, value, task_path = params
+            return (
+                self.scope, thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel,
+                *self._encode(value), task_path
+            )
+        if kind == "message":
+            thread_id, digest, value = params
+            return (self.scope, thread_id, digest, *self._encode(value))
+        if kind == "drop_blob":
+            thread_id, checkpoint_ns, channel, version = params
+            return (self.scope, thread_id, checkpoint_ns, channel, str(version))
+        return (self.scope, *params)
+
+    # write-behind 큐
+
+    def _enqueue(self, thread_id: str, ops: List[Tuple[str, tuple]]):
+        if not ops:
+            return
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("checkpointer is closed")
+            self._queue.extend((thread_id, kind, params) for kind, params in ops)
+            self._pending[thread_id] += len(ops)
+            self._enqueued += len(ops)
+            if len(self._queue) >= self.flush_max_batch:
+                self._cond.notify_all()
+            elif len(self._queue) == len(ops):
+                # 비어 있던 큐에 첫 작업이 들어옴: 쓰기 스레드가 flush_interval 타이머를 시작
+                self._cond.notify_all()
+
+    def _run_writer(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._queue) < self.flush_max_batch and not (self._flush_requested or self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._queue = self._queue, []
+                self._flush_requested = False
+
+            self._commit(batch)
+
+            with self._cond:
+                self._committed += len(batch)
+                self._pending.subtract(thread_id for thread_id, _, _ in batch)
+                self._pending += Counter()
+                self._cond.notify_all()
+
+    def _commit(self, batch: List[Op]):
+        started = time.perf_counter()
+        try:
+            self._write_conn.execute("BEGIN IMMEDIATE")
+            for kind, group in groupby(batch, key=lambda op: op[1]):
+                rows = [self._row(kind, params) for _, _, params in group]
+                for statement in _STATEMENTS[kind]:
+                    self._write_conn.executemany(statement, rows)
+            self._write_conn.execute("COMMIT")
+            self.batches += 1
+            metrics.observe("checkpoint.sqlite.commit", time.perf_counter() - started)
+        except Exception as e:
+            # 메모리 캐시에는 상태가 남아 있으므로 서비스는 계속되고, 이 배치의 영속화만 실패
+            self.write_failures += 1
+            metrics.increment("checkpoint.sqlite.write_failed")
+            logger.error(f"Failed to persist {len(batch)} checkpoint operations: {e!r}")
+            if self._write_conn.in_transaction:
+                self._write_conn.execute("ROLLBACK")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is committed"""
+        with self._cond:
+            target = self._enqueued
+            if self._committed >= target:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._committed >= target, timeout)
+
+    async def aflush(self, timeout: Optional[float] = None) -> bool:
+        return await asyncio.to_thread(self.flush, timeout)
+
+    def close(self):
+        """Commit the queue and close the database (application shutdown)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._write_conn.close()
+        with self._read_lock:
+            self._read_conn.close()
+
+    async def aclose(self):
+        await asyncio.to_thread(self.close)
+
+    # 디스크에서 대화 불러오기
+
+    def _read_thread(self, thread_id: str) -> Tuple[list, list, list, list]:
+        with self._cond:
+            pending = self._pending[thread_id] > 0
+        if pending:
+            self.flush()
+        with self._read_lock:
+            checkpoints = self._read_conn.execute(
+                "SELECT checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata "
+                "FROM checkpoints WHERE scope = ? AND thread_id = ? ORDER BY checkpoint_ns, checkpoint_id DESC",
+                (self.scope, thread_id)
+            ).fetchall()
+            if not checkpoints:
+                return [], [], [], []
+            blobs = self._read_conn.execute(
+                "SELECT checkpoint_ns, channel, version, type, value FROM blobs WHERE scope = ? AND thread_id = ?",
+                (self.scope, thread_id)
+            ).fetchall()
+            writes = self._read_conn.execute(
+                "SELECT checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path "
+                "FROM writes WHERE scope = ? AND thread_id = ?",
+                (self.scope, thread_id)
+            ).fetchall()
+            messages = self._read_conn.execute(
+                "SELECT digest, type, value FROM messages WHERE scope = ? AND thread_id = ?",
+                (self.scope, thread_id)
+            ).fetchall()
+        return checkpoints, blobs, writes, messages
+
+    def _restore(self, thread_id: str, checkpoints: list, blobs: list, writes: list, messages: list):
+        """Load a thread's latest checkpoints into the memory cache (caller holds the lock).
+
+        Rows beyond ``keep_checkpoints`` (left by a larger setting or by a
+        worker that has not pruned yet) are deleted together with the blobs
+        and pooled messages only they referenced, in one transaction, so the
+        database never keeps a checkpoint whose messages were dropped.
+        """
+        kept: Dict[str, int] = defaultdict(int)
+        referenced: Dict[Tuple[str, str, str], Any] = {}
+        ops: List[Tuple[str, tuple]] = []
+        for checkpoint_ns, checkpoint_id, parent_id, type_, data, metadata_type, metadata in checkpoints:
+            if kept[checkpoint_ns] >= self.keep_checkpoints:
+                ops.append(("drop_checkpoint", (thread_id, checkpoint_ns, checkpoint_id)))
+                self.pruned_checkpoints += 1
+                continue
+            kept[checkpoint_ns] += 1
+            checkpoint = self._decode(type_, data)
+            stored_metadata = self._decode(metadata_type, metadata)
+            self.storage[thread_id][checkpoint_ns][checkpoint_id] = (checkpoint, stored_metadata, parent_id)
+            self._account(thread_id, _typed_size(checkpoint) + _typed_size(stored_metadata))
+            channel_versions = dict(self.serde.loads_typed(checkpoint)["channel_versions"])
+            self._versions[thread_id][(checkpoint_ns, checkpoint_id)] = channel_versions
+            for channel, version in channel_versions.items():
+                referenced[(checkpoint_ns, channel, str(version))] = version
+
+        # 메시지 풀을 먼저 채우고, 남길 blob이 참조하는 메시지만 유지
+        pool = self._message_pool[thread_id]
+        for digest, type_, data in messages:
+            pool[bytes(digest)] = [self._decode(type_, data), 0]
+        for checkpoint_ns, channel, version, type_, data in blobs:
+            if (checkpoint_ns, channel, version) not in referenced:
+                ops.append(("drop_blob", (thread_id, checkpoint_ns, channel, version)))
+                continue
+            key = (thread_id, checkpoint_ns, channel, referenced[(checkpoint_ns, channel, version)])
+            self.blobs[key] = self._decode(type_, data)
+            self._thread_blobs[thread_id].add(key)
+            self._add_refs(thread_id, self.blobs[key])
+        for digest, entry in list(pool.items()):
+            if entry[1] == 0:
+                del pool[digest]
+                ops.append(("drop_message", (thread_id, digest)))
+            else:
+                self._account(thread_id, _typed_size(entry[0]))
+        self._enqueue(thread_id, ops)
+
+        for checkpoint_ns, checkpoint_id, task_id, idx, channel, type_, data, task_path in writes:
+            if (checkpoint_ns, checkpoint_id) not in self._versions[thread_id]:
+                continue
+            key = (thread_id, checkpoint_ns, checkpoint_id)
+            value = self._decode(type_, data)
+            self.writes[key][(task_id, idx)] = (task_id, channel, value, task_path)
+            self._thread_writes[thread_id].add(key)
+            self._account(thread_id, _typed_size(value))
+
+        self._touch(thread_id)
+        self._evict(keep=thread_id)
+
+    def _unload(self, thread_id: str):
+        # 캐시에서만 내림: 데이터베이스에는 남아 있으므로 삭제로 알리지 않음
+        self._drop_thread(thread_id)
+
+    def _is_current(self, thread_id: str) -> bool:
+        """Whether the cached copy of a thread is up to date with the database (shared mode)"""
+        with self._cond:
+            if self._pending[thread_id] > 0:
+                # 아직 커밋되지 않은 이 프로세스의 쓰기가 가장 최신 상태
+                return True
+        with self._read_lock:
+            latest = self._read_conn.execute(
+                "SELECT MAX(checkpoint_id) FROM checkpoints WHERE scope = ? AND thread_id = ? AND checkpoint_ns = ''",
+                (self.scope, thread_id)
+            ).fetchone()[0]
+        with self._lock:
+            checkpoints = self.storage.get(thread_id, {}).get("")
+            if latest == (max(checkpoints) if checkpoints else None):
+                return True
+            if thread_id in self.storage:
+                # 다른 프로세스가 대화를 진행(또는 삭제)함: 캐시를 버리고 다시 읽음
+                self._drop_thread(thread_id)
+                self.invalidations += 1
+                metrics.increment("checkpoint.sqlite.invalidated")
+            self._absent.pop(thread_id, None)
+            return False
+
+    def _is_cached(self, thread_id: str) -> bool:
+        with self._lock:
+            return thread_id in self.storage or thread_id in self._absent
+
+    def _ensure_loaded(self, thread_id: str):
+        if self.shared:
+            if self._is_current(thread_id):
+                return
+        elif self._is_cached(thread_id):
+            return
+        rows = self._read_thread(thread_id)
+        with self._lock:
+            if thread_id in self.storage:
+                return
+            if not rows[0]:
+                self._absent[thread_id] = None
+                while len(self._absent) > _ABSENT_CACHE_SIZE:
+                    self._absent.popitem(last=False)
+                return
+            self._restore(thread_id, *rows)
+            self.loads += 1
+            metrics.increment("checkpoint.sqlite.loaded")
+
+    async def _aensure_loaded(self, thread_id: str):
+        if not self.shared and self._is_cached(thread_id):
+            return
+        await asyncio.to_thread(self._ensure_loaded, thread_id)
+
+    # BoundedMemorySaver 훅: 메모리에서 정리된 항목을 디스크에서도 삭제
+
+    def _checkpoint_pruned(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str):
+        self._enqueue(thread_id, [("drop_checkpoint", (thread_id, checkpoint_ns, checkpoint_id))])
+
+    def _blob_pruned(self, key: BlobKey):
+        self._enqueue(key[0], [("drop_blob", key)])
+
+    def _message_stored(self, thread_id: str, digest: bytes, typed: Tuple[str, bytes]):
+        self._enqueue(thread_id, [("message", (thread_id, digest, typed))])
+
+    def _message_released(self, thread_id: str, digest: bytes):
+        self._enqueue(thread_id, [("drop_message", (thread_id, digest))])
+
+    # BaseCheckpointSaver
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        self._ensure_loaded(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        if config is not None:
+            self._ensure_loaded(config["configurable"]["thread_id"])
+        return super().list(config, filter=filter, before=before, limit=limit)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._absent.pop(thread_id, None)
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            stored, stored_metadata, parent_id = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            ops: List[Tuple[str, tuple]] = [
+                ("blob", (thread_id, checkpoint_ns, channel, version, self.blobs[(thread_id, checkpoint_ns, channel, version)]))
+                for channel, version in new_versions.items()
+            ]
+            ops.append(("checkpoint", (thread_id, checkpoint_ns, checkpoint["id"], parent_id, stored, stored_metadata)))
+            self._enqueue(thread_id, ops)
+            return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            stored = self.writes.get(key, {})
+            ops = [
+                ("write", (*key, write_task_id, idx, channel, value, write_task_path))
+                for (write_task_id, idx), (_, channel, value, write_task_path) in stored.items()
+                if write_task_id == task_id
+            ]
+            self._enqueue(thread_id, ops)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._absent.pop(thread_id, None)
+            self._enqueue(thread_id, [("drop_thread", (thread_id,))])
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        await self._aensure_loaded(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        if config is not None:
+            await self._aensure_loaded(config["configurable"]["thread_id"])
+        for item in super().list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def acomplete_run(self, thread_id: str):
+        self.complete_run(thread_id)
+        if self.shared:
+            # 다음 턴이 다른 프로세스로 가도 이어지도록 응답을 마치기 전에 커밋
+            await self.aflush()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._cond:
+            queued = len(self._queue)
+        stats.update({
+            "backend": "sqlite",
+            "path": self.path,
+            "scope": self.scope,
+            "shared": self.shared,
+            "queued_ops": queued,
+            "committed_ops": self._committed,
+            "batches": self.batches,
+            "write_failures": self.write_failures,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+            "bytes_written": self.bytes_written,
+            "bytes_saved_by_compression": self.bytes_compressed
+        })
+        return stats
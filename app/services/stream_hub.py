@@ -0,0 +1,300 @@
+"""
+Live stream registry with Last-Event-ID replay
+생성 중인 스트림을 연결과 분리하여, 재연결한 클라이언트가 놓친 프레임을 받고 이어서 구독할 수 있게 합니다.
+"""
+
+import asyncio
+import itertools
+import time
+from contextlib import aclosing
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.models.chat import StreamChunk
+from app.utils.logging import get_logger
+from app.utils.metrics import metrics
+from app.utils.streaming import StreamWriter
+
+logger = get_logger(__name__)
+
+StreamEvent = Tuple[int, StreamChunk]
+
+
+class StreamCapacityError(RuntimeError):
+    """Raised when ``STREAM_MAX_LIVE_STREAMS`` generations are already running"""
+
+
+class LiveStream:
+    """One generation whose frames are buffered for (re)attaching subscribers.
+
+    The source is pumped through a StreamWriter by a task that does not depend
+    on any HTTP connection. Every coalesced frame gets a monotonically
+    increasing event id and is kept in a bounded buffer. When the last
+    subscriber detaches before the generation finished, the run is cancelled
+    after ``grace_seconds`` unless a client resumes in the meantime.
+
+    While subscribers are attached, the producer never drops a frame the
+    slowest of them has not read: with a full buffer it waits, which backs up
+    the StreamWriter queue and pauses the LLM stream. Without subscribers
+    (during the grace period) it keeps generating, so a client that resumes
+    after more than ``max_events`` frames can no longer be replayed.
+    """
+    
+    def __init__(
+        self,
+        key: str,
+        message: str,
+        source: AsyncIterator[StreamChunk],
+        max_events: int,
+        grace_seconds: float
+    ):
+        self.key = key
+        self.message = message
+        self.grace_seconds = grace_seconds
+        self.events: Deque[StreamEvent] = deque(maxlen=max_events)
+        self.last_id = 0
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Event()
+        self._consumed = asyncio.Event()
+        self._cursors: Dict[int, int] = {}
+        self._tokens = itertools.count()
+        self._subscribers = 0
+        self._cancel_handle: Optional[asyncio.TimerHandle] = None
+        self.task = asyncio.create_task(self._run(source))
+    
+    async def _run(self, source: AsyncIterator[StreamChunk]):
+        try:
+            async with aclosing(StreamWriter(source)) as writer:
+                async for chunk in writer:
+                    await self._append(chunk)
+        except Exception as e:
+            # 구독자에게 끝을 알리는 오류 프레임으로 바꾸고 태스크는 정상 종료 (회수되지 않는 태스크 예외 방지)
+            logger.error(f"Stream {self.key} failed: {e!r}", exc_info=True)
+            metrics.increment("stream.failed")
+            await self._append(StreamChunk(
+                content="죄송합니다. 응답을 생성하는 중 오류가 발생했습니다.",
+                conversation_id=self._conversation_id(),
+                is_final=True,
+                chunk_type="error",
+                metadata={"error": "generation_failed"}
+            ))
+        finally:
+            self.done = True
+            self.finished_at = time.monotonic()
+            if self._cancel_handle is not None:
+                self._cancel_handle.cancel()
+            self._notify()
+    
+    async def _append(self, chunk: StreamChunk):
+        await self._wait_for_subscribers()
+        self.last_id += 1
+        self.events.append((self.last_id, chunk))
+        self._notify()
+    
+    def _conversation_id(self) -> str:
+        return self.events[0][1].conversation_id if self.events else self.key.split(":", 1)[-1]
+    
+    def _notify(self):
+        """Wake every subscriber waiting for new frames"""
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    def _lagging(self) -> bool:
+        """Whether appending a frame would drop one an attached subscriber has not read"""
+        if not self._cursors or len(self.events) < self.events.maxlen:
+            return False
+        return min(self._cursors.values()) < self.events[0][0]
+    
+    async def _wait_for_subscribers(self):
+        """Backpressure: wait until the slowest attached subscriber read the oldest frame"""
+        while self._lagging():
+            metrics.increment("stream.backpressure_waits")
+            consumed = self._consumed
+            await consumed.wait()
+    
+    def _advance(self, token: int, cursor: Optional[int]):
+        """Record a subscriber's progress (``None`` detaches it) and wake a waiting producer"""
+        if cursor is None:
+            self._cursors.pop(token, None)
+        else:
+            self._cursors[token] = cursor
+        self._consumed.set()
+        self._consumed = asyncio.Event()
+    
+    def can_resume(self, last_event_id: int) -> bool:
+        """Whether every frame after ``last_event_id`` is still buffered"""
+        if last_event_id > self.last_id:
+            return False
+        first_id = self.events[0][0] if self.events else self.last_id + 1
+        return last_event_id >= first_id - 1
+    
+    def cancel(self):
+        """Cancel the generation (no-op once finished)"""
+        if not self.task.done():
+            self.task.cancel()
+    
+    def _attach(self):
+        self._subscribers += 1
+        if self._cancel_handle is not None:
+            self._cancel_handle.cancel()
+            self._cancel_handle = None
+    
+    def _detach(self):
+        self._subscribers -= 1
+        if self._subscribers or self.done:
+            return
+        if self.grace_seconds <= 0:
+            self.cancel()
+        else:
+            loop = asyncio.get_running_loop()
+            self._cancel_handle = loop.call_later(self.grace_seconds, self.cancel)
+    
+    async def subscribe(
+        self,
+        last_event_id: int = 0,
+        idle_timeout: Optional[float] = None
+    ) -> AsyncIterator[Optional[StreamEvent]]:
+        """Yield buffered frames after ``last_event_id``, then live frames until the end.
+
+        ``None`` is yielded after every ``idle_timeout`` seconds without frames.
+        When frames after the cursor are no longer buffered, a final
+        ``replay_gap`` error frame is yielded instead of skipping ahead, so the
+        client can request the answer again.
+        """
+        token = next(self._tokens)
+        cursor = last_event_id
+        self._attach()
+        self._advance(token, cursor)
+        try:
+            while True:
+                first_id = self.events[0][0] if self.events else self.last_id + 1
+                if cursor < first_id - 1:
+                    metrics.increment("stream.replay_gap")
+                    yield cursor, self._gap_chunk(cursor, first_id)
+                    return
+                pending = list(itertools.islice(self.events, cursor - first_id + 1, None))
+                for event in pending:
+                    yield event
+                    cursor = event[0]
+                    self._advance(token, cursor)
+                if pending:
+                    continue
+                if self.done:
+                    return
+                
+                changed = self._changed
+                try:
+                    await asyncio.wait_for(changed.wait(), idle_timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._advance(token, None)
+            self._detach()
+    
+    def _gap_chunk(self, cursor: int, first_id: int) -> StreamChunk:
+        return StreamChunk(
+            content="",
+            conversation_id=self._conversation_id(),
+            is_final=True,
+            chunk_type="error",
+            metadata={"error": "replay_gap", "last_event_id": cursor, "first_buffered_id": first_id}
+        )
+
+
+class StreamHub:
+    """Per-conversation registry of live and recently finished streams.
+
+    At most ``max_live`` generations run at once; further starts are refused
+    with ``StreamCapacityError`` instead of growing the registry without bound.
+    """
+    
+    def __init__(
+        self,
+        max_streams: Optional[int] = None,
+        max_events: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        grace_seconds: Optional[float] = None,
+        max_live: Optional[int] = None
+    ):
+        self.max_streams = max_streams or settings.stream_replay_max_streams
+        self.max_live = max_live or settings.stream_max_live_streams
+        self.max_events = max_events or settings.stream_replay_max_events
+        self.ttl_seconds = settings.stream_replay_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.grace_seconds = (
+            settings.stream_resume_grace_seconds if grace_seconds is None else grace_seconds
+        )
+        self._streams: "OrderedDict[str, LiveStream]" = OrderedDict()
+        self.rejected = 0
+    
+    def _live_count(self, exclude: Optional[str] = None) -> int:
+        return sum(1 for key, live in self._streams.items() if not live.done and key != exclude)
+    
+    def start(self, key: str, message: str, source: AsyncIterator[StreamChunk]) -> LiveStream:
+        """Start a generation and register it under ``key``, cancelling the one it replaces.
+
+        Raises ``StreamCapacityError`` when ``max_live`` other generations are running.
+        """
+        self._evict()
+        # 교체될 스트림은 곧 취소되므로 세지 않음
+        if self._live_count(exclude=key) >= self.max_live:
+            self.rejected += 1
+            metrics.increment("stream.rejected")
+            raise StreamCapacityError(f"Too many live streams ({self.max_live}), retry later")
+        replaced = self._streams.pop(key, None)
+        if replaced is not None and not replaced.done:
+            metrics.increment("stream.replaced")
+            replaced.cancel()
+        live = LiveStream(key, message, source, self.max_events, self.grace_seconds)
+        self._streams[key] = live
+        return live
+    
+    def resume(self, key: str, message: str, last_event_id: int) -> Optional[LiveStream]:
+        """Return the stream a reconnecting client can resume, if any.
+
+        The stream must belong to the same message and still hold every frame
+        after ``last_event_id``.
+        """
+        self._evict()
+        live = self._streams.get(key)
+        if live is None or live.message != message or not live.can_resume(last_event_id):
+            metrics.increment("stream.resume_miss")
+            return None
+        metrics.increment("stream.resumed")
+        logger.info(f"Resuming stream {key} after event {last_event_id}")
+        return live
+    
+    def _evict(self):
+        """Drop expired streams, then the oldest finished ones beyond ``max_streams``.
+
+        Running generations are never evicted: when every slot holds one, the
+        registry grows past ``max_streams`` until they finish.
+        """
+        now = time.monotonic()
+        for key in [
+            key for key, live in self._streams.items()
+            if live.done and now - live.finished_at > self.ttl_seconds
+        ]:
+            del self._streams[key]
+        
+        while len(self._streams) >= self.max_streams:
+            key = next((key for key, live in self._streams.items() if live.done), None)
+            if key is None:
+                metrics.increment("stream.registry_over_capacity")
+                return
+            del self._streams[key]
+    
+    def stats(self) -> Dict[str, int]:
+        """Number of registered and still generating streams"""
+        return {
+            "streams": len(self._streams),
+            "live": self._live_count(),
+            "max_live": self.max_live,
+            "rejected": self.rejected,
+            "buffered_events": sum(len(live.events) for live in self._streams.values()),
+        }
+
+
+# 전역 스트림 허브 인스턴스
+stream_hub = StreamHub()
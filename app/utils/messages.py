@@ -0,0 +1,23 @@
+"""LangChain message helpers"""
+
+from typing import Any
+
+
+def message_text(content: Any) -> str:
+    """Extract plain text from a LangChain message content.
+
+    OpenAI chunks carry a plain string while Anthropic chunks carry a list of
+    content blocks (``{"type": "text", "text": ...}``, ``tool_use`` ...).
+    Only the text parts are returned.
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for block in content:
+            if isinstance(block, str):
+                parts.append(block)
+            elif isinstance(block, dict) and block.get("type") == "text":
+                parts.append(block.get("text", ""))
+        return "".join(parts)
+    return ""
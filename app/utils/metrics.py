@@ -0,0 +1,47 @@
+"""In-process counters and timings"""
+
+import threading
+from collections import defaultdict
+from typing import Any, Dict
+
+
+class Metrics:
+    """Minimal thread-safe metrics registry exposed through the health endpoints"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._timings: Dict[str, Dict[str, float]] = {}
+    
+    def increment(self, name: str, value: int = 1) -> None:
+        """Increase a counter"""
+        with self._lock:
+            self._counters[name] += value
+    
+    def observe(self, name: str, value: float) -> None:
+        """Record one sample of a timing/size series (count, sum, max)"""
+        with self._lock:
+            series = self._timings.get(name)
+            if series is None:
+                series = self._timings[name] = {"count": 0, "sum": 0.0, "max": 0.0}
+            series["count"] += 1
+            series["sum"] += value
+            series["max"] = max(series["max"], value)
+    
+    def get(self, name: str) -> int:
+        """Current value of a counter"""
+        with self._lock:
+            return self._counters.get(name, 0)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of all counters and timing summaries"""
+        with self._lock:
+            timings = {
+                name: {**series, "avg": series["sum"] / series["count"]}
+                for name, series in self._timings.items()
+            }
+            return {"counters": dict(self._counters), "timings": timings}
+
+
+# Global metrics instance
+metrics = Metrics()
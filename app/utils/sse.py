@@ -0,0 +1,71 @@
+"""Server-Sent Events encoding for chat streams"""
+
+from json.encoder import encode_basestring
+from typing import Dict, Optional, Tuple
+
+from app.models.chat import StreamChunk
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    # nginx buffers proxied responses unless told otherwise
+    "X-Accel-Buffering": "no",
+}
+
+
+class SSEEncoder:
+    """Encode StreamChunk frames as ``text/event-stream`` events.
+
+    Every event carries an ``id:`` (monotonic per stream unless one is given)
+    and an ``event:`` named after the chunk type. The JSON payload of plain
+    chunks is built from a pre-serialized suffix per (conversation, chunk type,
+    final flag), so only the content string is encoded per frame. Chunks with
+    metadata fall back to ``model_dump_json``.
+    """
+    
+    HEARTBEAT = b": keep-alive\n\n"
+    
+    def __init__(self):
+        self._last_id = 0
+        self._suffixes: Dict[Tuple[str, bool, Optional[str]], str] = {}
+    
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+    
+    def _suffix(self, chunk: StreamChunk) -> str:
+        key = (chunk.conversation_id, chunk.is_final, chunk.chunk_type)
+        suffix = self._suffixes.get(key)
+        if suffix is None:
+            chunk_type = "null" if chunk.chunk_type is None else encode_basestring(chunk.chunk_type)
+            suffix = (
+                f',"conversation_id":{encode_basestring(chunk.conversation_id)}'
+                f',"is_final":{"true" if chunk.is_final else "false"}'
+                f',"chunk_type":{chunk_type},"metadata":null}}'
+            )
+            self._suffixes[key] = suffix
+        return suffix
+    
+    def encode_data(self, chunk: StreamChunk) -> str:
+        """Serialize a chunk to the same JSON as ``chunk.model_dump_json()``"""
+        if chunk.metadata is not None:
+            return chunk.model_dump_json()
+        return f'{{"content":{encode_basestring(chunk.content)}{self._suffix(chunk)}'
+    
+    def encode(self, chunk: StreamChunk, event_id: Optional[int] = None) -> bytes:
+        """Encode one chunk as an SSE event"""
+        if event_id is None:
+            event_id = self._last_id + 1
+        self._last_id = event_id
+        event = chunk.chunk_type or "message"
+        return f"id: {event_id}\nevent: {event}\ndata: {self.encode_data(chunk)}\n\n".encode("utf-8")
+    
+    def heartbeat(self) -> bytes:
+        """Comment line that keeps idle connections and proxies open"""
+        return self.HEARTBEAT
+    
+    def done(self) -> bytes:
+        """End-of-stream signal"""
+        return b"event: done\ndata: [DONE]\n\n"
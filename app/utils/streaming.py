@@ -0,0 +1,153 @@
+"""Stream writer that coalesces StreamChunk deltas for the HTTP transport"""
+
+import asyncio
+from contextlib import suppress
+from typing import AsyncGenerator, AsyncIterator, List, Optional
+
+from app.core.config import settings
+from app.models.chat import StreamChunk
+from app.utils.logging import get_logger
+from app.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+_END = object()
+
+
+class StreamWriter:
+    """Coalesce token deltas between a chat stream and its consumer.
+
+    The source stream is pumped by a background task into a bounded queue.
+    The first delta is forwarded immediately; after that, frames are emitted
+    at most once per coalescing window and deltas that arrive in between are
+    merged, up to ``max_bytes`` per frame.
+
+    The consumer only pulls when it accepted the previous frame, so a slow
+    consumer fills the queue, which blocks the pump and pauses reading from
+    the LLM stream. While the queue is backed up, each frame carries as many
+    queued deltas as the byte budget allows.
+
+    When the consumer stops iterating before the source finished, the pump
+    task is cancelled, which cancels the LangGraph run and closes the provider
+    stream, and the cancellation is counted in ``stream.cancelled``. Use
+    ``aclosing(writer)`` so that happens as soon as the consumer leaves the
+    loop rather than when the iterator is garbage collected.
+    """
+    
+    def __init__(
+        self,
+        source: AsyncIterator[StreamChunk],
+        window_ms: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        queue_size: Optional[int] = None
+    ):
+        self.source = source
+        window = settings.stream_coalesce_window_ms if window_ms is None else window_ms
+        self.window = window / 1000
+        self.max_bytes = max_bytes or settings.stream_max_frame_bytes
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or settings.stream_queue_size)
+        self.cancelled = False
+        self._error: Optional[BaseException] = None
+        self._frames: Optional[AsyncGenerator[StreamChunk, None]] = None
+    
+    def __aiter__(self) -> AsyncIterator[StreamChunk]:
+        if self._frames is None:
+            self._frames = self._iterate()
+        return self._frames
+    
+    async def aclose(self):
+        """Stop iterating, cancelling the pump if the source is still running"""
+        if self._frames is not None:
+            await self._frames.aclose()
+            return
+        aclose = getattr(self.source, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    
+    async def _pump(self):
+        """Read the source stream into the queue"""
+        try:
+            async for chunk in self.source:
+                await self._queue.put(chunk)
+        except Exception as e:
+            self._error = e
+        finally:
+            aclose = getattr(self.source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        
+        # Not reached when the pump is cancelled, so a full queue cannot block it
+        await self._queue.put(_END)
+    
+    @staticmethod
+    def _can_merge(head: StreamChunk, chunk: StreamChunk) -> bool:
+        """Only plain content deltas of the same kind are merged"""
+        return (
+            not chunk.is_final
+            and chunk.metadata is None
+            and chunk.chunk_type == head.chunk_type
+            and chunk.conversation_id == head.conversation_id
+        )
+    
+    async def _next(self, timeout: float):
+        """Get the next queued item, waiting at most ``timeout`` seconds"""
+        try:
+            return self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        if timeout <= 0:
+            return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    async def _iterate(self) -> AsyncIterator[StreamChunk]:
+        loop = asyncio.get_running_loop()
+        pump = asyncio.create_task(self._pump())
+        pending = None
+        last_flush = float("-inf")
+        
+        try:
+            while True:
+                head = pending if pending is not None else await self._queue.get()
+                pending = None
+                if head is _END:
+                    break
+                
+                if head.is_final or head.metadata is not None:
+                    yield head
+                    last_flush = loop.time()
+                    continue
+                
+                # Merge deltas until the window closes or the frame is full
+                parts: List[str] = [head.content]
+                size = len(head.content.encode("utf-8"))
+                flush_at = last_flush + self.window
+                while size < self.max_bytes:
+                    item = await self._next(flush_at - loop.time())
+                    if item is None:
+                        break
+                    if item is _END or not self._can_merge(head, item):
+                        pending = item
+                        break
+                    parts.append(item.content)
+                    size += len(item.content.encode("utf-8"))
+                
+                if len(parts) > 1:
+                    head = head.model_copy(update={"content": "".join(parts)})
+                yield head
+                last_flush = loop.time()
+            
+            if self._error is not None:
+                raise self._error
+        finally:
+            if not pump.done():
+                self.cancelled = True
+                metrics.increment("stream.cancelled")
+                logger.info("Stream cancelled before the generation finished")
+                pump.cancel()
+            else:
+                metrics.increment("stream.completed")
+            with suppress(asyncio.CancelledError):
+                await pump
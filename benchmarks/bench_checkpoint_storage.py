@@ -0,0 +1,110 @@
+"""
+체크포인트 저장량 벤치마크
+도구 그래프처럼 턴마다 agent -> tools -> agent 단계를 거치는 그래프로, 체크포인터가 직렬화/보관하는 바이트를 비교합니다.
+
+- full: 단계마다 메시지 목록 전체를 다시 직렬화 (LangGraph 기본 방식)
+- delta: 메시지를 한 번만 직렬화해 메시지 풀에 두고, 체크포인트는 메시지 참조(digest) 목록만 저장
+- delta+prune: delta에 더해 실행이 끝나면 중간 체크포인트를 정리
+
+실행: python -m benchmarks.bench_checkpoint_storage [--threads 20] [--turns 20] [--tool-calls 2]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import Annotated, TypedDict
+
+from app.services.checkpointer import BoundedMemorySaver
+from app.services.sqlite_checkpointer import SQLiteSaver
+
+REPLY = "안녕하세요. 요청하신 내용을 정리해 드리겠습니다. " * 8
+TOOL_RESULT = '{"name": "홍길동", "skills": ["python", "fastapi", "langgraph"]} ' * 4
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+    calls: int
+
+
+def build_graph(saver, tool_calls: int):
+    async def agent(state: State):
+        calls = state.get("calls", 0)
+        if calls < tool_calls:
+            call = {"name": "get_profile_info", "args": {}, "id": f"call-{len(state['messages'])}"}
+            return {"messages": [AIMessage(content="", tool_calls=[call])], "calls": calls + 1}
+        return {"messages": [AIMessage(content=REPLY)], "calls": 0}
+
+    async def tools(state: State):
+        call = state["messages"][-1].tool_calls[0]
+        return {"messages": [ToolMessage(content=TOOL_RESULT, tool_call_id=call["id"])]}
+
+    def route(state: State):
+        return "tools" if state["messages"][-1].tool_calls else END
+
+    workflow = StateGraph(State)
+    workflow.add_node("agent", agent)
+    workflow.add_node("tools", tools)
+    workflow.set_entry_point("agent")
+    workflow.add_conditional_edges("agent", route)
+    workflow.add_edge("tools", "agent")
+    return workflow.compile(checkpointer=saver)
+
+
+async def run_turns(graph, saver, threads: int, turns: int):
+    latencies = []
+    for turn in range(turns):
+        for thread in range(threads):
+            config = {"configurable": {"thread_id": f"t{thread}"}}
+            started = time.perf_counter()
+            await graph.ainvoke({"messages": [HumanMessage(content=f"질문 {turn}")]}, config)
+            saver.complete_run(f"t{thread}")
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(name: str, saver, latencies, extra: str = ""):
+    stats = saver.stats()
+    print(f"{name:<12} written/turn={saver.bytes_stored / len(latencies) / 1024:7.1f}KB "
+          f"retained={stats['bytes'] // 1024:>6}KB checkpoints={stats['checkpoints']:>5} "
+          f"p50={statistics.median(latencies):6.3f}ms {extra}")
+
+
+async def main(threads: int, turns: int, tool_calls: int):
+    print(f"threads={threads} turns/thread={turns} tool_calls/turn={tool_calls}")
+    variants = {
+        "full": dict(delta_messages=False, prune_completed_runs=False),
+        "delta": dict(delta_messages=True, prune_completed_runs=False),
+        "delta+prune": dict(delta_messages=True, prune_completed_runs=True),
+    }
+    for name, options in variants.items():
+        saver = BoundedMemorySaver(keep_checkpoints=2 * tool_calls + 3, **options)
+        latencies = await run_turns(build_graph(saver, tool_calls), saver, threads, turns)
+        report(name, saver, latencies)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, options in (("sqlite-full", variants["full"]), ("sqlite-delta", variants["delta+prune"])):
+            path = os.path.join(directory, f"{name}.sqlite3")
+            saver = SQLiteSaver(path=path, keep_checkpoints=2 * tool_calls + 3, **options)
+            latencies = await run_turns(build_graph(saver, tool_calls), saver, threads, turns)
+            await saver.aflush()
+            stats = saver.stats()
+            await saver.aclose()
+            report(name, saver, latencies, f"ops={stats['committed_ops']} db={os.path.getsize(path) // 1024}KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--tool-calls", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(args.threads, args.turns, args.tool_calls))
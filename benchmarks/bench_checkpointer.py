@@ -0,0 +1,100 @@
+"""
+체크포인터 턴 오버헤드 벤치마크
+LLM 호출 없이 메시지를 하나씩 추가하는 그래프로, 턴마다 체크포인터가 더하는 지연을 비교합니다.
+
+- memory: LangGraph 기본 MemorySaver
+- bounded: BoundedMemorySaver (스레드/바이트 한도, 최근 체크포인트만 유지)
+- sqlite: SQLiteSaver (메모리 캐시 + WAL write-behind 배치 커밋)
+- sqlite-cold: 재시작 직후처럼 메모리 캐시가 빈 상태에서 대화를 디스크로부터 읽는 첫 턴
+
+실행: python -m benchmarks.bench_checkpointer [--threads 50] [--turns 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench")
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import Annotated, TypedDict
+
+from app.services.checkpointer import BoundedMemorySaver
+from app.services.sqlite_checkpointer import SQLiteSaver
+
+REPLY = "안녕하세요. 요청하신 내용을 정리해 드리겠습니다. " * 8
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build_graph(saver):
+    async def reply(state: State):
+        return {"messages": [AIMessage(content=REPLY)]}
+
+    workflow = StateGraph(State)
+    workflow.add_node("reply", reply)
+    workflow.set_entry_point("reply")
+    workflow.add_edge("reply", END)
+    return workflow.compile(checkpointer=saver)
+
+
+async def run_turns(graph, threads: int, turns: int, prefix: str = "t"):
+    latencies = []
+    for turn in range(turns):
+        for thread in range(threads):
+            config = {"configurable": {"thread_id": f"{prefix}{thread}"}}
+            started = time.perf_counter()
+            await graph.ainvoke({"messages": [HumanMessage(content=f"질문 {turn}")]}, config)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(name: str, latencies, extra: str = ""):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<12} turns={len(latencies):>5} mean={statistics.mean(latencies):7.3f}ms "
+          f"p50={statistics.median(latencies):7.3f}ms p95={p95:7.3f}ms {extra}")
+
+
+async def main(threads: int, turns: int):
+    print(f"threads={threads} turns/thread={turns}")
+    # 그래프 컴파일/첫 실행 비용 제외
+    await run_turns(build_graph(MemorySaver()), 1, 3, prefix="warmup")
+
+    report("memory", await run_turns(build_graph(MemorySaver()), threads, turns))
+    report("bounded", await run_turns(build_graph(BoundedMemorySaver()), threads, turns))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "checkpoints.sqlite3")
+        saver = SQLiteSaver(path=path)
+        latencies = await run_turns(build_graph(saver), threads, turns)
+        flush_started = time.perf_counter()
+        await saver.aflush()
+        flush_ms = (time.perf_counter() - flush_started) * 1000
+        stats = saver.stats()
+        await saver.aclose()
+        report(
+            "sqlite", latencies,
+            f"batches={stats['batches']} ops={stats['committed_ops']} final_flush={flush_ms:.1f}ms "
+            f"db={os.path.getsize(path) // 1024}KB compressed_saved={stats['bytes_saved_by_compression'] // 1024}KB"
+        )
+
+        restarted = SQLiteSaver(path=path)
+        report("sqlite-cold", await run_turns(build_graph(restarted), threads, 1), f"loads={restarted.loads}")
+        await restarted.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.threads, args.turns))
@@ -0,0 +1,148 @@
+"""
+LLM 클라이언트 재사용 벤치마크
+호출마다 ChatOpenAI와 HTTP 클라이언트를 새로 만드는 방식(콜드 연결)과
+LLMClientPool의 공유 클라이언트(웜 keep-alive 연결)의 호출 지연을 비교합니다.
+
+실제 TLS 핸드셰이크 비용이 드러나도록 자체 서명 인증서로 로컬 HTTPS의
+OpenAI 호환 스트리밍 서버를 띄워 측정합니다.
+
+실행: python -m benchmarks.bench_llm_client_reuse [--calls 50]
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench")
+
+import httpx
+import uvicorn
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+from app.core.config import settings
+from app.services.llm_clients import LLMClientPool
+
+MODEL = "gpt-4o-mini"
+
+fake_openai = FastAPI()
+
+
+@fake_openai.post("/v1/chat/completions")
+async def chat_completions():
+    async def events():
+        for index, token in enumerate(["안녕", "하세요", ""]):
+            delta = {"role": "assistant", "content": token} if token else {}
+            chunk = {
+                "id": "bench", "object": "chat.completion.chunk", "created": 0, "model": MODEL,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None if token else "stop"}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def self_signed_cert(directory: str):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+
+def start_server(port: int, cert_path: str, key_path: str) -> uvicorn.Server:
+    config = uvicorn.Config(
+        fake_openai, host="127.0.0.1", port=port, log_level="warning",
+        ssl_certfile=cert_path, ssl_keyfile=key_path,
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def cold_call(base_url: str, cert_path: str) -> float:
+    """기존 방식: 호출마다 클라이언트와 HTTP 연결을 새로 생성"""
+    start = time.perf_counter()
+    async with httpx.AsyncClient(verify=cert_path) as http_client:
+        llm = ChatOpenAI(
+            model=MODEL, base_url=base_url, openai_api_key="bench",
+            http_async_client=http_client, streaming=True,
+        )
+        await llm.ainvoke([HumanMessage(content="안녕")])
+    return time.perf_counter() - start
+
+
+async def pooled_call(pool: LLMClientPool, base_url: str) -> float:
+    """LLMClientPool: 캐시된 클라이언트와 keep-alive 연결 재사용"""
+    start = time.perf_counter()
+    llm = pool.get("openai", MODEL, base_url=base_url)
+    await llm.ainvoke([HumanMessage(content="안녕")])
+    return time.perf_counter() - start
+
+
+def summarize(name: str, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<8}{statistics.mean(samples) * 1000:>10.2f}{statistics.median(samples) * 1000:>10.2f}{p95 * 1000:>10.2f}")
+
+
+async def run(calls: int, base_url: str, cert_path: str):
+    settings.openai_api_key = "bench"
+    pool = LLMClientPool(http_client_kwargs={"verify": cert_path})
+    await pooled_call(pool, base_url)  # 연결 예열
+
+    cold = [await cold_call(base_url, cert_path) for _ in range(calls)]
+    pooled = [await pooled_call(pool, base_url) for _ in range(calls)]
+    await pool.aclose()
+
+    print(f"calls={calls} (HTTPS, local fake OpenAI endpoint)")
+    print(f"{'client':<8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    summarize("cold", cold)
+    summarize("pooled", pooled)
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = self_signed_cert(directory)
+        server = start_server(args.port, cert_path, key_path)
+        try:
+            asyncio.run(run(args.calls, f"https://127.0.0.1:{args.port}/v1", cert_path))
+        finally:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8766)
+    main(parser.parse_args())
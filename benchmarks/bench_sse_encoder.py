@@ -0,0 +1,51 @@
+"""
+SSE 프레임 인코딩 마이크로벤치마크
+기존 방식(f"data: {chunk.model_dump_json()}\\n\\n")과 SSEEncoder의 초당 프레임 수를 비교
+
+실행: python -m benchmarks.bench_sse_encoder [--frames 200000]
+"""
+import argparse
+import time
+
+from app.models.chat import StreamChunk
+from app.utils.sse import SSEEncoder
+
+
+def legacy_encode(chunks):
+    for chunk in chunks:
+        # Starlette가 str 프레임을 utf-8로 인코딩하는 비용까지 포함
+        f"data: {chunk.model_dump_json()}\n\n".encode("utf-8")
+
+
+def encoder_encode(chunks):
+    encoder = SSEEncoder()
+    for chunk in chunks:
+        encoder.encode(chunk)
+
+
+def measure(func, chunks) -> float:
+    start = time.perf_counter()
+    func(chunks)
+    return len(chunks) / (time.perf_counter() - start)
+
+
+def main(frames: int, repeat: int):
+    conversation_id = "4f1c2b6e-1f0a-4c55-9a58-2a7d8b8b1d61"
+    chunks = [
+        StreamChunk(content=f"토큰 {i} ", conversation_id=conversation_id, chunk_type="ai_response")
+        for i in range(frames)
+    ]
+    print(f"frames={frames}, best of {repeat}")
+    results = {}
+    for name, func in (("legacy", legacy_encode), ("encoder", encoder_encode)):
+        results[name] = max(measure(func, chunks) for _ in range(repeat))
+        print(f"{name:<8}{results[name]:>14,.0f} frames/s")
+    print(f"speedup  {results['encoder'] / results['legacy']:>13.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.frames, args.repeat)
@@ -0,0 +1,84 @@
+"""
+스트림 전송 루프 벤치마크
+기존 방식(청크마다 asyncio.sleep(0.01))과 StreamWriter의 처리량과 스트림당 CPU 시간을 비교
+
+실행: python -m benchmarks.bench_stream_writer [--tokens 300] [--streams 1 20 100]
+"""
+import argparse
+import asyncio
+import time
+
+from app.models.chat import StreamChunk
+from app.utils.streaming import StreamWriter
+
+
+async def token_source(conversation_id: str, tokens: int, interval: float):
+    """LLM 토큰 스트림을 흉내내는 소스 (interval=0이면 최대 속도)"""
+    for i in range(tokens):
+        if interval:
+            await asyncio.sleep(interval)
+        yield StreamChunk(content=f"토큰{i} ", conversation_id=conversation_id)
+    yield StreamChunk(content="", conversation_id=conversation_id, is_final=True)
+
+
+async def legacy_stream(source):
+    """기존 엔드포인트의 전송 루프"""
+    async for chunk in source:
+        yield f"data: {chunk.model_dump_json()}\n\n"
+        await asyncio.sleep(0.01)
+    yield "data: [DONE]\n\n"
+
+
+async def writer_stream(source):
+    """StreamWriter를 사용하는 전송 루프"""
+    async for chunk in StreamWriter(source):
+        yield f"data: {chunk.model_dump_json()}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+async def consume(frames) -> int:
+    """전송 계층 역할: 프레임을 받아 이벤트 루프에 양보"""
+    count = 0
+    async for _ in frames:
+        count += 1
+        await asyncio.sleep(0)
+    return count
+
+
+async def run(loop_factory, streams: int, tokens: int, interval: float):
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    frames = await asyncio.gather(*(
+        consume(loop_factory(token_source(f"c{i}", tokens, interval)))
+        for i in range(streams)
+    ))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return {
+        "tokens_per_sec_per_stream": tokens / wall,
+        "frames_per_stream": sum(frames) / streams,
+        "cpu_ms_per_stream": cpu * 1000 / streams,
+        "wall_s": wall,
+    }
+
+
+async def main(tokens: int, stream_counts, interval: float):
+    print(f"tokens/stream={tokens}, token interval={interval * 1000:.1f}ms")
+    print(f"{'loop':<8}{'streams':>8}{'tok/s/stream':>14}{'frames':>9}{'cpu ms/stream':>15}{'wall s':>9}")
+    for streams in stream_counts:
+        for name, factory in (("legacy", legacy_stream), ("writer", writer_stream)):
+            result = await run(factory, streams, tokens, interval)
+            print(
+                f"{name:<8}{streams:>8}{result['tokens_per_sec_per_stream']:>14.0f}"
+                f"{result['frames_per_stream']:>9.0f}{result['cpu_ms_per_stream']:>15.2f}"
+                f"{result['wall_s']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=300)
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 20, 100])
+    parser.add_argument("--interval-ms", type=float, default=0.0, help="소스 토큰 간격")
+    args = parser.parse_args()
+    asyncio.run(main(args.tokens, args.streams, args.interval_ms / 1000))
@@ -0,0 +1,76 @@
+"""
+도구 채팅 서비스 요청당 준비 비용 벤치마크
+/chat/stream_tools가 요청마다 ChatToolService()를 만들던 방식(도구 목록 구성, StateGraph 컴파일, 체크포인터 생성)과
+캐시된 의존성 get_chat_tool_service()를 쓰는 방식의 요청당 준비 비용과, 가짜 LLM으로 실행한 턴 전체 지연을 비교합니다.
+
+- per-request: 요청마다 ChatToolService() 생성 (변경 전)
+- singleton: get_chat_tool_service() (lru_cache, 그래프 한 번 컴파일)
+
+실행: python -m benchmarks.bench_tool_service_setup [--requests 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench")
+
+from app.api.dependencies.chat import get_chat_tool_service
+from app.core.config import settings
+from app.services.chat_tool_service import ChatToolService
+
+MODEL = "fake-bench-tools"
+PROFILE_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def report(name: str, latencies, extra: str = ""):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22} n={len(latencies):>5} mean={statistics.mean(latencies):8.3f}ms "
+          f"p50={statistics.median(latencies):8.3f}ms p95={p95:8.3f}ms {extra}")
+
+
+def measure_setup(factory, requests: int):
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        factory()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def measure_turns(factory, requests: int):
+    latencies = []
+    for index in range(requests):
+        started = time.perf_counter()
+        service = factory()
+        async for _ in service.stream_chat_with_profile_tools(
+            message=f"질문 {index}", profile_id=PROFILE_ID, conversation_id=f"bench-{index % 10}", model=MODEL
+        ):
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def main(requests: int):
+    settings.fake_llm_models = {MODEL: {"ttft": 0, "tokens_per_second": 0, "output_tokens": 8}}
+    print(f"requests={requests}")
+    # 임포트/첫 컴파일 비용 제외
+    ChatToolService()
+
+    report("setup per-request", measure_setup(ChatToolService, requests))
+    get_chat_tool_service()
+    report("setup singleton", measure_setup(get_chat_tool_service, requests))
+
+    report("turn per-request", await measure_turns(ChatToolService, requests))
+    report("turn singleton", await measure_turns(get_chat_tool_service, requests),
+           f"threads={get_chat_tool_service().memory.stats()['threads']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,119 @@
+"""
+가짜 LLM 프로바이더 부하 테스트
+"fake-*" 모델로 /chat/stream과 /chat/stream_tools를 호출하여, 토큰 비용과 네트워크 없이
+LangGraph 그래프, 모델 레지스트리, 어드미션, 스트림 허브를 포함한 전체 경로의 처리량과 TTFT를 측정합니다.
+도구 경로는 FAKE_LLM_TOOL_CALLS 스크립트대로 프로필 도구를 호출합니다 (Supabase 없이 오류 결과로 진행).
+
+실행: python -m benchmarks.load_fake_llm [--conversations 32] [--turns 3] [--ttft-ms 200] [--tps 50] [--tokens 64]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "load-test")
+
+import httpx
+import uvicorn
+
+from app.core.config import settings
+from main import app
+
+PROFILE_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def conversation(client: httpx.AsyncClient, path: str, index: int, turns: int, results: dict):
+    for turn in range(turns):
+        start = time.perf_counter()
+        first = None
+        body = {
+            "message": f"질문 {turn}",
+            "conversation_id": f"{path}-{index}",
+            "model": "fake-load",
+            "profile_id": PROFILE_ID,
+        }
+        async with client.stream("POST", f"/api/v1/chat/{path}", json=body) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data: {"):
+                    if line == "data: [DONE]":
+                        break
+                    continue
+                chunk = json.loads(line[len("data: "):])
+                if first is None and chunk.get("content") and chunk.get("chunk_type") in (None, "ai_response"):
+                    first = time.perf_counter() - start
+                if chunk.get("chunk_type") == "error":
+                    results["errors"] += 1
+        results["ttfts"].append(first)
+
+
+async def run(base_url: str, path: str, conversations: int, turns: int):
+    results = {"ttfts": [], "errors": 0}
+    limits = httpx.Limits(max_connections=conversations, max_keepalive_connections=conversations)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(conversation(client, path, i, turns, results) for i in range(conversations)))
+        return time.perf_counter() - start, results
+
+
+def report(name: str, elapsed: float, results: dict, total_turns: int):
+    ttfts = sorted(t for t in results["ttfts"] if t is not None)
+    mean = statistics.mean(ttfts) * 1000 if ttfts else float("nan")
+    p95 = ttfts[max(int(len(ttfts) * 0.95) - 1, 0)] * 1000 if ttfts else float("nan")
+    print(f"{name:<14}{total_turns / elapsed:>10.1f}{elapsed:>10.2f}{mean:>12.1f}{p95:>12.1f}{results['errors']:>8}")
+
+
+def main(args):
+    settings.fake_llm_models = {
+        "fake-load": {
+            "ttft": args.ttft_ms / 1000,
+            "ttft_jitter": args.ttft_jitter_ms / 1000,
+            "tokens_per_second": args.tps,
+            "output_tokens": args.tokens,
+            "output_tokens_stddev": args.tokens_stddev,
+            "error_rate": args.error_rate,
+            "tool_calls": args.tool_calls,
+        }
+    }
+    server = start_server(args.port)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    base_url = f"http://127.0.0.1:{args.port}"
+    total_turns = args.conversations * args.turns
+    print(
+        f"conversations={args.conversations} turns={args.turns} ttft={args.ttft_ms}ms tps={args.tps} "
+        f"tokens={args.tokens}±{args.tokens_stddev} error_rate={args.error_rate} tools={args.tool_calls}"
+    )
+    print(f"{'path':<14}{'turns/s':>10}{'wall s':>10}{'TTFT ms':>12}{'p95 ms':>12}{'errors':>8}")
+    try:
+        for path in ("stream", "stream_tools"):
+            elapsed, results = asyncio.run(run(base_url, path, args.conversations, args.turns))
+            report(path, elapsed, results, total_turns)
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=32)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--ttft-ms", type=float, default=200.0)
+    parser.add_argument("--ttft-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--tps", type=float, default=50.0)
+    parser.add_argument("--tokens", type=int, default=64)
+    parser.add_argument("--tokens-stddev", type=float, default=16.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tool-calls", nargs="*", default=["get_profile_info"])
+    parser.add_argument("--port", type=int, default=8766)
+    main(parser.parse_args())
@@ -0,0 +1,156 @@
+"""
+WebSocket 다중화 vs HTTP/SSE 부하 테스트
+대시보드처럼 여러 대화를 동시에 진행할 때, 턴마다 HTTP 요청을 보내는 /chat/stream과
+하나의 연결로 다중화하는 /chat/ws의 처리량과 첫 토큰 지연(TTFT)을 비교합니다.
+
+LLM 호출 없이 합성 토큰 스트림을 사용하는 서버를 로컬에서 띄워 측정합니다.
+
+실행: python -m benchmarks.load_ws_vs_sse [--conversations 24] [--turns 5] [--tokens 50]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "load-test")
+
+import httpx
+import uvicorn
+import websockets
+
+from app.api.dependencies.chat import get_chat_service
+from app.models.chat import StreamChunk
+from main import app
+
+
+class SyntheticChatService:
+    """고정 간격으로 토큰을 생성하는 ChatService 대체"""
+
+    def __init__(self, tokens: int, interval: float):
+        self.tokens = tokens
+        self.interval = interval
+
+    async def stream_chat(self, message, conversation_id=None, **kwargs):
+        for i in range(self.tokens):
+            await asyncio.sleep(self.interval)
+            yield StreamChunk(content=f"토큰{i} ", conversation_id=conversation_id)
+        yield StreamChunk(content="", conversation_id=conversation_id, is_final=True)
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def sse_conversation(client: httpx.AsyncClient, index: int, turns: int, ttfts: list):
+    for turn in range(turns):
+        start = time.perf_counter()
+        first = None
+        body = {"message": f"질문 {turn}", "conversation_id": f"sse-{index}"}
+        async with client.stream("POST", "/api/v1/chat/stream", json=body) as response:
+            async for line in response.aiter_lines():
+                if first is None and line.startswith("data: {"):
+                    first = time.perf_counter() - start
+                if line == "data: [DONE]":
+                    break
+        ttfts.append(first)
+
+
+async def run_sse(base_url: str, conversations: int, turns: int, max_connections: int):
+    ttfts: list = []
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(sse_conversation(client, i, turns, ttfts) for i in range(conversations)))
+        return time.perf_counter() - start, ttfts
+
+
+async def run_ws(ws_url: str, conversations: int, turns: int):
+    ttfts: list = []
+    async with websockets.connect(ws_url, max_size=None) as websocket:
+        waiters = {}
+
+        async def reader():
+            async for raw in websocket:
+                message = json.loads(raw)
+                waiter = waiters.get(message["stream_id"])
+                if waiter is not None:
+                    waiter.put_nowait(message)
+
+        async def conversation(index: int):
+            for turn in range(turns):
+                stream_id = f"ws-{index}-{turn}"
+                queue = waiters[stream_id] = asyncio.Queue()
+                start = time.perf_counter()
+                await websocket.send(json.dumps({
+                    "type": "chat",
+                    "stream_id": stream_id,
+                    "window": 1024,
+                    "request": {"message": f"질문 {turn}", "conversation_id": f"ws-{index}"},
+                }))
+                first = None
+                while True:
+                    message = await queue.get()
+                    if first is None:
+                        first = time.perf_counter() - start
+                    if message["type"] != "chunk":
+                        break
+                ttfts.append(first)
+                del waiters[stream_id]
+
+        reader_task = asyncio.create_task(reader())
+        start = time.perf_counter()
+        await asyncio.gather(*(conversation(i) for i in range(conversations)))
+        elapsed = time.perf_counter() - start
+        reader_task.cancel()
+        return elapsed, ttfts
+
+
+def report(name: str, elapsed: float, ttfts: list, total_turns: int):
+    ttfts = sorted(t for t in ttfts if t is not None)
+    p95 = ttfts[int(len(ttfts) * 0.95) - 1] if ttfts else float("nan")
+    print(
+        f"{name:<6}{total_turns / elapsed:>10.1f}{elapsed:>10.2f}"
+        f"{statistics.mean(ttfts) * 1000:>12.1f}{p95 * 1000:>12.1f}"
+    )
+
+
+def main(args):
+    app.dependency_overrides[get_chat_service] = lambda: SyntheticChatService(
+        args.tokens, args.interval_ms / 1000
+    )
+    server = start_server(args.port)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    base_url = f"http://127.0.0.1:{args.port}"
+    total_turns = args.conversations * args.turns
+    print(
+        f"conversations={args.conversations} turns={args.turns} tokens/turn={args.tokens} "
+        f"http max_connections={args.max_connections}"
+    )
+    print(f"{'path':<6}{'turns/s':>10}{'wall s':>10}{'TTFT ms':>12}{'p95 ms':>12}")
+    try:
+        elapsed, ttfts = asyncio.run(run_sse(base_url, args.conversations, args.turns, args.max_connections))
+        report("sse", elapsed, ttfts, total_turns)
+        elapsed, ttfts = asyncio.run(run_ws(f"ws://127.0.0.1:{args.port}/api/v1/chat/ws", args.conversations, args.turns))
+        report("ws", elapsed, ttfts, total_turns)
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=24)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--interval-ms", type=float, default=2.0)
+    parser.add_argument("--max-connections", type=int, default=6, help="브라우저의 호스트당 HTTP/1.1 연결 수 제한")
+    parser.add_argument("--port", type=int, default=8765)
+    main(parser.parse_args())
@@ -6,9 +6,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.core.workers import check_process_model, sibling_worker_guard
 from app.utils.logging import setup_logging, get_logger
 from app.api.endpoints.chat import router as chat_router
+from app.api.endpoints.chat_ws import router as chat_ws_router
 from app.api.endpoints.profile import router as profile_router
+from app.services.checkpointer import close_checkpointers
+from app.services.compaction import conversation_compactor
+from app.services.conversation_index import conversation_index
+from app.services.llm_clients import llm_client_pool
+from app.services.shared_state import shared_state
+from app.services.resilience import CircuitBreaker, circuit_breakers
+from app.services.stream_hub import stream_hub
 
 
 @asynccontextmanager
@@ -18,11 +27,19 @@ async def lifespan(app: FastAPI):
     setup_logging()
     logger = get_logger(__name__)
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
+    # 대화 상태, 대화 목록, 캐시 무효화, 압축 잠금이 프로세스마다 따로 있으면 워커 간에 어긋남
+    check_process_model(guard=sibling_worker_guard)
     
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    await conversation_compactor.aclose()
+    await close_checkpointers()
+    conversation_index.close()
+    shared_state.close()
+    await llm_client_pool.aclose()
+    sibling_worker_guard.release()
 
 
 # Create FastAPI app
@@ -48,6 +65,7 @@ app.add_middleware(
 
 # Include routers
 app.include_router(chat_router, prefix="/api/v1")
+app.include_router(chat_ws_router, prefix="/api/v1")
 app.include_router(profile_router, prefix="/api/v1")
 
 
@@ -64,10 +82,18 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    providers = circuit_breakers.stats()
+    streams = stream_hub.stats()
+    degraded = (
+        any(state["state"] != CircuitBreaker.CLOSED for state in providers.values())
+        or streams["live"] >= streams["max_live"]
+    )
     return {
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
         "app": settings.app_name,
-        "version": settings.app_version
+        "version": settings.app_version,
+        "providers": providers,
+        "streams": {key: streams[key] for key in ("live", "max_live", "rejected")}
     }
 
 
@@ -93,10 +119,12 @@ async def global_exception_handler(request, exc):
 if __name__ == "__main__":
     import uvicorn
     
+    check_process_model(reload=settings.debug)
     uvicorn.run(
         "main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=settings.workers,
         log_level="debug" if settings.debug else "info"
     )
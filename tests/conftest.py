@@ -0,0 +1,23 @@
+"""Shared pytest configuration"""
+
+import os
+
+import pytest
+
+# The profile tools create a Supabase client at import time; unit tests never
+# reach the database, so placeholder credentials are enough to import the app.
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+
+
+@pytest.fixture(autouse=True)
+def isolated_circuit_breakers(monkeypatch):
+    """Provider circuit state must not leak between tests; keep retry backoff short"""
+    from app.core.config import settings
+    from app.services.resilience import circuit_breakers
+
+    monkeypatch.setattr(settings, "llm_retry_base_delay", 0.001)
+    monkeypatch.setattr(settings, "llm_retry_max_delay", 0.005)
+    circuit_breakers.reset()
+    yield
+    circuit_breakers.reset()
@@ -0,0 +1,117 @@
+"""
+프로바이더 어드미션 테스트
+동시 요청 제한, RPM/TPM 토큰 버킷, FIFO 대기열과 대기 타임아웃을 검증
+"""
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.services.admission import (
+    AdmissionController,
+    AdmissionTicket,
+    AdmissionTimeoutError,
+    ProviderAdmission,
+)
+from app.services.model_registry import ModelRegistry
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_admits_in_arrival_order():
+    gate = ProviderAdmission("openai", max_in_flight=1, queue_timeout=1)
+    order = []
+
+    async def request(name: str):
+        await gate.acquire(1)
+        order.append(name)
+        await asyncio.sleep(0.01)
+        gate.release(AdmissionTicket(1))
+
+    await asyncio.gather(*(request(name) for name in ["a", "b", "c", "d"]))
+
+    assert order == ["a", "b", "c", "d"]
+    assert gate.stats()["max_queue_depth"] == 3
+    assert gate.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_raises_and_leaves_queue():
+    gate = ProviderAdmission("openai", max_in_flight=1, queue_timeout=0.05)
+    await gate.acquire(1)
+
+    with pytest.raises(AdmissionTimeoutError):
+        await gate.acquire(1)
+
+    stats = gate.stats()
+    assert stats["queue_depth"] == 0 and stats["timed_out"] == 1
+    assert stats["wait_p95"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_requests_per_minute_budget_is_enforced():
+    gate = ProviderAdmission("openai", requests_per_minute=2, queue_timeout=0.05)
+
+    await gate.acquire(1)
+    await gate.acquire(1)
+    with pytest.raises(AdmissionTimeoutError):
+        await gate.acquire(1)
+
+
+@pytest.mark.asyncio
+async def test_tokens_per_minute_budget_is_settled_with_actual_usage():
+    gate = ProviderAdmission("openai", tokens_per_minute=100, queue_timeout=0.05)
+
+    await gate.acquire(80)
+    with pytest.raises(AdmissionTimeoutError):
+        await gate.acquire(80)
+
+    gate.release(AdmissionTicket(80, actual_tokens=10))
+    await gate.acquire(80)
+
+
+@pytest.mark.asyncio
+async def test_queued_head_is_not_overtaken():
+    gate = ProviderAdmission("openai", tokens_per_minute=100, queue_timeout=1)
+    await gate.acquire(90)
+
+    large = asyncio.create_task(gate.acquire(50))
+    small = asyncio.create_task(gate.acquire(5))
+    await asyncio.sleep(0.02)
+
+    # 작은 요청은 예산에 들어가지만 먼저 온 큰 요청 뒤에서 대기
+    assert not large.done() and not small.done()
+    assert gate.queue_depth == 2
+    large.cancel()
+    small.cancel()
+    await asyncio.gather(large, small, return_exceptions=True)
+    assert gate.queue_depth == 0
+
+
+class SlowLLM(GenericFakeChatModel):
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(0.2)
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_saturated_provider_falls_back_after_queue_timeout():
+    llms = {
+        "primary": SlowLLM(messages=iter([AIMessage(content="1차 응답")] * 2)),
+        "backup": GenericFakeChatModel(messages=iter([AIMessage(content="백업 응답")])),
+    }
+    registry = ModelRegistry(
+        providers={"primary": "openai", "backup": "anthropic"},
+        fallbacks={"primary": ["backup"]},
+        admission=AdmissionController(max_in_flight={"openai": 1}, queue_timeout=0.05)
+    )
+    registry.client = lambda spec: llms[spec.name]
+
+    first = asyncio.create_task(registry.ainvoke("primary", [HumanMessage(content="하나")]))
+    await asyncio.sleep(0.01)
+    second = await registry.ainvoke("primary", [HumanMessage(content="둘")])
+
+    assert second.content == "백업 응답"
+    assert (await first).content == "1차 응답"
+    assert registry.admission.stats()["openai"]["timed_out"] == 1
@@ -0,0 +1,273 @@
+"""
+채팅 서비스 스트리밍 테스트
+LLM 대신 GenericFakeChatModel을 사용하여 토큰 단위 스트리밍을 검증
+"""
+import asyncio
+import itertools
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGenerationChunk
+
+from app.api.dependencies.chat import get_chat_tool_service
+from app.core.config import settings
+from app.services import chat_service as chat_service_module
+from app.services import chat_tool_service as chat_tool_service_module
+from app.services.chat_service import ChatService
+from app.services.chat_tool_service import AgentTextBuffer, ChatToolService
+from app.services.fake_llm import FakeChatModel
+from app.services.model_registry import ModelRegistry, model_registry
+from main import app
+
+
+def fake_llm(*answers: str) -> GenericFakeChatModel:
+    return GenericFakeChatModel(messages=iter([AIMessage(content=a) for a in answers]))
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_yields_token_deltas(monkeypatch):
+    service = ChatService()
+    llm = fake_llm("안녕하세요 무엇을 도와드릴까요")
+    monkeypatch.setattr(model_registry, "client", lambda spec: llm)
+
+    chunks = [
+        chunk async for chunk in service.stream_chat(message="안녕", conversation_id="c1")
+    ]
+
+    deltas = [chunk for chunk in chunks if not chunk.is_final]
+    assert len(deltas) > 1
+    assert "".join(chunk.content for chunk in deltas) == "안녕하세요 무엇을 도와드릴까요"
+    assert chunks[-1].is_final and chunks[-1].content == ""
+
+
+class FakeToolCallingLLM(GenericFakeChatModel):
+    """bind_tools를 지원하는 테스트용 LLM"""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = next(self.messages)
+        if not message.tool_calls:
+            self.messages = itertools.chain([message], self.messages)
+            async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+                yield chunk
+            return
+
+        tool_call_chunks = [
+            tool_call_chunk(name=call["name"], args=json.dumps(call["args"]), id=call["id"], index=i)
+            for i, call in enumerate(message.tool_calls)
+        ]
+        if message.content:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=message.content))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=tool_call_chunks))
+
+
+@pytest.mark.asyncio
+async def test_profile_tools_stream_final_answer_tokens(monkeypatch):
+    # 머리말 판단용으로 잡아 두는 길이를 넘으면 나머지는 토큰 단위로 전달
+    monkeypatch.setattr(settings, "stream_preamble_hold_chars", 4)
+    service = ChatToolService()
+    llm = FakeToolCallingLLM(messages=iter([
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "get_profile_info", "args": {"profile_id": "p1"}, "id": "call-1"}],
+        ),
+        AIMessage(content="프로필 정보를 정리해 드릴게요"),
+    ]))
+    monkeypatch.setattr(model_registry, "client", lambda spec: llm)
+
+    async def fake_profile_info(profile_id: str) -> str:
+        return "프로필 정보: 테스트"
+
+    monkeypatch.setattr(service.tools[0], "coroutine", fake_profile_info)
+
+    chunks = [
+        chunk async for chunk in service.stream_chat_with_profile_tools(
+            message="내 프로필 알려줘", profile_id="p1", conversation_id="c1"
+        )
+    ]
+
+    chunk_types = [chunk.chunk_type for chunk in chunks if not chunk.is_final]
+    assert chunk_types[:2] == ["tool_calling", "tool_result"]
+
+    answer = [chunk for chunk in chunks if chunk.chunk_type == "ai_response"]
+    assert len(answer) > 1
+    assert "".join(chunk.content for chunk in answer) == "프로필 정보를 정리해 드릴게요"
+
+
+@pytest.mark.asyncio
+async def test_profile_tools_tag_text_before_tool_call_as_preamble(monkeypatch):
+    service = ChatToolService()
+    llm = FakeToolCallingLLM(messages=iter([
+        AIMessage(
+            content="프로필을 조회해 볼게요",
+            tool_calls=[{"name": "get_profile_info", "args": {"profile_id": "p1"}, "id": "call-1"}],
+        ),
+        AIMessage(content="프로필 정보를 정리해 드릴게요"),
+    ]))
+    monkeypatch.setattr(model_registry, "client", lambda spec: llm)
+
+    async def fake_profile_info(profile_id: str) -> str:
+        return "프로필 정보: 테스트"
+
+    monkeypatch.setattr(service.tools[0], "coroutine", fake_profile_info)
+
+    chunks = [
+        chunk async for chunk in service.stream_chat_with_profile_tools(
+            message="내 프로필 알려줘", profile_id="p1", conversation_id="c-preamble"
+        )
+    ]
+
+    preamble = [chunk for chunk in chunks if chunk.chunk_type == "ai_preamble"]
+    assert [chunk.content for chunk in preamble] == ["프로필을 조회해 볼게요"]
+    assert preamble[0].metadata is None
+    types = [chunk.chunk_type for chunk in chunks]
+    assert types.index("ai_preamble") < types.index("tool_calling")
+
+    # 머리말은 답변으로 보내지 않음: 클라이언트가 받는 답변 = 최종 에이전트 메시지
+    streamed = "".join(chunk.content for chunk in chunks if chunk.chunk_type == "ai_response")
+    assert streamed == "프로필 정보를 정리해 드릴게요"
+    state = await service.graph.aget_state({"configurable": {"thread_id": "c-preamble"}})
+    assert state.values["messages"][-1].content == "프로필 정보를 정리해 드릴게요"
+
+
+def test_agent_text_buffer_releases_text_once():
+    buffer = AgentTextBuffer(hold_chars=10)
+
+    assert buffer.text("m1", "조회해") == []
+    assert buffer.text("m1", " 볼게요") == []
+    assert buffer.tool_call("m1") == [("ai_preamble", "조회해 볼게요")]
+    assert buffer.finish(tool_call=True) == []
+
+    assert buffer.text("m2", "짧은") == []
+    assert buffer.finish(tool_call=False) == [("ai_response", "짧은")]
+
+    # 머리말로 보기엔 긴 텍스트는 답변으로 확정하고 이후 토큰은 바로 전달
+    assert buffer.text("m3", "가나다라마") == []
+    assert buffer.text("m3", "바사아자차카") == [("ai_response", "가나다라마바사아자차카")]
+    assert buffer.text("m3", "타") == [("ai_response", "타")]
+    assert buffer.tool_call("m3") == []
+    assert buffer.finish(tool_call=True) == []
+
+
+class RecordingLLM(GenericFakeChatModel):
+    """호출 시 전달된 생성 파라미터를 기록하는 테스트용 LLM"""
+
+    calls: list = []
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls.append(kwargs)
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_passes_generation_params_per_request(monkeypatch):
+    service = ChatService()
+    llm = RecordingLLM(messages=iter([AIMessage(content="하나"), AIMessage(content="둘")]), calls=[])
+    monkeypatch.setattr(model_registry, "client", lambda spec: llm)
+
+    async for _ in service.stream_chat(message="안녕", conversation_id="c1", temperature=0.1, max_tokens=64):
+        pass
+    async for _ in service.stream_chat(message="다시", conversation_id="c1"):
+        pass
+
+    # 파라미터는 해당 요청에만 적용되고 대화 상태에 남지 않음
+    assert llm.calls[0]["temperature"] == 0.1 and llm.calls[0]["max_tokens"] == 64
+    assert "temperature" not in llm.calls[1] and "max_tokens" not in llm.calls[1]
+
+
+class SlowFirstTokenLLM(FakeToolCallingLLM):
+    """첫 토큰이 늦게 나오는 테스트용 LLM"""
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(1)
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+
+
+@pytest.fixture
+def hedging_registry(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge_initial_delay", 0.05)
+    registry = ModelRegistry(
+        providers={"primary": "openai", "backup": "anthropic"},
+        fallbacks={"primary": ["backup"]},
+        hedging=True
+    )
+    monkeypatch.setattr(chat_service_module, "model_registry", registry)
+    monkeypatch.setattr(chat_tool_service_module, "model_registry", registry)
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_hedged_stream_chat_forwards_winner_tokens_once(hedging_registry):
+    llms = {
+        "primary": SlowFirstTokenLLM(messages=iter([AIMessage(content="느린 응답")])),
+        "backup": fake_llm("헤지 응답 입니다"),
+    }
+    hedging_registry.client = lambda spec: llms[spec.name]
+    service = ChatService()
+
+    chunks = [
+        chunk async for chunk in service.stream_chat(message="안녕", conversation_id="c1", model="primary")
+    ]
+
+    deltas = [chunk for chunk in chunks if not chunk.is_final]
+    assert len(deltas) > 1
+    assert "".join(chunk.content for chunk in deltas) == "헤지 응답 입니다"
+    assert hedging_registry.hedge_stats()["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_tool_agent_streams_final_answer_once(hedging_registry, monkeypatch):
+    tool_call = AIMessage(
+        content="",
+        tool_calls=[{"name": "get_profile_info", "args": {"profile_id": "p1"}, "id": "call-1"}],
+    )
+    llms = {
+        "primary": SlowFirstTokenLLM(messages=iter([tool_call, AIMessage(content="느린 답변")])),
+        "backup": FakeToolCallingLLM(messages=iter([tool_call, AIMessage(content="프로필 정보 입니다")])),
+    }
+    hedging_registry.client = lambda spec: llms[spec.name]
+    service = ChatToolService()
+
+    async def fake_profile_info(profile_id: str) -> str:
+        return "프로필 정보: 테스트"
+
+    monkeypatch.setattr(service.tools[0], "coroutine", fake_profile_info)
+
+    chunks = [
+        chunk async for chunk in service.stream_chat_with_profile_tools(
+            message="내 프로필 알려줘", profile_id="p1", conversation_id="c1", model="primary"
+        )
+    ]
+
+    answer = "".join(chunk.content for chunk in chunks if chunk.chunk_type == "ai_response")
+    assert answer == "프로필 정보 입니다"
+    assert [chunk.chunk_type for chunk in chunks].count("tool_calling") == 1
+    assert hedging_registry.hedge_stats()["hedged"] == 2
+
+
+def test_stream_tools_endpoint_reuses_one_service(monkeypatch):
+    llm = FakeChatModel(model="fake-tools-singleton", ttft=0, tokens_per_second=0, output_tokens=3)
+    monkeypatch.setattr(model_registry, "client", lambda spec: llm)
+    get_chat_tool_service.cache_clear()
+    client = TestClient(app)
+    try:
+        for question in ("첫 질문", "두번째 질문"):
+            body = {"message": question, "conversation_id": "tools-singleton", "model": "fake-tools-singleton"}
+            response = client.post("/api/v1/chat/stream_tools", json=body)
+            assert response.status_code == 200 and "[DONE]" in response.text
+
+        service = get_chat_tool_service()
+        assert get_chat_tool_service.cache_info().misses == 1
+        state = asyncio.run(service.graph.aget_state({"configurable": {"thread_id": "tools-singleton"}}))
+        # 요청마다 새 체크포인터를 만들지 않으므로 도구 대화도 이전 턴을 기억
+        assert [m.content for m in state.values["messages"] if m.type == "human"] == ["첫 질문", "두번째 질문"]
+    finally:
+        get_chat_tool_service.cache_clear()
@@ -0,0 +1,122 @@
+"""
+WebSocket 채팅 엔드포인트 테스트
+"""
+import json
+
+from fastapi.testclient import TestClient
+
+from app.api.dependencies.chat import get_chat_service
+from app.models.chat import StreamChunk
+from main import app
+
+
+class StubChatService:
+    async def stream_chat(self, message, conversation_id=None, **kwargs):
+        # metadata가 있는 청크는 병합되지 않으므로 토큰별 프레임을 확인할 수 있다
+        for token in message.split():
+            yield StreamChunk(
+                content=token,
+                conversation_id=conversation_id,
+                metadata={"token": token},
+            )
+        yield StreamChunk(content="", conversation_id=conversation_id, is_final=True)
+
+
+def receive_until_done(websocket, stream_ids):
+    frames = {stream_id: [] for stream_id in stream_ids}
+    done = set()
+    while done != set(stream_ids):
+        message = json.loads(websocket.receive_text())
+        if message["type"] == "done":
+            done.add(message["stream_id"])
+        else:
+            assert message["type"] == "chunk", message
+            frames[message["stream_id"]].append(message["data"])
+    return frames
+
+
+def test_websocket_multiplexes_conversations():
+    app.dependency_overrides[get_chat_service] = lambda: StubChatService()
+    try:
+        with TestClient(app).websocket_connect("/api/v1/chat/ws") as websocket:
+            for stream_id, text in (("a", "하나 둘"), ("b", "셋 넷 다섯")):
+                websocket.send_text(json.dumps({
+                    "type": "chat",
+                    "stream_id": stream_id,
+                    "request": {"message": text, "conversation_id": f"conv-{stream_id}"},
+                }))
+            frames = receive_until_done(websocket, ["a", "b"])
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [frame["content"] for frame in frames["a"]] == ["하나", "둘", ""]
+    assert [frame["content"] for frame in frames["b"]] == ["셋", "넷", "다섯", ""]
+    assert {frame["conversation_id"] for frame in frames["b"]} == {"conv-b"}
+
+
+def test_websocket_stream_waits_for_credit():
+    app.dependency_overrides[get_chat_service] = lambda: StubChatService()
+    try:
+        with TestClient(app).websocket_connect("/api/v1/chat/ws") as websocket:
+            websocket.send_text(json.dumps({
+                "type": "chat",
+                "stream_id": "slow",
+                "window": 1,
+                "request": {"message": "하나 둘"},
+            }))
+            first = json.loads(websocket.receive_text())
+            assert first["data"]["content"] == "하나"
+
+            # 크레딧이 없는 동안 다른 스트림은 계속 진행된다
+            websocket.send_text(json.dumps({
+                "type": "chat", "stream_id": "fast", "request": {"message": "셋"},
+            }))
+            fast = receive_until_done(websocket, ["fast"])
+            assert [frame["content"] for frame in fast["fast"]] == ["셋", ""]
+
+            # 쌓인 크레딧은 창 크기(1)를 넘지 않으므로 크레딧 메시지마다 한 프레임
+            websocket.send_text(json.dumps({"type": "credit", "stream_id": "slow", "frames": 10}))
+            assert json.loads(websocket.receive_text())["data"]["content"] == "둘"
+            websocket.send_text(json.dumps({"type": "credit", "stream_id": "slow", "frames": 10}))
+            slow = receive_until_done(websocket, ["slow"])
+            assert [frame["content"] for frame in slow["slow"]] == [""]
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_websocket_reports_invalid_requests():
+    with TestClient(app).websocket_connect("/api/v1/chat/ws") as websocket:
+        websocket.send_text(json.dumps({"type": "chat", "stream_id": "x", "request": {}}))
+        error = json.loads(websocket.receive_text())
+
+    assert error["type"] == "error" and error["stream_id"] == "x"
+
+
+def test_websocket_rejects_bad_control_messages_without_closing():
+    app.dependency_overrides[get_chat_service] = lambda: StubChatService()
+    try:
+        with TestClient(app).websocket_connect("/api/v1/chat/ws") as websocket:
+            websocket.send_text(json.dumps({"type": "chat", "stream_id": "s", "window": 1, "request": {"message": "하나 둘 셋"}}))
+            assert json.loads(websocket.receive_text())["data"]["content"] == "하나"
+
+            bad_messages = [
+                {"type": "credit", "stream_id": "s", "frames": "x"},
+                {"type": "credit", "stream_id": "s", "frames": None},
+                {"type": "credit", "stream_id": ["s"], "frames": 1},
+                {"type": "cancel", "stream_id": {"id": "s"}},
+                {"type": "chat", "stream_id": "w", "window": "many", "request": {"message": "넷"}},
+                {"type": "chat", "stream_id": "w", "window": 10 ** 9, "request": {"message": "넷"}},
+            ]
+            for message in bad_messages:
+                websocket.send_text(json.dumps(message))
+                assert json.loads(websocket.receive_text())["type"] == "error"
+
+            # 큰 크레딧도 창 크기(1)로 제한되어 크레딧마다 한 프레임씩 전송되며, 연결과 스트림은 그대로 동작
+            contents = []
+            for _ in range(3):
+                websocket.send_text(json.dumps({"type": "credit", "stream_id": "s", "frames": 10 ** 9}))
+                contents.append(json.loads(websocket.receive_text())["data"]["content"])
+            assert contents == ["둘", "셋", ""]
+            assert json.loads(websocket.receive_text())["type"] == "done"
+    finally:
+        app.dependency_overrides.clear()
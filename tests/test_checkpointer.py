@@ -0,0 +1,180 @@
+"""
+제한된 체크포인터 테스트
+스레드당 체크포인트 정리, 바이트 계량, LRU/바이트 한도 축출, 유휴 스레드 TTL 만료,
+메시지 목록 델타 저장과 실행 완료 후 중간 체크포인트 정리를 검증
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import Annotated, TypedDict
+
+from app.services.checkpointer import MESSAGE_REFS, BoundedMemorySaver, _typed_size
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build_graph(saver: BoundedMemorySaver):
+    async def reply(state: State):
+        return {"messages": [AIMessage(content=f"답변 {len(state['messages'])} " + "x" * 200)]}
+
+    async def review(state: State):
+        return {}
+
+    workflow = StateGraph(State)
+    workflow.add_node("reply", reply)
+    workflow.add_node("review", review)
+    workflow.set_entry_point("reply")
+    workflow.add_edge("reply", "review")
+    workflow.add_edge("review", END)
+    return workflow.compile(checkpointer=saver)
+
+
+async def turn(graph, thread_id: str, text: str = "질문"):
+    config = {"configurable": {"thread_id": thread_id}}
+    return await graph.ainvoke({"messages": [HumanMessage(content=text)]}, config)
+
+
+def recomputed_bytes(saver: BoundedMemorySaver) -> int:
+    total = sum(_typed_size(blob) for blob in saver.blobs.values())
+    for namespaces in saver.storage.values():
+        for checkpoints in namespaces.values():
+            total += sum(_typed_size(c) + _typed_size(m) for c, m, _ in checkpoints.values())
+    for writes in saver.writes.values():
+        total += sum(_typed_size(write[2]) for write in writes.values())
+    for pool in saver._message_pool.values():
+        total += sum(_typed_size(typed) for typed, _ in pool.values())
+    return total
+
+
+@pytest.mark.asyncio
+async def test_keeps_latest_checkpoints_and_full_state():
+    saver = BoundedMemorySaver(keep_checkpoints=2)
+    graph = build_graph(saver)
+
+    for index in range(5):
+        result = await turn(graph, "t1", f"질문 {index}")
+
+    assert len(result["messages"]) == 10
+    assert len(saver.storage["t1"][""]) == 2
+    assert saver.pruned_checkpoints > 0
+    state = await graph.aget_state({"configurable": {"thread_id": "t1"}})
+    assert [m.content for m in state.values["messages"] if m.type == "human"][-1] == "질문 4"
+    assert saver.total_bytes == recomputed_bytes(saver)
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_thread_is_evicted():
+    saver = BoundedMemorySaver(max_threads=2)
+    graph = build_graph(saver)
+
+    await turn(graph, "a")
+    await turn(graph, "b")
+    await graph.aget_state({"configurable": {"thread_id": "a"}})
+    await turn(graph, "c")
+
+    assert set(saver.storage) == {"a", "c"}
+    assert saver.stats()["evictions"]["lru"] == 1
+    assert saver.total_bytes == recomputed_bytes(saver)
+
+
+@pytest.mark.asyncio
+async def test_byte_limit_evicts_other_threads_but_not_the_writer():
+    saver = BoundedMemorySaver(max_bytes=1)
+    graph = build_graph(saver)
+
+    await turn(graph, "a")
+    await turn(graph, "b")
+
+    assert list(saver.storage) == ["b"]
+    assert saver.stats()["evictions"]["bytes"] >= 1
+    assert len((await turn(graph, "b"))["messages"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_idle_threads_expire_after_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.services.checkpointer.time.monotonic", lambda: clock[0])
+    saver = BoundedMemorySaver(ttl_seconds=60)
+    graph = build_graph(saver)
+
+    await turn(graph, "old")
+    clock[0] += 61
+    await turn(graph, "new")
+
+    assert "old" not in saver.storage
+    assert await saver.aget_tuple({"configurable": {"thread_id": "old"}}) is None
+    assert saver.stats()["evictions"]["ttl"] == 1
+    assert saver.stats()["threads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_thread_releases_all_bytes():
+    saver = BoundedMemorySaver()
+    graph = build_graph(saver)
+    await turn(graph, "a")
+
+    await saver.adelete_thread("a")
+
+    assert saver.total_bytes == 0 and not saver.blobs and not saver.writes
+    assert saver.stats()["threads"] == 0
+
+
+def build_tool_like_graph(saver: BoundedMemorySaver):
+    """agent -> tools -> agent -> tools -> agent: five checkpoints per question like the tool graph"""
+    async def step(state: State):
+        return {"messages": [AIMessage(content=f"단계 {len(state['messages'])} " + "y" * 500)]}
+
+    workflow = StateGraph(State)
+    for name in ("agent1", "tools1", "agent2", "tools2", "agent3"):
+        workflow.add_node(name, step)
+    workflow.set_entry_point("agent1")
+    workflow.add_edge("agent1", "tools1")
+    workflow.add_edge("tools1", "agent2")
+    workflow.add_edge("agent2", "tools2")
+    workflow.add_edge("tools2", "agent3")
+    workflow.add_edge("agent3", END)
+    return workflow.compile(checkpointer=saver)
+
+
+@pytest.mark.asyncio
+async def test_message_lists_are_stored_as_deltas():
+    full = BoundedMemorySaver(keep_checkpoints=10, delta_messages=False)
+    delta = BoundedMemorySaver(keep_checkpoints=10, delta_messages=True)
+
+    for saver in (full, delta):
+        graph = build_tool_like_graph(saver)
+        for index in range(3):
+            result = await turn(graph, "t1", f"질문 {index}")
+
+    state = await build_tool_like_graph(delta).aget_state({"configurable": {"thread_id": "t1"}})
+    assert [m.content for m in state.values["messages"]] == [m.content for m in result["messages"]]
+    assert any(typed[0] == MESSAGE_REFS for typed in delta.blobs.values())
+    assert delta.stats()["pooled_messages"] == len(result["messages"])
+    assert delta.bytes_stored * 2 < full.bytes_stored
+    assert delta.total_bytes * 2 < full.total_bytes
+    assert delta.total_bytes == recomputed_bytes(delta)
+
+
+@pytest.mark.asyncio
+async def test_completed_run_keeps_only_the_latest_checkpoint():
+    saver = BoundedMemorySaver(keep_checkpoints=10)
+    graph = build_tool_like_graph(saver)
+    config = {"configurable": {"thread_id": "t1"}}
+
+    await turn(graph, "t1")
+    assert len(saver.storage["t1"][""]) > 1
+    saver.complete_run("t1")
+
+    assert len(saver.storage["t1"][""]) == 1
+    assert saver.total_bytes == recomputed_bytes(saver)
+    # 메시지를 같은 id로 교체해도(압축 요약) 새 내용으로 저장되고 다음 턴이 이어짐
+    messages = (await graph.aget_state(config)).values["messages"]
+    await graph.aupdate_state(config, {"messages": [SystemMessage(content="요약", id=messages[0].id)]})
+    result = await turn(graph, "t1", "다음 질문")
+    assert result["messages"][0].content == "요약" and len(result["messages"]) == 12
+    saver.complete_run("t1")
+    assert saver.stats()["pooled_messages"] == 12
+    assert saver.total_bytes == recomputed_bytes(saver)
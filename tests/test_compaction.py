@@ -0,0 +1,158 @@
+"""
+대화 압축 테스트
+임계값 이후 오래된 턴의 백그라운드 요약, 체크포인트 상태 교체, 요약의 시스템 프롬프트 포함, 턴과의 직렬화(다른 워커의 턴 포함)를 검증
+"""
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.core.config import settings
+from app.services import compaction as compaction_module
+from app.services.chat_service import ChatService
+from app.services.compaction import SUMMARY_NAME, ConversationCompactor, is_summary, with_system_prompt
+from app.services.fake_llm import FakeChatModel
+from app.services.model_registry import model_registry
+from app.services.shared_state import SharedState
+
+
+def test_summary_is_folded_into_the_system_prompt():
+    summary = SystemMessage(content="사용자 이름은 민수", name=SUMMARY_NAME)
+    messages = [summary, HumanMessage(content="내 이름 기억해?")]
+
+    prepared = with_system_prompt(messages, "기본 프롬프트")
+
+    assert len(prepared) == 2
+    assert prepared[0].content.startswith("기본 프롬프트") and "사용자 이름은 민수" in prepared[0].content
+    # 클라이언트가 보낸 시스템 메시지가 있으면 기본 프롬프트 대신 사용
+    own = with_system_prompt([SystemMessage(content="커스텀"), summary, HumanMessage(content="질문")], "기본")
+    assert own[0].content.startswith("커스텀") and len(own) == 2
+
+
+def test_older_messages_exclude_recent_turns_and_client_system_prompt(monkeypatch):
+    monkeypatch.setattr(settings, "compaction_keep_recent_turns", 1)
+    messages = [
+        SystemMessage(content="커스텀"),
+        HumanMessage(content="질문1"), AIMessage(content="답변1"),
+        HumanMessage(content="질문2"), AIMessage(content="답변2"),
+    ]
+
+    older = ConversationCompactor.older_messages(messages)
+
+    assert [m.content for m in older] == ["질문1", "답변1"]
+
+
+class RecordingFakeModel(FakeChatModel):
+    seen: list = []
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.seen.append(list(messages))
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+
+
+@pytest.fixture
+def compaction_enabled(monkeypatch):
+    compactor = ConversationCompactor(enabled=True)
+    monkeypatch.setattr(compaction_module, "conversation_compactor", compactor)
+    monkeypatch.setattr("app.services.chat_service.conversation_compactor", compactor)
+    monkeypatch.setattr(settings, "compaction_threshold_tokens", 200)
+    monkeypatch.setattr(settings, "compaction_keep_recent_turns", 1)
+    monkeypatch.setattr(settings, "compaction_model", "fake-summary")
+    chat_llm = RecordingFakeModel(model="fake-chat", ttft=0, tokens_per_second=0, output_tokens=40, seen=[])
+    summary_llm = FakeChatModel(model="fake-summary", ttft=0.01, tokens_per_second=0, output_tokens=5)
+    llms = {"fake-chat": chat_llm, "fake-summary": summary_llm}
+    monkeypatch.setattr(model_registry, "client", lambda spec: llms[spec.name])
+    return compactor, chat_llm
+
+
+@pytest.mark.asyncio
+async def test_long_thread_is_compacted_in_the_background(compaction_enabled):
+    compactor, chat_llm = compaction_enabled
+    service = ChatService()
+    config = {"configurable": {"thread_id": "long-thread"}}
+
+    for turn in range(4):
+        await service.chat(message=f"질문 {turn}", conversation_id="long-thread", model="fake-chat")
+        await compactor.drain()
+
+    messages = (await service.graph.aget_state(config)).values["messages"]
+    summaries = [m for m in messages if is_summary(m)]
+    assert compactor.compactions >= 1 and compactor.failures == 0
+    assert len(summaries) == 1 and is_summary(messages[0])
+    # 요약 + 마지막 턴만 남음
+    assert [m.type for m in messages[1:]] == ["human", "ai"]
+    assert messages[1].content == "질문 3"
+
+    # 다음 턴의 LLM 입력은 요약이 포함된 시스템 프롬프트 + 최근 턴
+    await service.chat(message="질문 4", conversation_id="long-thread", model="fake-chat")
+    sent = chat_llm.seen[-1]
+    assert isinstance(sent[0], SystemMessage) and "[이전 대화 요약]" in sent[0].content
+    assert [m.type for m in sent[1:]] == ["human", "ai", "human"]
+    await compactor.drain()
+
+
+@pytest.mark.asyncio
+async def test_compaction_waits_for_the_running_turn(compaction_enabled, monkeypatch):
+    compactor, _ = compaction_enabled
+    service = ChatService()
+    config = {"configurable": {"thread_id": "busy-thread"}}
+    monkeypatch.setattr(settings, "compaction_threshold_tokens", 100_000)
+    for turn in range(3):
+        await service.chat(message=f"질문 {turn}", conversation_id="busy-thread", model="fake-chat")
+    await compactor.drain()
+    monkeypatch.setattr(settings, "compaction_threshold_tokens", 200)
+
+    async with compactor.turn("chat", "busy-thread"):
+        compactor.schedule("chat", service.graph, config, "fake-chat")
+        await asyncio.sleep(0.05)
+        # 턴이 잠금을 쥐고 있는 동안에는 상태를 바꾸지 않음
+        assert compactor.stats()["running"] == 1
+        assert len((await service.graph.aget_state(config)).values["messages"]) == 6
+    await compactor.drain()
+
+    messages = (await service.graph.aget_state(config)).values["messages"]
+    assert compactor.compactions == 1 and len(messages) == 3
+
+
+@pytest.mark.asyncio
+async def test_compaction_skips_a_thread_another_worker_holds(compaction_enabled, monkeypatch, tmp_path):
+    compactor, _ = compaction_enabled
+    path = str(tmp_path / "shared.sqlite3")
+    here, other_worker = SharedState(path=path, enabled=True), SharedState(path=path, enabled=True)
+    monkeypatch.setattr(compaction_module, "shared_state", here)
+    service = ChatService()
+    config = {"configurable": {"thread_id": "remote-turn"}}
+    monkeypatch.setattr(settings, "compaction_threshold_tokens", 100_000)
+    for turn in range(3):
+        await service.chat(message=f"질문 {turn}", conversation_id="remote-turn", model="fake-chat")
+    monkeypatch.setattr(settings, "compaction_threshold_tokens", 200)
+
+    # 다른 워커에서 이 스레드의 턴이 진행 중이면 상태를 교체하지 않음
+    async with other_worker.lease("chat", "remote-turn"):
+        compactor.schedule("chat", service.graph, config, "fake-chat")
+        await compactor.drain()
+    assert compactor.skipped == 1 and compactor.compactions == 0
+
+    compactor.schedule("chat", service.graph, config, "fake-chat")
+    await compactor.drain()
+    assert compactor.compactions == 1
+    here.close()
+    other_worker.close()
+
+
+@pytest.mark.asyncio
+async def test_turns_take_the_shared_lease_without_compaction(monkeypatch, tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    here, other_worker = SharedState(path=path, enabled=True), SharedState(path=path, enabled=True)
+    monkeypatch.setattr(compaction_module, "shared_state", here)
+    compactor = ConversationCompactor(enabled=False)
+
+    async with compactor.turn("chat", "t1"):
+        async with other_worker.lease("chat", "t1", wait=False) as held:
+            assert not held
+        # 같은 ID라도 다른 그래프의 스레드는 별개
+        async with other_worker.lease("tools", "t1", wait=False) as held:
+            assert held
+    here.close()
+    other_worker.close()
@@ -0,0 +1,128 @@
+"""
+컨텍스트 예산 테스트
+토큰 수 메모이제이션, 시스템 프롬프트/최근 턴 유지, 오래된 턴 제외/자르기, 도구 호출 묶음, 레지스트리 연동을 검증
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from app.services.context_budget import TRUNCATION_MARK, ContextBudget, HeuristicTokenizer, get_tokenizer
+from app.services.fake_llm import FakeChatModel
+from app.services.model_registry import ModelRegistry
+
+
+def history(turns: int, words: int = 50):
+    messages = [SystemMessage(content="시스템 프롬프트")]
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"질문{turn} " + "word " * words))
+        messages.append(AIMessage(content=f"답변{turn} " + "word " * words))
+    messages.append(HumanMessage(content="마지막 질문"))
+    return messages
+
+
+def test_heuristic_tokenizer_counts_and_truncates():
+    tokenizer = HeuristicTokenizer()
+
+    assert tokenizer.count("abcdefgh") == 2
+    assert tokenizer.count("안녕하세요") == 5
+    assert tokenizer.count(tokenizer.truncate("안녕하세요 abcd", 3)) <= 3
+
+
+def test_under_budget_history_is_untouched():
+    budget = ContextBudget(default_budget=10_000, keep_recent_turns=1)
+    messages = history(3)
+
+    fitted = budget.fit("fake-model", "fake", messages, max_tokens=100)
+
+    assert fitted.messages == messages and fitted.dropped == 0
+
+
+def test_old_turns_are_dropped_and_truncated_to_fit():
+    budget = ContextBudget(default_budget=400, keep_recent_turns=2)
+    messages = history(10)
+
+    fitted = budget.fit("fake-model", "fake", messages, max_tokens=100)
+
+    assert fitted.prompt_tokens <= 300 and not fitted.over_budget
+    assert isinstance(fitted.messages[0], SystemMessage)
+    # 최근 2턴(직전 질문/답변 + 마지막 질문)은 그대로 유지
+    assert fitted.messages[-3:] == messages[-3:]
+    assert fitted.dropped > 0
+    truncated = [m for m in fitted.messages if m.content.endswith(TRUNCATION_MARK)]
+    assert len(truncated) == fitted.truncated <= 1
+
+
+def test_protected_context_is_kept_even_over_budget():
+    budget = ContextBudget(default_budget=150, keep_recent_turns=1)
+    messages = [SystemMessage(content="규칙 " * 200), HumanMessage(content="질문 " * 10), HumanMessage(content="마지막")]
+
+    fitted = budget.fit("fake-model", "fake", messages, max_tokens=100)
+
+    assert fitted.over_budget
+    assert fitted.messages == [messages[0], messages[2]]
+
+
+def test_tool_calls_and_results_are_dropped_together():
+    budget = ContextBudget(default_budget=160, keep_recent_turns=1)
+    messages = [
+        SystemMessage(content="시스템"),
+        HumanMessage(content="경력 알려줘"),
+        AIMessage(content="", tool_calls=[{"name": "get_careers_by_profile", "args": {"profile_id": "p1"}, "id": "c1"}]),
+        ToolMessage(content="경력 " * 40, tool_call_id="c1"),
+        AIMessage(content="경력 요약"),
+        HumanMessage(content="고마워"),
+    ]
+
+    fitted = budget.fit("fake-model", "fake", messages, max_tokens=100)
+
+    kept_types = [m.type for m in fitted.messages]
+    assert "tool" not in kept_types
+    assert not any(isinstance(m, AIMessage) and m.tool_calls for m in fitted.messages)
+    assert fitted.messages[-1].content == "고마워"
+
+
+def test_message_counts_are_memoized_and_tokenizers_cached():
+    budget = ContextBudget(default_budget=10_000)
+    messages = history(5)
+
+    budget.fit("fake-model", "fake", messages)
+    budget.fit("fake-model", "fake", messages + [AIMessage(content="새 답변"), HumanMessage(content="새 질문")])
+
+    assert budget.misses == len(messages) + 2
+    assert budget.hits == len(messages)
+    assert get_tokenizer("fake", "fake-model") is get_tokenizer("fake", "fake-model")
+
+
+def test_memo_keys_do_not_hold_message_text():
+    budget = ContextBudget(default_budget=10_000)
+    tool_output = "대용량 도구 결과 " * 10_000
+    tokenizer = get_tokenizer("fake", "fake-model")
+
+    count = budget.count_message(ToolMessage(content=tool_output, tool_call_id="call-1"), tokenizer)
+
+    assert budget.count_message(ToolMessage(content=tool_output, tool_call_id="call-2"), tokenizer) == count
+    assert budget.count_message(HumanMessage(content=tool_output), tokenizer) == count
+    assert budget.hits == 1 and budget.misses == 2
+    assert all(len(key[1]) == 16 for key in budget._counts)
+
+
+class RecordingFakeModel(FakeChatModel):
+    seen: list = []
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.seen.append(list(messages))
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_registry_sends_budgeted_history_to_the_model():
+    llm = RecordingFakeModel(ttft=0, tokens_per_second=0, output_tokens=3, seen=[])
+    registry = ModelRegistry(context=ContextBudget(default_budget=300, keep_recent_turns=1))
+    registry.client = lambda spec: llm
+    messages = history(20)
+
+    await registry.ainvoke("fake-budget", messages, {"configurable": {"max_tokens": 100}})
+
+    sent = llm.seen[0]
+    assert len(sent) < len(messages)
+    assert sent[0] == messages[0] and sent[-1] == messages[-1]
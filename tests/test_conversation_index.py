@@ -0,0 +1,193 @@
+"""
+대화 목록 인덱스 테스트
+턴 단위 증분 갱신(제목/메시지 수/미리보기), 최신순 커서 페이지, 기록 교체, 크기 제한, scope 구분,
+체크포인터 삭제/만료 연동, SQLite 저장, 목록 API를 검증
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import HumanMessage, RemoveMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from app.services import chat_service as chat_service_module
+from app.services.chat_service import ChatService
+from app.services.checkpointer import BoundedMemorySaver
+from app.services.conversation_index import ConversationIndex, SQLiteConversationIndex, TurnRecord
+from app.services.fake_llm import FakeChatModel
+from app.services.sqlite_checkpointer import SQLiteSaver
+from app.services.model_registry import model_registry
+from main import app
+
+
+def record(
+    conversation_id: str,
+    question: str,
+    answer: str,
+    timestamp: float,
+    reset: bool = False,
+    scope: str = "chat"
+) -> TurnRecord:
+    messages = [HumanMessage(content=question)]
+    if reset:
+        messages = [RemoveMessage(id=REMOVE_ALL_MESSAGES)] + messages
+    turn = TurnRecord.from_turn(scope, conversation_id, messages, answer)
+    turn.timestamp = timestamp
+    return turn
+
+
+async def paginate(index: ConversationIndex, limit: int):
+    pages, cursor = [], None
+    while True:
+        conversations, cursor = await index.list(limit=limit, cursor=cursor)
+        pages.append([summary.conversation_id for summary in conversations])
+        if cursor is None:
+            return pages
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def index(request, tmp_path):
+    if request.param == "memory":
+        yield ConversationIndex(max_entries=100)
+        return
+    index = SQLiteConversationIndex(path=str(tmp_path / "index.sqlite3"))
+    yield index
+    index.close()
+
+
+@pytest.mark.asyncio
+async def test_turns_update_the_summary_incrementally(index):
+    index._apply(record("c1", "파이썬 비동기 프로그래밍에 대해 처음부터 자세히 설명해 주실 수 있나요? " * 2, "물론입니다", 10.0))
+    index._apply(record("c1", "예제도 보여줘", "async def main(): ...", 20.0))
+
+    summary = await index.get("chat", "c1")
+
+    assert summary.title.startswith("파이썬 비동기") and len(summary.title) <= 50
+    assert summary.message_count == 4
+    assert summary.preview == "async def main(): ..."
+    assert summary.created_at.timestamp() == 10.0 and summary.last_updated.timestamp() == 20.0
+
+    # client 모드 기록 교체는 메시지 수와 제목을 다시 시작
+    index._apply(record("c1", "새 주제", "네", 30.0, reset=True))
+    summary = await index.get("chat", "c1")
+    assert summary.title == "새 주제" and summary.message_count == 2
+
+
+@pytest.mark.asyncio
+async def test_pages_are_most_recent_first_and_cursor_stable(index):
+    for number in range(7):
+        index._apply(record(f"c{number}", "질문", "답변", float(number)))
+    index._apply(record("c2", "다시 질문", "답변", 100.0))
+
+    assert await paginate(index, 3) == [["c2", "c6", "c5"], ["c4", "c3", "c1"], ["c0"]]
+
+    with pytest.raises(ValueError):
+        await index.list(cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_scopes_are_separate_conversations(index):
+    index._apply(record("c1", "일반 질문", "일반 답변", 10.0))
+    index._apply(record("c1", "프로필 질문", "프로필 답변", 20.0, scope="tools"))
+    index._apply(record("c1", "일반 후속 질문", "일반 후속 답변", 30.0))
+
+    chat, tools = await index.get("chat", "c1"), await index.get("tools", "c1")
+
+    assert (chat.title, chat.message_count, chat.preview) == ("일반 질문", 4, "일반 후속 답변")
+    assert (tools.title, tools.message_count, tools.preview) == ("프로필 질문", 2, "프로필 답변")
+    conversations, _ = await index.list(limit=10)
+    assert [(c.scope, c.conversation_id) for c in conversations] == [("chat", "c1"), ("tools", "c1")]
+    conversations, cursor = await index.list(limit=1)
+    assert [c.scope for c in (await index.list(limit=1, cursor=cursor))[0]] == ["tools"]
+    assert (await index.stats())["conversations"] == 2
+
+    index.discard("tools", "c1")
+
+    assert await index.get("tools", "c1") is None and await index.get("chat", "c1") is not None
+    assert (await index.stats())["removed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_index_drops_least_recently_updated():
+    index = ConversationIndex(max_entries=2)
+    for number in range(3):
+        index._apply(record(f"c{number}", "질문", "답변", float(number)))
+
+    assert (await index.stats())["conversations"] == 2 and index._get("chat", "c0") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_index_limits_each_scope_and_skips_stale_keys():
+    index = ConversationIndex(max_entries=2)
+    for number in range(3):
+        index._apply(record(f"c{number}", "질문", "답변", float(number)))
+    index._apply(record("t0", "질문", "답변", 0.5, scope="tools"))
+    # 같은 대화의 반복 갱신은 목록에 한 번만 나타남
+    for timestamp in (3.0, 3.0, 4.0):
+        index._apply(record("c1", "질문", "답변", timestamp))
+
+    conversations, _ = await index.list(limit=10)
+
+    assert [(c.scope, c.conversation_id) for c in conversations] == [("chat", "c1"), ("chat", "c2"), ("tools", "t0")]
+    assert len(index._keys) <= 2 * len(index._entries)
+
+
+def test_checkpointer_eviction_and_deletion_remove_conversations():
+    index = ConversationIndex()
+    saver = BoundedMemorySaver(max_threads=1, scope="tools")
+    saver.removal_listeners.append(index.discard)
+    for conversation_id in ("old", "new"):
+        index._apply(record(conversation_id, "질문", "답변", 1.0, scope="tools"))
+    index._apply(record("old", "질문", "답변", 1.0))
+    saver._touch("old")
+    saver._touch("new")
+
+    saver._evict(keep="new")
+    assert index._get("tools", "old") is None and index._get("chat", "old") is not None
+
+    saver.delete_thread("new")
+    assert index._get("tools", "new") is None
+
+
+def test_sqlite_cache_eviction_keeps_conversations(tmp_path):
+    index = ConversationIndex()
+    saver = SQLiteSaver(path=str(tmp_path / "checkpoints.sqlite3"), max_threads=1)
+    saver.removal_listeners.append(index.discard)
+    try:
+        for conversation_id in ("old", "new"):
+            index._apply(record(conversation_id, "질문", "답변", 1.0))
+            saver._touch(conversation_id)
+
+        # 캐시에서만 내려가고 데이터베이스에는 남아 있음
+        saver._evict(keep="new")
+        assert index._get("chat", "old") is not None
+
+        saver.delete_thread("old")
+        assert index._get("chat", "old") is None
+    finally:
+        saver.close()
+
+
+def test_listing_endpoint_serves_service_turns(monkeypatch):
+    index = ConversationIndex()
+    monkeypatch.setattr(chat_service_module, "conversation_index", index)
+    monkeypatch.setattr("app.api.endpoints.chat.conversation_index", index)
+    llm = FakeChatModel(model="fake-index", ttft=0, tokens_per_second=0, output_tokens=4)
+    monkeypatch.setattr(model_registry, "client", lambda spec: llm)
+    service = ChatService()
+
+    async def turns():
+        for conversation_id in ("a", "b", "a"):
+            await service.chat(message=f"{conversation_id} 질문", conversation_id=conversation_id, model="fake-index")
+
+    asyncio.run(turns())
+
+    response = TestClient(app).get("/api/v1/chat/conversations", params={"limit": 1})
+    body = response.json()
+    assert response.status_code == 200
+    assert [c["conversation_id"] for c in body["conversations"]] == ["a"]
+    assert body["conversations"][0]["message_count"] == 4 and body["conversations"][0]["title"] == "a 질문"
+
+    response = TestClient(app).get("/api/v1/chat/conversations", params={"limit": 1, "cursor": body["next_cursor"]})
+    assert [c["conversation_id"] for c in response.json()["conversations"]] == ["b"]
+    assert response.json()["next_cursor"] is None
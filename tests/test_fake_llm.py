@@ -0,0 +1,130 @@
+"""
+가짜 LLM 프로바이더 테스트
+결정적 출력, 토큰 콜백, 길이/지연 설정, 오류 주입, 스크립트된 도구 호출과 LangGraph 전체 경로를 검증
+"""
+import time
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import HumanMessage
+
+from app.core.config import settings
+from app.services.chat_service import ChatService
+from app.services.chat_tool_service import ChatToolService
+from app.services.fake_llm import FakeChatModel, FakeProviderError
+from app.services.model_registry import ModelRegistry, model_registry
+
+
+async def collect(llm, messages, **kwargs):
+    response = None
+    async for chunk in llm.astream(messages, **kwargs):
+        response = chunk if response is None else response + chunk
+    return response
+
+
+@pytest.mark.asyncio
+async def test_same_seed_replays_same_output():
+    messages = [HumanMessage(content="안녕")]
+    first = await collect(FakeChatModel(ttft=0, tokens_per_second=0, output_tokens=20, output_tokens_stddev=5), messages)
+    second = await collect(FakeChatModel(ttft=0, tokens_per_second=0, output_tokens=20, output_tokens_stddev=5), messages)
+
+    assert first.content == second.content
+    assert first.usage_metadata["output_tokens"] == len(first.content.split())
+
+
+@pytest.mark.asyncio
+async def test_each_token_reaches_callbacks_once():
+    class TokenCounter(AsyncCallbackHandler):
+        tokens = []
+
+        async def on_llm_new_token(self, token, **kwargs):
+            self.tokens.append(token)
+
+    counter = TokenCounter()
+    response = await collect(
+        FakeChatModel(ttft=0, tokens_per_second=0, output_tokens=5),
+        [HumanMessage(content="안녕")],
+        config={"callbacks": [counter]}
+    )
+
+    assert "".join(counter.tokens) == response.content
+
+
+@pytest.mark.asyncio
+async def test_length_is_capped_by_max_tokens_and_timing_is_simulated():
+    llm = FakeChatModel(ttft=0.05, tokens_per_second=200, output_tokens=10)
+
+    start = time.perf_counter()
+    response = await collect(llm.bind(max_tokens=4), [HumanMessage(content="안녕")])
+    elapsed = time.perf_counter() - start
+
+    assert len(response.content.split()) == 4
+    assert elapsed >= 0.05 + 3 / 200
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_retried_then_fall_back():
+    registry = ModelRegistry(fallbacks={"fake-flaky": ["fake-stable"]})
+    llms = {
+        "fake-flaky": FakeChatModel(model="fake-flaky", ttft=0, error_rate=1.0, error_status=503),
+        "fake-stable": FakeChatModel(model="fake-stable", ttft=0, tokens_per_second=0, output_tokens=3),
+    }
+    registry.client = lambda spec: llms[spec.name]
+
+    response = await registry.ainvoke("fake-flaky", [HumanMessage(content="안녕")])
+
+    assert len(response.content.split()) == 3
+    assert llms["fake-flaky"]._calls == settings.llm_max_retries + 1
+    with pytest.raises(FakeProviderError):
+        await collect(llms["fake-flaky"], [HumanMessage(content="안녕")])
+
+
+@pytest.mark.asyncio
+async def test_scripted_tool_call_targets_profile_in_prompt():
+    from app.services.tools import get_careers_by_profile, get_profile_info
+
+    llm = FakeChatModel(ttft=0, tool_calls=["get_careers_by_profile"])
+    profile_id = "12345678-1234-1234-1234-123456789abc"
+
+    response = await collect(
+        llm.bind_tools([get_profile_info, get_careers_by_profile]),
+        [HumanMessage(content=f"프로필 {profile_id} 경력 알려줘")]
+    )
+
+    assert response.tool_calls[0]["name"] == "get_careers_by_profile"
+    assert response.tool_calls[0]["args"] == {"profile_id": profile_id}
+
+
+@pytest.mark.asyncio
+async def test_fake_model_runs_through_basic_chat_graph():
+    chunks = [c async for c in ChatService().stream_chat(message="안녕", model="fake-basic-test")]
+
+    assert chunks[-1].is_final
+    assert "".join(c.content for c in chunks if not c.is_final).count(" ") == settings.fake_llm_output_tokens - 1
+
+
+@pytest.mark.asyncio
+async def test_scripted_tool_calls_run_the_react_loop(monkeypatch):
+    monkeypatch.setattr(settings, "fake_llm_models", {
+        "fake-tools-test": {
+            "ttft": 0,
+            "tokens_per_second": 0,
+            "output_tokens": 5,
+            "tool_calls": ["get_profile_info", "get_careers_by_profile"]
+        }
+    })
+    profile_id = "12345678-1234-1234-1234-123456789abc"
+
+    chunks = [
+        c async for c in ChatToolService().stream_chat_with_profile_tools(
+            message="프로필과 경력 알려줘", profile_id=profile_id, model="fake-tools-test"
+        )
+    ]
+
+    calls = [c for c in chunks if c.chunk_type == "tool_calling"]
+    results = [c for c in chunks if c.chunk_type == "tool_result"]
+    answer = "".join(c.content for c in chunks if c.chunk_type == "ai_response")
+    assert [c.content for c in calls] == ["도구 호출 중: get_profile_info", "도구 호출 중: get_careers_by_profile"]
+    assert len(results) == 2
+    assert len(answer.split()) == 5
+    assert model_registry.provider_for("fake-tools-test") == "fake"
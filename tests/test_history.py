@@ -0,0 +1,80 @@
+"""
+대화 기록 조정 테스트
+server 모드의 체크포인트 기준 중복 제거(id/내용 해시), client 모드의 기록 교체, 서비스 턴 누적을 검증
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage
+
+from app.models.chat import ChatMessage, MessageRole
+from app.services.chat_service import ChatService
+from app.services.compaction import SUMMARY_NAME
+from app.services.fake_llm import FakeChatModel
+from app.services.history import build_input_messages, new_history
+from app.services.model_registry import model_registry
+
+
+def user(content: str, id: str = None) -> ChatMessage:
+    return ChatMessage(role=MessageRole.USER, content=content, id=id)
+
+
+def assistant(content: str, id: str = None) -> ChatMessage:
+    return ChatMessage(role=MessageRole.ASSISTANT, content=content, id=id)
+
+
+def test_resent_history_is_not_appended_again():
+    existing = [HumanMessage(content="안녕", id="h1"), AIMessage(content="안녕하세요!", id="a1")]
+    supplied = [user("안녕"), assistant("안녕하세요!  "), user("날씨 어때?")]
+
+    messages = build_input_messages("날씨 어때?", supplied, existing, mode="server")
+
+    assert [(m.type, m.content) for m in messages] == [("human", "날씨 어때?")]
+
+
+def test_only_messages_after_the_last_known_one_are_added():
+    existing = [
+        SystemMessage(content="요약", name=SUMMARY_NAME, id="s1"),
+        HumanMessage(content="질문1", id="h1"),
+        AIMessage(content="", tool_calls=[{"name": "get_profile_info", "args": {}, "id": "c1"}], id="t1"),
+        AIMessage(content="답변1", id="a1"),
+    ]
+    supplied = [
+        HumanMessage(content="요약된 옛 질문"),
+        HumanMessage(content="질문1"),
+        AIMessage(content="다른 내용", id="a1"),
+        HumanMessage(content="오프라인에서 쓴 메모"),
+    ]
+
+    assert [m.content for m in new_history(existing, supplied)] == ["오프라인에서 쓴 메모"]
+    # 기준점이 없으면 서버 스레드가 우선
+    assert new_history(existing, [HumanMessage(content="모르는 기록")]) == []
+    # 빈 스레드는 보낸 기록으로 시작
+    assert new_history([], supplied) == supplied
+
+
+def test_client_mode_replaces_the_thread():
+    existing = [HumanMessage(content="옛 질문", id="h1")]
+
+    messages = build_input_messages("새 질문", [user("수정된 질문"), assistant("답변")], existing, mode="client")
+
+    assert isinstance(messages[0], RemoveMessage)
+    assert [m.content for m in messages[1:]] == ["수정된 질문", "답변", "새 질문"]
+
+
+@pytest.mark.asyncio
+async def test_thread_grows_by_one_turn_when_clients_resend_history(monkeypatch):
+    llm = FakeChatModel(model="fake-history", ttft=0, tokens_per_second=0, output_tokens=5)
+    monkeypatch.setattr(model_registry, "client", lambda spec: llm)
+    service = ChatService()
+    config = {"configurable": {"thread_id": "resent"}}
+    history = []
+
+    for turn in range(4):
+        question = f"질문 {turn}"
+        answer = await service.chat(
+            message=question, messages=history + [user(question)], conversation_id="resent", model="fake-history"
+        )
+        history += [user(question), assistant(answer)]
+
+    messages = (await service.graph.aget_state(config)).values["messages"]
+    assert [m.content for m in messages if m.type == "human"] == [f"질문 {turn}" for turn in range(4)]
+    assert len(messages) == 8
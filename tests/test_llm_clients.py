@@ -0,0 +1,117 @@
+"""
+LLM 클라이언트 풀 테스트
+"""
+import anthropic
+import pytest
+from langchain_anthropic import ChatAnthropic
+
+from app.core.config import settings
+from app.services.llm_clients import LLMClientPool
+
+
+@pytest.fixture(autouse=True)
+def api_keys(monkeypatch):
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(settings, "anthropic_api_key", "sk-ant-test")
+
+
+def test_pool_reuses_clients_per_configuration():
+    pool = LLMClientPool(max_size=4)
+
+    first = pool.get("openai", "gpt-4o-mini", temperature=0.7, max_tokens=1000)
+    again = pool.get("openai", "gpt-4o-mini", max_tokens=1000, temperature=0.7)
+    other = pool.get("openai", "gpt-4o-mini", temperature=0.2, max_tokens=1000)
+
+    assert first is again
+    assert other is not first
+    assert pool.stats() == {"clients": 2, "hits": 1, "misses": 2}
+
+
+def test_openai_clients_share_one_http_transport():
+    pool = LLMClientPool()
+
+    mini = pool.get("openai", "gpt-4o-mini")
+    full = pool.get("openai", "gpt-4o")
+
+    assert mini.http_async_client is full.http_async_client
+
+
+@pytest.mark.asyncio
+async def test_anthropic_clients_share_one_http_transport(monkeypatch):
+    pool = LLMClientPool()
+
+    haiku = pool.get("anthropic", "claude-3-haiku")
+    sonnet = pool.get("anthropic", "claude-3-sonnet")
+    shared = haiku.http_async_client
+
+    assert sonnet.http_async_client is shared
+    assert shared is not pool.get("openai", "gpt-4o-mini").http_async_client
+
+    sent = []
+
+    async def send(request, **kwargs):
+        sent.append(request)
+        raise RuntimeError("offline")
+
+    monkeypatch.setattr(shared, "send", send)
+    for client in (haiku, sonnet):
+        with pytest.raises(anthropic.APIConnectionError):
+            await client.ainvoke("안녕")
+
+    assert [request.url.path for request in sent] == ["/v1/messages", "/v1/messages"]
+    await pool.aclose()
+    assert shared.is_closed
+
+
+@pytest.mark.asyncio
+async def test_pooled_anthropic_client_keeps_model_connection_settings():
+    pool = LLMClientPool()
+    model = pool.get(
+        "anthropic", "claude-3-haiku",
+        anthropic_api_url="https://proxy.example.com",
+        default_request_timeout=12.0
+    )
+
+    # ChatAnthropic이 비동기 요청에 쓰는 훅이 사라지면 공유 풀이 조용히 무시됨
+    assert "_async_client" in dir(ChatAnthropic)
+    sdk_client = model._async_client
+    assert sdk_client._client is model.http_async_client
+    assert sdk_client.api_key == "sk-ant-test"
+    assert str(sdk_client.base_url).rstrip("/") == "https://proxy.example.com"
+    assert sdk_client.max_retries == 0
+    assert sdk_client.timeout == 12.0
+    await pool.aclose()
+
+
+def test_pool_evicts_least_recently_used_client():
+    pool = LLMClientPool(max_size=2)
+
+    first = pool.get("openai", "gpt-4o-mini")
+    pool.get("anthropic", "claude-3-haiku-20240307")
+    pool.get("openai", "gpt-4o-mini")
+    pool.get("openai", "gpt-4o")
+
+    assert pool.get("openai", "gpt-4o-mini") is first
+    assert pool.stats()["clients"] == 2
+
+
+def test_pool_rejects_unknown_provider():
+    with pytest.raises(ValueError):
+        LLMClientPool().get("unknown", "model")
+
+
+def test_generation_params_bind_to_pooled_client_without_new_clients():
+    from langchain_core.messages import HumanMessage
+
+    from app.services.llm_clients import bind_generation_params, generation_config
+
+    pool = LLMClientPool()
+    client = pool.get("openai", "gpt-4o-mini", temperature=0.7, max_tokens=1000)
+
+    bound = bind_generation_params(client, generation_config("t1", temperature=0.2, max_tokens=50))
+    payload = client._get_request_payload([HumanMessage(content="hi")], **bound.kwargs)
+
+    assert payload["temperature"] == 0.2
+    assert payload.get("max_completion_tokens", payload.get("max_tokens")) == 50
+    assert bind_generation_params(client, generation_config("t1")) is client
+    assert pool.stats()["clients"] == 1
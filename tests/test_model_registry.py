@@ -0,0 +1,180 @@
+"""
+모델 레지스트리 테스트
+프로바이더 매핑, 폴백 체인, 첫 토큰 타임아웃, 동시 실행 제한, 헤징을 검증
+"""
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.core.config import settings
+from app.services.model_registry import ModelRegistry
+
+
+class FailingLLM(GenericFakeChatModel):
+    """첫 토큰 전에 실패하는 테스트용 LLM"""
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        raise ConnectionError("provider down")
+        yield
+
+
+class SlowLLM(GenericFakeChatModel):
+    """첫 토큰이 늦게 나오는 테스트용 LLM"""
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(1)
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+
+
+class BrokenMidStreamLLM(GenericFakeChatModel):
+    """토큰을 보낸 뒤 실패하는 테스트용 LLM"""
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+            raise ConnectionError("stream reset")
+
+
+def fake_llm(cls=GenericFakeChatModel, answer: str = "응답") -> GenericFakeChatModel:
+    return cls(messages=iter([AIMessage(content=answer)] * 4))
+
+
+def make_registry(llms, **kwargs) -> ModelRegistry:
+    registry = ModelRegistry(
+        providers={"primary": "openai", "backup": "anthropic"},
+        fallbacks={"primary": ["backup"]},
+        **kwargs
+    )
+    registry.client = lambda spec: llms[spec.name]
+    return registry
+
+
+def test_models_resolve_to_providers():
+    registry = ModelRegistry(providers={"my-model": "anthropic"}, fallbacks={"*": ["claude-3-5-haiku-latest"]})
+
+    assert registry.spec("gpt-4o-mini").provider == "openai"
+    assert registry.spec("claude-3-5-sonnet-latest").provider == "anthropic"
+    assert registry.spec("my-model").provider == "anthropic"
+    assert [spec.name for spec in registry.chain("gpt-4o")] == ["gpt-4o", "claude-3-5-haiku-latest"]
+    with pytest.raises(ValueError):
+        registry.spec("llama-3")
+
+
+@pytest.mark.asyncio
+async def test_falls_back_when_primary_fails():
+    registry = make_registry({"primary": fake_llm(FailingLLM), "backup": fake_llm(answer="백업 응답")})
+
+    response = await registry.ainvoke("primary", [HumanMessage(content="안녕")])
+
+    assert response.content == "백업 응답"
+
+
+@pytest.mark.asyncio
+async def test_falls_back_when_first_token_is_late():
+    registry = make_registry(
+        {"primary": fake_llm(SlowLLM), "backup": fake_llm(answer="빠른 응답")},
+        first_token_timeouts={"primary": 0.05}
+    )
+
+    response = await registry.ainvoke("primary", [HumanMessage(content="안녕")])
+
+    assert response.content == "빠른 응답"
+
+
+@pytest.mark.asyncio
+async def test_does_not_fall_back_after_tokens_were_emitted():
+    registry = make_registry({"primary": fake_llm(BrokenMidStreamLLM), "backup": fake_llm()})
+
+    with pytest.raises(ConnectionError):
+        await registry.ainvoke("primary", [HumanMessage(content="안녕")])
+
+
+@pytest.mark.asyncio
+async def test_raises_last_error_when_every_model_fails():
+    registry = make_registry({"primary": fake_llm(FailingLLM), "backup": fake_llm(FailingLLM)})
+
+    with pytest.raises(ConnectionError):
+        await registry.ainvoke("primary", [HumanMessage(content="안녕")])
+
+
+@pytest.mark.asyncio
+async def test_saturated_model_hands_off_to_fallback():
+    registry = make_registry(
+        {"primary": fake_llm(SlowLLM, answer="느린 응답"), "backup": fake_llm(answer="백업 응답")},
+        max_concurrency={"primary": 1}
+    )
+
+    first = asyncio.create_task(registry.ainvoke("primary", [HumanMessage(content="하나")]))
+    await asyncio.sleep(0.01)
+    second = await registry.ainvoke("primary", [HumanMessage(content="둘")])
+
+    assert second.content == "백업 응답"
+    assert (await first).content == "느린 응답"
+
+
+@pytest.fixture
+def fast_hedge(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge_initial_delay", 0.05)
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_when_primary_first_token_is_late(fast_hedge):
+    registry = make_registry(
+        {"primary": fake_llm(SlowLLM, answer="느린 응답"), "backup": fake_llm(answer="헤지 응답")},
+        hedging=True
+    )
+
+    response = await registry.ainvoke("primary", [HumanMessage(content="안녕")])
+
+    assert response.content == "헤지 응답"
+    stats = registry.hedge_stats()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    assert stats["hedge_rate"] == 1.0 and stats["win_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_primary_is_fast(fast_hedge):
+    registry = make_registry(
+        {"primary": fake_llm(answer="빠른 응답"), "backup": fake_llm(answer="헤지 응답")},
+        hedging=True
+    )
+
+    response = await registry.ainvoke("primary", [HumanMessage(content="안녕")])
+
+    assert response.content == "빠른 응답"
+    assert registry.hedge_stats()["eligible"] == 1 and registry.hedge_stats()["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_falls_back_when_primary_cannot_fit_context(fast_hedge, monkeypatch):
+    registry = make_registry(
+        {"primary": fake_llm(answer="1차 응답"), "backup": fake_llm(answer="백업 응답")},
+        hedging=True
+    )
+    fit = registry.context.fit
+
+    def fit_or_overflow(model, provider, messages, max_tokens):
+        if model == "primary":
+            raise ValueError("context window exceeded")
+        return fit(model, provider, messages, max_tokens)
+
+    monkeypatch.setattr(registry.context, "fit", fit_or_overflow)
+
+    response = await registry.ainvoke("primary", [HumanMessage(content="안녕")])
+
+    assert response.content == "백업 응답"
+    assert registry.hedge_stats()["hedged"] == 0
+
+
+def test_hedge_delay_follows_ttft_percentile(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge_min_samples", 10)
+    spec = ModelRegistry(providers={"primary": "openai"}).spec("primary")
+
+    assert spec.hedge_delay() == settings.llm_hedge_initial_delay
+    for i in range(1, 101):
+        spec.record_ttft(i / 100)
+
+    assert spec.hedge_delay() == pytest.approx(0.95)
@@ -0,0 +1,111 @@
+"""
+여러 워커 프로세스 테스트
+같은 SQLite 파일을 공유하는(CHECKPOINT_SHARED) uvicorn 프로세스 두 개에 한 대화의 턴을 번갈아 보내고,
+어느 워커로 가도 대화가 이어지는지, 공유 없이 uvicorn --workers로 실행하면 시작을 거부하는지 검증
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+from app.services.sqlite_checkpointer import SQLiteSaver
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_worker(port: int, env: dict, *args: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", *args],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+
+
+def wait_ready(process: subprocess.Popen, url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(process.stderr.read().decode(errors="replace"))
+        try:
+            if httpx.get(f"{url}/api/v1/chat/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"worker at {url} did not start")
+
+
+@pytest.fixture
+def workers(tmp_path):
+    env = dict(
+        os.environ,
+        CHECKPOINT_BACKEND="sqlite",
+        CHECKPOINT_SQLITE_PATH=str(tmp_path / "checkpoints.sqlite3"),
+        CHECKPOINT_SHARED="true",
+        FAKE_LLM_TTFT="0",
+        FAKE_LLM_TOKENS_PER_SECOND="0",
+        FAKE_LLM_OUTPUT_TOKENS="4"
+    )
+    ports = [free_port(), free_port()]
+    processes = [start_worker(port, env) for port in ports]
+    try:
+        urls = [f"http://127.0.0.1:{port}" for port in ports]
+        for process, url in zip(processes, urls):
+            wait_ready(process, url)
+        yield urls, env["CHECKPOINT_SQLITE_PATH"]
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+
+
+def test_turns_continue_on_any_worker(workers):
+    urls, path = workers
+    questions = [f"질문 {turn}" for turn in range(4)]
+
+    for turn, question in enumerate(questions):
+        body = {"message": question, "conversation_id": "shared", "model": "fake-workers", "stream": turn >= 2}
+        url = urls[turn % 2]
+        if turn < 2:
+            response = httpx.post(f"{url}/api/v1/chat/", json=body, timeout=30.0)
+            assert response.status_code == 200
+        else:
+            with httpx.stream("POST", f"{url}/api/v1/chat/stream", json=body, timeout=30.0) as response:
+                assert response.status_code == 200 and "[DONE]" in response.read().decode()
+
+    listing = httpx.get(f"{urls[0]}/api/v1/chat/conversations", timeout=10.0).json()
+    assert listing["conversations"][0]["message_count"] == 8
+
+    saver = SQLiteSaver(path=path, scope="chat")
+    try:
+        checkpoint = saver.get_tuple({"configurable": {"thread_id": "shared"}}).checkpoint
+        messages = checkpoint["channel_values"]["messages"]
+        assert [m.content for m in messages if m.type == "human"] == questions
+        assert len(messages) == 8
+    finally:
+        saver.close()
+
+
+def test_uvicorn_workers_without_shared_state_refuse_to_start():
+    env = dict(os.environ, CHECKPOINT_SHARED="false", WORKERS="1")
+    env.pop("WEB_CONCURRENCY", None)
+    process = start_worker(free_port(), env, "--workers", "2")
+    try:
+        _, stderr = process.communicate(timeout=60)
+    finally:
+        process.kill()
+
+    assert "CHECKPOINT_SHARED" in stderr.decode(errors="replace")
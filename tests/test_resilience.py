@@ -0,0 +1,162 @@
+"""
+재시도/서킷 브레이커 테스트
+재시도 대상 판별, 지터 백오프, 브레이커 상태 전이, 레지스트리 연동과 헬스 체크 노출을 검증
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.services.model_registry import ModelRegistry
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitBreakers,
+    DecorrelatedJitter,
+    circuit_breakers,
+    is_provider_fault,
+    is_retryable,
+)
+
+
+def test_retryable_errors():
+    assert is_retryable(ConnectionError("reset"))
+    assert is_retryable(SimpleNamespace(status_code=503))
+    assert is_retryable(SimpleNamespace(status_code=429))
+    assert not is_retryable(SimpleNamespace(status_code=400))
+    assert not is_retryable(TimeoutError())
+
+
+def test_provider_faults():
+    assert is_provider_fault(ConnectionError("reset"))
+    assert is_provider_fault(SimpleNamespace(status_code=501))
+    assert not is_provider_fault(SimpleNamespace(status_code=400))
+    assert not is_provider_fault(TimeoutError())
+    assert not is_provider_fault(ValueError("empty response"))
+
+
+def test_decorrelated_jitter_stays_within_bounds():
+    backoff = DecorrelatedJitter(base=0.1, cap=1.0)
+    delays = [backoff.next() for _ in range(50)]
+
+    assert all(0.1 <= delay <= 1.0 for delay in delays)
+    assert max(delays) > 0.3
+
+
+def test_breaker_opens_then_probes_in_half_open():
+    breaker = CircuitBreaker("openai", failure_threshold=2, reset_timeout=0)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # reset_timeout이 지나면 한 번의 탐색 호출만 허용
+    assert breaker.allow() and breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+class FlakyLLM(GenericFakeChatModel):
+    """처음 몇 번은 연결 오류로 실패하는 테스트용 LLM"""
+
+    failures: int = 0
+    calls: int = 0
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("connection reset")
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+
+
+def make_registry(llms, **kwargs) -> ModelRegistry:
+    registry = ModelRegistry(
+        providers={"primary": "openai", "backup": "anthropic"},
+        fallbacks={"primary": ["backup"]},
+        **kwargs
+    )
+    registry.client = lambda spec: llms[spec.name]
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_on_the_same_model():
+    primary = FlakyLLM(messages=iter([AIMessage(content="재시도 성공")]), failures=2)
+    backup = GenericFakeChatModel(messages=iter([AIMessage(content="백업 응답")]))
+    registry = make_registry({"primary": primary, "backup": backup}, breakers=CircuitBreakers(failure_threshold=5))
+
+    response = await registry.ainvoke("primary", [HumanMessage(content="안녕")])
+
+    assert response.content == "재시도 성공"
+    assert primary.calls == 3
+    assert registry.breakers.get("openai").state == CircuitBreaker.CLOSED
+
+
+class EmptyLLM(GenericFakeChatModel):
+    """청크 없이 끝나는 테스트용 LLM"""
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        return
+        yield
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_to_fallback():
+    primary = FlakyLLM(messages=iter([AIMessage(content="1차 응답")] * 4), failures=100)
+    backup = GenericFakeChatModel(messages=iter([AIMessage(content="백업 응답")] * 4))
+    registry = make_registry(
+        {"primary": primary, "backup": backup},
+        breakers=CircuitBreakers(failure_threshold=2, reset_timeout=60)
+    )
+
+    # 재시도를 모두 소진한 요청 하나는 실패 한 번으로 집계
+    first = await registry.ainvoke("primary", [HumanMessage(content="하나")])
+    assert primary.calls == 3
+    assert registry.breakers.get("openai").state == CircuitBreaker.CLOSED
+
+    second = await registry.ainvoke("primary", [HumanMessage(content="둘")])
+    calls_after_second = primary.calls
+    third = await registry.ainvoke("primary", [HumanMessage(content="셋")])
+
+    assert first.content == second.content == third.content == "백업 응답"
+    assert calls_after_second == 6
+    assert primary.calls == calls_after_second
+    assert registry.breakers.stats()["openai"]["state"] == CircuitBreaker.OPEN
+
+
+@pytest.mark.asyncio
+async def test_empty_response_does_not_count_against_breaker():
+    backup = GenericFakeChatModel(messages=iter([AIMessage(content="백업 응답")] * 3))
+    registry = make_registry(
+        {"primary": EmptyLLM(messages=iter([])), "backup": backup},
+        breakers=CircuitBreakers(failure_threshold=1, reset_timeout=60)
+    )
+
+    for _ in range(3):
+        response = await registry.ainvoke("primary", [HumanMessage(content="안녕")])
+        assert response.content == "백업 응답"
+
+    assert registry.breakers.get("openai").state == CircuitBreaker.CLOSED
+
+
+def test_health_reports_breaker_state():
+    from main import app
+
+    circuit_breakers.get("anthropic").record_success()
+    breaker = circuit_breakers.get("openai")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    body = TestClient(app).get("/health").json()
+
+    assert body["status"] == "degraded"
+    assert body["providers"]["openai"]["state"] == "open"
+    assert body["providers"]["anthropic"]["state"] == "closed"
@@ -0,0 +1,123 @@
+"""
+응답 캐시 테스트
+정규화된 키, LRU/TTL/크기 제한, ChatService 연동(스트림 재생 포함)을 검증
+"""
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+
+from app.core.config import settings
+from app.models.chat import ChatMessage, MessageRole
+from app.services.chat_service import ChatService
+from app.services.model_registry import model_registry
+from app.services.response_cache import ResponseCache, response_cache
+
+
+def test_key_normalizes_whitespace_and_default_params():
+    key = ResponseCache.make_key("자기소개  해줘 ")
+    history = [ChatMessage(role=MessageRole.USER, content="안녕")]
+
+    assert key == ResponseCache.make_key("자기소개 해줘", temperature=settings.temperature)
+    assert key != ResponseCache.make_key("자기소개 해줘", temperature=0.0)
+    assert key != ResponseCache.make_key("자기소개 해줘", max_tokens=10)
+    assert key != ResponseCache.make_key("자기소개 해줘", model="claude-3-5-haiku-latest")
+    assert key != ResponseCache.make_key("자기소개 해줘", messages=history)
+
+
+def test_evicts_least_recently_used_within_entry_and_byte_limits():
+    cache = ResponseCache(max_entries=2, max_bytes=10, ttl_seconds=60)
+
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+
+    cache.put("d", "dddddddd")
+    assert cache.stats()["bytes"] <= 10
+    assert cache.get("d") == "dddddddd"
+
+    cache.put("huge", "x" * 11)
+    assert cache.get("huge") is None
+
+
+def test_entries_expire_and_hit_ratio_is_reported():
+    cache = ResponseCache(ttl_seconds=0.01)
+
+    cache.put("a", "answer")
+    assert cache.get("a") == "answer"
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+    assert cache.stats()["hit_ratio"] == 0.5
+
+
+@pytest.fixture
+def enabled_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "enabled", True)
+    response_cache.clear()
+    yield response_cache
+    response_cache.clear()
+
+
+def use_llm(monkeypatch, *answers: str) -> GenericFakeChatModel:
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content=a) for a in answers]))
+    monkeypatch.setattr(model_registry, "client", lambda spec: llm)
+    return llm
+
+
+@pytest.mark.asyncio
+async def test_identical_stateless_requests_are_served_from_cache(enabled_cache, monkeypatch):
+    use_llm(monkeypatch, "연락처는 이메일로 주세요")
+    service = ChatService()
+
+    first = await service.chat(message="연락처 알려줘")
+    second = await service.chat(message="연락처  알려줘")
+
+    assert first == second == "연락처는 이메일로 주세요"
+    assert enabled_cache.stats()["hits"] == 1
+
+
+class MultiPartLLM(GenericFakeChatModel):
+    """Anthropic처럼 내용 블록 목록으로 답하는 테스트용 LLM"""
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        yield ChatGenerationChunk(message=AIMessageChunk(content=[
+            {"type": "text", "text": "연락처는 ", "index": 0},
+            {"type": "text", "text": "이메일로 주세요", "index": 1}
+        ]))
+
+
+@pytest.mark.asyncio
+async def test_multi_part_replies_return_the_same_text_as_the_cache(enabled_cache, monkeypatch):
+    llm = MultiPartLLM(messages=iter([]))
+    monkeypatch.setattr(model_registry, "client", lambda spec: llm)
+    service = ChatService()
+    hits = enabled_cache.stats()["hits"]
+
+    first = await service.chat(message="연락처 알려줘")
+    second = await service.chat(message="연락처 알려줘")
+
+    assert first == second == "연락처는 이메일로 주세요"
+    assert enabled_cache.stats()["hits"] == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_cached_answer_replays_as_stream_and_seeds_thread(enabled_cache, monkeypatch):
+    use_llm(monkeypatch, "캐시된 답변입니다", "후속 답변")
+    service = ChatService()
+    await service.chat(message="질문")
+
+    chunks = [chunk async for chunk in service.stream_chat(message="질문", conversation_id="c1")]
+
+    assert chunks[0].content == "캐시된 답변입니다"
+    assert chunks[-1].is_final and chunks[-1].metadata == {"cache": "hit"}
+
+    # 캐시로 응답한 턴도 대화 기록에 남아 후속 질문은 캐시를 거치지 않음
+    follow_up = await service.chat(message="질문", conversation_id="c1")
+    state = await service.graph.aget_state({"configurable": {"thread_id": "c1"}})
+    assert follow_up == "후속 답변"
+    assert [msg.content for msg in state.values["messages"]] == ["질문", "캐시된 답변입니다", "질문", "후속 답변"]
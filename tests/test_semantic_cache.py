@@ -0,0 +1,182 @@
+"""
+시맨틱 캐시 테스트
+해싱 임베더, 유사도 임계값, 프로필 단위 범위/무효화, ChatToolService 연동을 검증
+"""
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from app.services.chat_tool_service import ChatToolService
+from app.services.model_registry import model_registry
+from app.services.profile_service import ProfileService
+from app.services.semantic_cache import HashingEmbedder, ModelEmbedder, SemanticCache, semantic_cache
+
+
+def test_hashing_embedder_is_normalized_and_deterministic():
+    embedder = HashingEmbedder(dimension=256)
+
+    vectors = embedder.embed(["경력 알려줘", "경력 알려줘", "경력을 알려 줘", "오늘 날씨 어때"])
+
+    assert vectors.shape == (4, 256)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert np.array_equal(vectors[0], vectors[1])
+    assert vectors[0] @ vectors[2] > vectors[0] @ vectors[3]
+
+
+def test_lookup_respects_threshold_and_profile_scope():
+    cache = SemanticCache(threshold=0.6)
+
+    cache.store(cache.key("p1"), cache.embed("경력 사항 알려줘"), "경력 답변")
+
+    assert cache.lookup(cache.key("p1"), cache.embed("경력 사항을 알려줘")).answer == "경력 답변"
+    assert cache.lookup(cache.key("p1"), cache.embed("프로젝트 목록 보여줘")) is None
+    assert cache.lookup(cache.key("p2"), cache.embed("경력 사항 알려줘")) is None
+    assert cache.stats()["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_invalidation_drops_profile_and_stale_stores():
+    cache = SemanticCache(threshold=0.6)
+    vector = cache.embed("경력 알려줘")
+    cache.store(cache.key("p1"), vector, "옛 답변")
+
+    generation = cache.generation("p1")
+    cache.invalidate_profile("p1")
+    cache.store(cache.key("p1"), vector, "무효화 전에 계산된 답변", generation)
+
+    assert cache.lookup(cache.key("p1"), vector) is None
+
+
+def test_hashing_embedder_matches_known_paraphrases():
+    cache = SemanticCache()
+
+    cache.store(cache.key("p1"), cache.embed("경력 알려줘"), "경력 답변")
+
+    assert cache.threshold == 0.9
+    assert cache.lookup(cache.key("p1"), cache.embed("커리어 보여줘")).answer == "경력 답변"
+    assert cache.lookup(cache.key("p1"), cache.embed("프로젝트 보여줘")) is None
+
+
+def test_synonyms_are_replaced_only_as_whole_words():
+    embedder = HashingEmbedder(synonyms={"경력": ["커리어"], "프로젝트": ["project"], "알려줘": ["tell me"]})
+
+    assert embedder.canonicalize("커리어를 tell me") == "경력를 알려줘"
+    assert embedder.canonicalize("Projects about a projectile") == "projects about a projectile"
+    assert embedder.canonicalize("hotel menu 내커리어") == "hotel menu 내커리어"
+
+
+def test_answers_are_keyed_by_model_and_generation_params():
+    cache = SemanticCache(threshold=0.6)
+    vector = cache.embed("경력 알려줘")
+
+    cache.store(cache.key("p1", "gpt-4o", 0.2, 512), vector, "gpt-4o 답변")
+
+    assert cache.lookup(cache.key("p1", "gpt-4o", 0.2, 512), vector).answer == "gpt-4o 답변"
+    assert cache.lookup(cache.key("p1", "claude-3-5-sonnet", 0.2, 512), vector) is None
+    assert cache.lookup(cache.key("p1", "gpt-4o", 0.9, 512), vector) is None
+    assert cache.lookup(cache.key("p1", "gpt-4o", 0.2, 64), vector) is None
+
+    cache.invalidate_profile("p1")
+    assert cache.lookup(cache.key("p1", "gpt-4o", 0.2, 512), vector) is None
+
+
+class FakeEmbeddings:
+    """aembed_documents만 쓰는지 확인하는 임베딩 모델"""
+
+    def embed_documents(self, texts):
+        raise AssertionError("blocking embed call")
+
+    async def aembed_documents(self, texts):
+        return [[3.0, 4.0] for _ in texts]
+
+
+@pytest.mark.asyncio
+async def test_model_embedder_embeds_off_the_event_loop():
+    cache = SemanticCache(embedder=ModelEmbedder(FakeEmbeddings()), threshold=0.9)
+
+    vector = await cache.aembed("경력 알려줘")
+    cache.store(cache.key("p1"), vector, "경력 답변")
+
+    assert np.allclose(vector, [0.6, 0.8])
+    assert cache.lookup(cache.key("p1"), vector).answer == "경력 답변"
+
+
+def test_profile_index_keeps_latest_entries():
+    cache = SemanticCache(threshold=0.99, max_entries_per_profile=2)
+    for question in ["첫번째 질문", "두번째 질문", "세번째 질문"]:
+        cache.store(cache.key("p1"), cache.embed(question), question)
+
+    assert cache.lookup(cache.key("p1"), cache.embed("첫번째 질문")) is None
+    assert cache.lookup(cache.key("p1"), cache.embed("세번째 질문")).answer == "세번째 질문"
+    assert cache.stats()["entries"] == 2
+
+
+@pytest.fixture
+def enabled_semantic_cache(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "enabled", True)
+    monkeypatch.setattr(semantic_cache, "threshold", 0.6)
+    semantic_cache.clear()
+    yield semantic_cache
+    semantic_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_profile_assistant_reuses_answer_for_similar_question(enabled_semantic_cache, monkeypatch):
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="자기소개 답변입니다")]))
+    monkeypatch.setattr(model_registry, "client", lambda spec: llm)
+    monkeypatch.setattr(GenericFakeChatModel, "bind_tools", lambda self, tools, **kwargs: self, raising=False)
+    service = ChatToolService()
+
+    first = [c async for c in service.stream_chat_with_profile_tools(message="자기소개 해줘", profile_id="p1")]
+    second = [c async for c in service.stream_chat_with_profile_tools(message="자기소개를 해줘", profile_id="p1")]
+
+    assert "".join(c.content for c in first if c.chunk_type == "ai_response") == "자기소개 답변입니다"
+    assert second[0].content == "자기소개 답변입니다"
+    assert second[-1].metadata["cache"] == "semantic"
+
+
+class FakeTable:
+    """update/delete 체인을 흉내내는 Supabase 테이블"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+@pytest.mark.asyncio
+async def test_profile_changes_invalidate_cached_answers(enabled_semantic_cache):
+    profile_id = uuid4()
+    career = {"id": str(uuid4()), "profile_id": str(profile_id), "company_name": "회사", "position": "개발자",
+              "start_date": "2020-01-01", "created_at": "2020-01-01T00:00:00", "updated_at": "2020-01-01T00:00:00"}
+    service = ProfileService.__new__(ProfileService)
+    service.client = SimpleNamespace(table=lambda name: FakeTable([career]))
+    vector = semantic_cache.embed("경력 알려줘")
+    semantic_cache.store(semantic_cache.key(profile_id), vector, "옛 경력 답변")
+    semantic_cache.store(semantic_cache.key(profile_id, "other-model"), vector, "다른 모델의 옛 경력 답변")
+
+    await service.delete_career(uuid4())
+
+    assert semantic_cache.lookup(semantic_cache.key(profile_id), vector) is None
+    assert semantic_cache.lookup(semantic_cache.key(profile_id, "other-model"), vector) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_invalidation_does_not_fail_the_profile_write(monkeypatch):
+    profile_id = uuid4()
+    service = ProfileService.__new__(ProfileService)
+    service.client = SimpleNamespace(table=lambda name: FakeTable([{"id": str(profile_id)}]))
+
+    async def broken(profile_id):
+        raise ConnectionError("shared state unavailable")
+
+    monkeypatch.setattr(semantic_cache, "ainvalidate_profile", broken)
+
+    assert await service.delete_profile(profile_id) is True
@@ -0,0 +1,128 @@
+"""
+워커 간 공유 상태 테스트
+같은 SQLite 파일을 쓰는 두 프로세스처럼 동작하는 인스턴스로 프로필 캐시 무효화 전파, 스레드 임대 배타성/만료/갱신,
+이벤트 루프 밖 체크포인트 최신성 확인, 공유 없는 다중 워커 시작 거부(설정, WEB_CONCURRENCY, 감독 프로세스의 다른 워커)를 검증
+"""
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import HumanMessage
+
+from app.core import workers as workers_module
+from app.core.config import settings
+from app.core.workers import SiblingWorkerGuard, check_process_model
+from app.services.semantic_cache import SemanticCache
+from app.services.shared_state import SharedState
+from app.services.sqlite_checkpointer import SQLiteSaver
+from main import app
+
+
+@pytest.fixture
+def states(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    workers = [SharedState(path=path, enabled=True), SharedState(path=path, enabled=True)]
+    yield workers
+    for state in workers:
+        state.close()
+
+
+@pytest.mark.asyncio
+async def test_profile_invalidation_reaches_other_workers(states):
+    first, second = (SemanticCache(threshold=0.9, enabled=True, shared=state) for state in states)
+    vector = second.embed("경력 알려줘")
+    generation = second.generation("p1")
+    second.store(second.key("p1"), vector, "예전 답변", generation)
+
+    await first.ainvalidate_profile("p1")
+    await second.refresh("p1")
+
+    assert second.lookup(second.key("p1"), vector) is None
+    # 무효화 전에 계산된 답변은 저장되지 않음
+    second.store(second.key("p1"), vector, "늦게 끝난 예전 답변", generation)
+    assert second.lookup(second.key("p1"), vector) is None
+
+
+@pytest.mark.asyncio
+async def test_thread_lease_is_exclusive_across_workers(states):
+    first, second = states
+
+    async with first.lease("chat", "t1") as held:
+        assert held
+        async with second.lease("chat", "t1", wait=False) as other:
+            assert not other
+    async with second.lease("chat", "t1", wait=False) as other:
+        assert other
+
+    # 해제되지 않은 임대(프로세스 종료)는 만료 후 다른 워커가 가져감
+    first.lease_seconds = 0.05
+    assert first._acquire("chat", "t2", "crashed-worker")
+    await asyncio.sleep(0.1)
+    async with second.lease("chat", "t2") as held:
+        assert held and second.lease_waits == 0
+
+
+@pytest.mark.asyncio
+async def test_held_lease_is_renewed_past_its_lifetime(states):
+    first, second = states
+    first.lease_seconds = 0.05
+
+    async with first.lease("chat", "t1") as held:
+        assert held
+        await asyncio.sleep(0.2)
+        async with second.lease("chat", "t1", wait=False) as other:
+            assert not other
+    assert first.stats()["leases_lost"] == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_staleness_check_runs_off_the_event_loop(tmp_path):
+    saver = SQLiteSaver(path=str(tmp_path / "checkpoints.sqlite3"), shared=True)
+    checked_on = []
+    is_current = saver._is_current
+
+    def recording(thread_id):
+        checked_on.append(threading.get_ident())
+        return is_current(thread_id)
+
+    saver._is_current = recording
+    await saver.aget_tuple({"configurable": {"thread_id": "t1", "checkpoint_ns": ""}})
+
+    assert checked_on and threading.get_ident() not in checked_on
+    await saver.aclose()
+
+
+def test_several_workers_require_shared_state(monkeypatch):
+    monkeypatch.setattr(settings, "workers", 2)
+    monkeypatch.setattr(settings, "checkpoint_shared", False)
+
+    with pytest.raises(RuntimeError, match="CHECKPOINT_SHARED"):
+        with TestClient(app):
+            pass
+
+
+def test_web_concurrency_and_reload_are_checked(monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_shared", True)
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+
+    with pytest.raises(RuntimeError, match="reload"):
+        check_process_model(reload=True)
+    check_process_model()
+
+    monkeypatch.setattr(settings, "checkpoint_shared", False)
+    with pytest.raises(RuntimeError, match="CHECKPOINT_SHARED"):
+        check_process_model()
+
+
+def test_second_worker_of_a_supervisor_is_detected(monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_shared", False)
+    monkeypatch.setattr(workers_module.multiprocessing, "parent_process", lambda: object())
+    first, second = SiblingWorkerGuard(), SiblingWorkerGuard()
+
+    check_process_model(guard=first)
+    with pytest.raises(RuntimeError, match="Another worker"):
+        check_process_model(guard=second)
+    first.release()
+    check_process_model(guard=second)
+    second.release()
@@ -0,0 +1,172 @@
+"""
+SQLite 체크포인터 테스트
+재시작 후 대화 복원, write-behind 배치 커밋, 정리/삭제의 디스크 반영, 복원 시 보관 개수를 넘는 행 정리, 압축 저장, scope 분리,
+같은 파일을 공유하는 여러 체크포인터(shared 모드)의 대화 연속성을 검증
+"""
+import sqlite3
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import Annotated, TypedDict
+
+from app.services.sqlite_checkpointer import SQLiteSaver
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build_graph(saver: SQLiteSaver, reply_size: int = 20):
+    async def reply(state: State):
+        return {"messages": [AIMessage(content=f"답변 {len(state['messages'])} " + "x" * reply_size)]}
+
+    workflow = StateGraph(State)
+    workflow.add_node("reply", reply)
+    workflow.set_entry_point("reply")
+    workflow.add_edge("reply", END)
+    return workflow.compile(checkpointer=saver)
+
+
+async def turn(graph, thread_id: str, text: str = "질문"):
+    config = {"configurable": {"thread_id": thread_id}}
+    return await graph.ainvoke({"messages": [HumanMessage(content=text)]}, config)
+
+
+def rows(path, table: str) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+@pytest.mark.asyncio
+async def test_conversation_survives_a_restart(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    saver = SQLiteSaver(path=path)
+    graph = build_graph(saver)
+    await turn(graph, "t1", "첫 질문")
+    await turn(graph, "t1", "두번째 질문")
+    await saver.aclose()
+
+    restarted = SQLiteSaver(path=path)
+    graph = build_graph(restarted)
+    result = await turn(graph, "t1", "세번째 질문")
+
+    assert [m.content for m in result["messages"] if m.type == "human"] == ["첫 질문", "두번째 질문", "세번째 질문"]
+    assert restarted.loads == 1
+    await restarted.aclose()
+
+
+@pytest.mark.asyncio
+async def test_writes_are_committed_in_batches(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    saver = SQLiteSaver(path=path, flush_interval=10.0, flush_max_batch=10_000)
+    graph = build_graph(saver)
+
+    for index in range(5):
+        await turn(graph, f"t{index}")
+    # 타이머가 끝나기 전에는 아무것도 커밋되지 않음
+    assert saver.stats()["queued_ops"] > 0 and rows(path, "checkpoints") == 0
+
+    assert await saver.aflush(timeout=5)
+    assert saver.batches == 1 and saver.stats()["queued_ops"] == 0
+    assert rows(path, "checkpoints") == sum(len(saver.storage[f"t{index}"][""]) for index in range(5))
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    await saver.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pruning_and_delete_reach_the_database(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    saver = SQLiteSaver(path=path, keep_checkpoints=2)
+    graph = build_graph(saver)
+    for index in range(4):
+        await turn(graph, "t1", f"질문 {index}")
+    await saver.aflush()
+
+    assert rows(path, "checkpoints") == 2
+
+    await saver.adelete_thread("t1")
+    await saver.aflush()
+    assert rows(path, "checkpoints") == rows(path, "blobs") == rows(path, "writes") == rows(path, "messages") == 0
+    assert await saver.aget_tuple({"configurable": {"thread_id": "t1"}}) is None
+    await saver.aclose()
+
+
+@pytest.mark.asyncio
+async def test_restore_prunes_rows_beyond_keep_checkpoints(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    saver = SQLiteSaver(path=path, keep_checkpoints=10)
+    graph = build_graph(saver)
+    for index in range(4):
+        await turn(graph, "t1", f"질문 {index}")
+    await saver.aclose()
+
+    # 보관 개수가 줄어든 채로 다시 읽으면 오래된 체크포인트와 그것만 참조하던 blob/메시지를 함께 정리
+    smaller = SQLiteSaver(path=path, keep_checkpoints=2)
+    await build_graph(smaller).aget_state({"configurable": {"thread_id": "t1"}})
+    await smaller.aclose()
+    assert rows(path, "checkpoints") == 2
+
+    # 남은 체크포인트는 모두 메시지를 온전히 읽을 수 있음
+    restarted = SQLiteSaver(path=path, keep_checkpoints=10)
+    history = [state async for state in build_graph(restarted).aget_state_history({"configurable": {"thread_id": "t1"}})]
+    assert len(history) == 2
+    assert [m.content for m in history[0].values["messages"] if m.type == "human"] == [f"질문 {i}" for i in range(4)]
+    await restarted.aclose()
+
+
+@pytest.mark.asyncio
+async def test_large_values_are_compressed_and_round_trip(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    saver = SQLiteSaver(path=path, compress_min_bytes=256)
+    await turn(build_graph(saver, reply_size=5000), "big")
+    await saver.aclose()
+
+    with sqlite3.connect(path) as conn:
+        types = {row[0] for row in conn.execute("SELECT type FROM messages")}
+    assert any(type_.startswith("z:") for type_ in types)
+    assert saver.stats()["bytes_saved_by_compression"] > 0
+
+    restarted = SQLiteSaver(path=path)
+    state = await build_graph(restarted).aget_state({"configurable": {"thread_id": "big"}})
+    assert state.values["messages"][-1].content.endswith("x" * 5000)
+    await restarted.aclose()
+
+
+@pytest.mark.asyncio
+async def test_scopes_keep_separate_conversations(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    chat = SQLiteSaver(path=path, scope="chat")
+    tools = SQLiteSaver(path=path, scope="tools")
+
+    await turn(build_graph(chat), "same-id", "채팅 질문")
+    await chat.aflush()
+    result = await turn(build_graph(tools), "same-id", "도구 질문")
+
+    assert [m.content for m in result["messages"] if m.type == "human"] == ["도구 질문"]
+    await chat.aclose()
+    await tools.aclose()
+
+
+@pytest.mark.asyncio
+async def test_shared_savers_follow_each_others_turns(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    # 같은 파일을 쓰는 두 워커 프로세스처럼 동작
+    first = SQLiteSaver(path=path, shared=True, flush_interval=10.0)
+    second = SQLiteSaver(path=path, shared=True, flush_interval=10.0)
+    workers = [first, second, first, second]
+
+    for index, saver in enumerate(workers):
+        result = await turn(build_graph(saver), "t1", f"질문 {index}")
+        await saver.acomplete_run("t1")
+
+    assert [m.content for m in result["messages"] if m.type == "human"] == [f"질문 {index}" for index in range(4)]
+    assert first.invalidations == 1 and second.invalidations == 1
+    # 다른 워커가 삭제한 대화는 캐시에서도 사라짐
+    await first.adelete_thread("t1")
+    await first.aflush()
+    assert await second.aget_tuple({"configurable": {"thread_id": "t1"}}) is None
+    await first.aclose()
+    await second.aclose()
@@ -0,0 +1,343 @@
+"""
+스트리밍 유틸리티 테스트
+"""
+import asyncio
+from contextlib import aclosing
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies.chat import get_chat_service
+from app.models.chat import StreamChunk
+from app.services.stream_hub import StreamCapacityError, StreamHub, stream_hub
+from app.utils.metrics import metrics
+from app.utils.sse import SSEEncoder
+from app.utils.streaming import StreamWriter
+from main import app
+
+
+async def token_source(tokens, chunk_type=None, delay=0.0):
+    for token in tokens:
+        if delay:
+            await asyncio.sleep(delay)
+        yield StreamChunk(content=token, conversation_id="c1", chunk_type=chunk_type)
+    yield StreamChunk(content="", conversation_id="c1", is_final=True)
+
+
+@pytest.mark.asyncio
+async def test_stream_writer_preserves_content_and_final_chunk():
+    tokens = [f"t{i} " for i in range(200)]
+
+    frames = [frame async for frame in StreamWriter(token_source(tokens), window_ms=5)]
+
+    assert "".join(frame.content for frame in frames) == "".join(tokens)
+    assert frames[-1].is_final
+    assert len(frames) < len(tokens)
+
+
+@pytest.mark.asyncio
+async def test_stream_writer_coalesces_while_consumer_is_slow():
+    tokens = [f"t{i} " for i in range(50)]
+    frames = []
+
+    async for frame in StreamWriter(token_source(tokens), window_ms=0, max_bytes=64):
+        frames.append(frame)
+        await asyncio.sleep(0.01)
+
+    assert "".join(frame.content for frame in frames) == "".join(tokens)
+    assert all(len(frame.content.encode()) <= 64 + 4 for frame in frames)
+    assert len(frames) < len(tokens) // 2
+
+
+@pytest.mark.asyncio
+async def test_stream_writer_sends_first_delta_without_waiting_for_window():
+    writer = StreamWriter(token_source(["첫", "토큰"], delay=0.05), window_ms=1000).__aiter__()
+
+    first = await asyncio.wait_for(writer.__anext__(), timeout=0.5)
+    await writer.aclose()
+
+    assert first.content == "첫"
+
+
+@pytest.mark.asyncio
+async def test_stream_writer_does_not_merge_different_chunk_types():
+    async def source():
+        yield StreamChunk(content="도구 호출 중", conversation_id="c1", chunk_type="tool_calling")
+        yield StreamChunk(content="답변", conversation_id="c1", chunk_type="ai_response")
+        yield StreamChunk(content="입니다", conversation_id="c1", chunk_type="ai_response")
+
+    frames = [frame async for frame in StreamWriter(source(), window_ms=50)]
+
+    assert [frame.chunk_type for frame in frames] == ["tool_calling", "ai_response"]
+    assert frames[1].content == "답변입니다"
+
+
+@pytest.mark.asyncio
+async def test_stream_writer_closes_source_when_consumer_stops():
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.001)
+                yield StreamChunk(content="x", conversation_id="c1")
+        finally:
+            closed.set()
+
+    writer = StreamWriter(endless(), window_ms=0).__aiter__()
+    await writer.__anext__()
+    await writer.aclose()
+
+    assert closed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_aclosing_stream_writer_cancels_pump_on_break():
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.001)
+                yield StreamChunk(content="x", conversation_id="c1")
+        finally:
+            closed.set()
+
+    async with aclosing(StreamWriter(endless(), window_ms=0)) as writer:
+        async for _ in writer:
+            break
+
+    assert closed.is_set() and writer.cancelled
+
+
+def test_sse_encoder_matches_pydantic_serialization():
+    encoder = SSEEncoder()
+    chunks = [
+        StreamChunk(content='줄바꿈\n"따옴표"\t', conversation_id='c"1', chunk_type="ai_response"),
+        StreamChunk(content="", conversation_id="c1", is_final=True),
+        StreamChunk(content="메타", conversation_id="c1", metadata={"cached": True}),
+    ]
+
+    for chunk in chunks:
+        assert encoder.encode_data(chunk) == chunk.model_dump_json()
+
+    frame = encoder.encode(chunks[0]).decode()
+    assert frame.startswith("id: 1\nevent: ai_response\ndata: {")
+    assert frame.endswith("\n\n")
+    assert encoder.heartbeat().startswith(b":")
+
+
+def test_stream_endpoint_emits_event_stream():
+    class StubChatService:
+        async def stream_chat(self, message, conversation_id=None, **kwargs):
+            yield StreamChunk(content="안녕", conversation_id=conversation_id)
+            yield StreamChunk(content="", conversation_id=conversation_id, is_final=True)
+
+    app.dependency_overrides[get_chat_service] = lambda: StubChatService()
+    try:
+        response = TestClient(app).post(
+            "/api/v1/chat/stream", json={"message": "hi", "conversation_id": "c1"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    assert events[0].startswith("id: 1\nevent: message\ndata: ")
+    assert events[-1] == "event: done\ndata: [DONE]"
+
+
+@pytest.mark.asyncio
+async def test_live_stream_replays_missed_frames_then_follows_live():
+    hub = StreamHub(grace_seconds=1)
+    live = hub.start("chat:c1", "질문", token_source(["a", "b", "c"], delay=0.02))
+
+    first = live.subscribe().__aiter__()
+    event_id, chunk = await first.__anext__()
+    await first.aclose()
+    assert (event_id, chunk.content) == (1, "a")
+
+    resumed = hub.resume("chat:c1", "질문", last_event_id=1)
+    assert resumed is live
+    events = [event async for event in live.subscribe(1) if event is not None]
+
+    assert [event_id for event_id, _ in events] == list(range(2, live.last_id + 1))
+    assert "".join(chunk.content for _, chunk in events) == "bc"
+    assert events[-1][1].is_final
+
+
+@pytest.mark.asyncio
+async def test_stream_hub_rejects_resume_for_other_message_or_lost_frames():
+    hub = StreamHub(max_events=2)
+    live = hub.start("chat:c1", "질문", token_source(["a", "b", "c"], delay=0.02))
+    await live.task
+
+    assert hub.resume("chat:c1", "다른 질문", 0) is None
+    assert hub.resume("chat:c2", "질문", 0) is None
+    assert hub.resume("chat:c1", "질문", 0) is None
+    assert hub.resume("chat:c1", "질문", live.last_id - 1) is live
+
+
+@pytest.mark.asyncio
+async def test_live_stream_yields_none_while_generation_is_idle():
+    hub = StreamHub()
+    live = hub.start("chat:c1", "질문", token_source(["늦은 토큰"], delay=0.1))
+
+    events = [event async for event in live.subscribe(idle_timeout=0.02)]
+
+    assert events[0] is None
+    assert [chunk.content for _, chunk in filter(None, events)] == ["늦은 토큰", ""]
+
+
+@pytest.mark.asyncio
+async def test_live_stream_cancels_generation_after_last_subscriber_leaves():
+    closed = asyncio.Event()
+
+    async def slow_generation():
+        try:
+            yield StreamChunk(content="첫 토큰", conversation_id="c1")
+            await asyncio.sleep(10)
+            yield StreamChunk(content="도달하지 않음", conversation_id="c1")
+        finally:
+            closed.set()
+
+    cancelled_before = metrics.get("stream.cancelled")
+    hub = StreamHub(grace_seconds=0.05)
+    live = hub.start("chat:c1", "질문", slow_generation())
+
+    subscription = live.subscribe().__aiter__()
+    await subscription.__anext__()
+    await subscription.aclose()
+    assert not live.task.done()
+
+    await asyncio.wait_for(closed.wait(), timeout=1)
+    assert live.task.cancelled()
+    assert metrics.get("stream.cancelled") == cancelled_before + 1
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_ends_with_an_error_frame():
+    async def broken_generation():
+        yield StreamChunk(content="부분 답변", conversation_id="c1")
+        raise RuntimeError("graph failed")
+
+    hub = StreamHub()
+    live = hub.start("chat:c1", "질문", broken_generation())
+
+    events = [event async for event in live.subscribe() if event is not None]
+
+    assert events[0][1].content == "부분 답변"
+    last = events[-1][1]
+    assert last.is_final and last.chunk_type == "error" and last.metadata["error"] == "generation_failed"
+    assert live.done and live.task.exception() is None
+
+
+async def alternating_source(count: int):
+    # 종류가 번갈아 바뀌는 청크는 병합되지 않아 청크마다 프레임 하나
+    for index in range(count):
+        yield StreamChunk(content=str(index), conversation_id="c1", chunk_type="ai_response" if index % 2 else "tool_result")
+    yield StreamChunk(content="", conversation_id="c1", is_final=True)
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_pauses_generation_instead_of_losing_frames():
+    hub = StreamHub(max_events=3)
+    live = hub.start("chat:c1", "질문", alternating_source(20))
+    subscription = live.subscribe().__aiter__()
+
+    first = await subscription.__anext__()
+    await asyncio.sleep(0.1)
+    # 버퍼가 찬 뒤로는 구독자가 읽을 때까지 생성이 멈춤
+    assert not live.done and live.last_id <= 4
+
+    events = [first] + [event async for event in subscription if event is not None]
+    assert [event_id for event_id, _ in events] == list(range(1, live.last_id + 1))
+    assert [chunk.content for _, chunk in events[:-1]] == [str(index) for index in range(20)]
+
+
+@pytest.mark.asyncio
+async def test_subscriber_behind_the_buffer_gets_a_replay_gap_error():
+    hub = StreamHub(max_events=2)
+    live = hub.start("chat:c1", "질문", alternating_source(5))
+    await live.task
+
+    events = [event async for event in live.subscribe(0)]
+
+    assert len(events) == 1
+    _, chunk = events[0]
+    assert chunk.is_final and chunk.chunk_type == "error" and chunk.metadata["error"] == "replay_gap"
+
+
+@pytest.mark.asyncio
+async def test_hub_never_cancels_running_generations():
+    hub = StreamHub(max_streams=1)
+    first = hub.start("chat:c1", "질문", token_source(["a"], delay=0.2))
+    second = hub.start("chat:c2", "질문", token_source(["b"], delay=0.2))
+    await asyncio.sleep(0)
+
+    assert not first.task.done() and hub.stats()["live"] == 2
+
+    # 같은 키로 새 생성을 시작하면 대체된 생성은 취소
+    replacement = hub.start("chat:c1", "새 질문", token_source(["c"]))
+    await asyncio.gather(first.task, return_exceptions=True)
+    assert first.task.cancelled() and not second.task.done()
+    await asyncio.gather(second.task, replacement.task)
+
+
+@pytest.mark.asyncio
+async def test_hub_refuses_starts_beyond_max_live_streams():
+    hub = StreamHub(max_live=1)
+    first = hub.start("chat:c1", "질문", token_source(["a"], delay=0.1))
+
+    with pytest.raises(StreamCapacityError):
+        hub.start("chat:c2", "질문", token_source(["b"]))
+    # 같은 대화의 새 요청은 기존 생성을 대체하므로 허용
+    replacement = hub.start("chat:c1", "새 질문", token_source(["c"]))
+    await asyncio.gather(first.task, replacement.task, return_exceptions=True)
+
+    second = hub.start("chat:c2", "질문", token_source(["b"]))
+    await second.task
+    assert hub.stats()["rejected"] == 1 and hub.stats()["max_live"] == 1
+
+
+def test_stream_endpoint_returns_503_at_capacity(monkeypatch):
+    class StubChatService:
+        async def stream_chat(self, message, conversation_id=None, **kwargs):
+            yield StreamChunk(content="", conversation_id=conversation_id, is_final=True)
+
+    monkeypatch.setattr(stream_hub, "max_live", 0)
+    app.dependency_overrides[get_chat_service] = lambda: StubChatService()
+    try:
+        client = TestClient(app)
+        response = client.post("/api/v1/chat/stream", json={"message": "hi", "conversation_id": "full-1"})
+        health = client.get("/health").json()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503 and response.headers["retry-after"] == "1"
+    assert health["status"] == "degraded" and health["streams"]["max_live"] == 0
+
+
+def test_stream_endpoint_replays_from_last_event_id():
+    calls = []
+
+    class StubChatService:
+        async def stream_chat(self, message, conversation_id=None, **kwargs):
+            calls.append(message)
+            yield StreamChunk(content="안녕", conversation_id=conversation_id)
+            yield StreamChunk(content="", conversation_id=conversation_id, is_final=True)
+
+    app.dependency_overrides[get_chat_service] = lambda: StubChatService()
+    try:
+        client = TestClient(app)
+        body = {"message": "hi", "conversation_id": "resume-1"}
+        first = client.post("/api/v1/chat/stream", json=body)
+        resumed = client.post("/api/v1/chat/stream", json=body, headers={"Last-Event-ID": "1"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert calls == ["hi"]
+    assert first.text.startswith("id: 1\n")
+    events = [block for block in resumed.text.split("\n\n") if block]
+    assert events[0].startswith("id: 2\nevent: message\n")
+    assert events[-1] == "event: done\ndata: [DONE]"